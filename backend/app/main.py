@@ -15,6 +15,7 @@ load_dotenv(dotenv_path=env_path_backend, override=True)
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from .routes import ocr as ocr_routes
 from .routes import ocr_clean as ocr_clean_routes
 from .routes import nlp as nlp_routes
@@ -22,6 +23,11 @@ from .routes import translate as translate_routes
 from .routes import audio as audio_routes
 from .routes import dosage as dosage_routes
 from .routes import auth as auth_routes
+from .routes import jobs as jobs_routes
+from .services.model_registry import MODELS
+from .utils.ocr_pool import OCR_POOL
+from .services.tts_backends import TTS
+from .services.translator import TRANSLATE_POOL
 
 # Set Google Cloud credentials from env variable
 google_creds = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
@@ -60,6 +66,20 @@ async def root():
 async def health():
     return {"status": "healthy"}
 
+@app.on_event("startup")
+async def warm_models():
+    """Load local OCR models before serving so the first requests don't pay for it."""
+    names = [n.strip() for n in os.getenv("OCR_PRELOAD_MODELS", "easyocr,trocr").split(",") if n.strip()]
+    if names:
+        status = await run_in_threadpool(MODELS.warm, names)
+        print(f"[INFO] Model warm-up: {status}")
+
+@app.on_event("shutdown")
+async def stop_ocr_pool():
+    OCR_POOL.shutdown()
+    TTS.shutdown()
+    TRANSLATE_POOL.shutdown(wait=False, cancel_futures=True)
+
 # Include routers
 app.include_router(ocr_routes.router, prefix="/ocr", tags=["OCR"])
 app.include_router(ocr_clean_routes.router, prefix="/ocr", tags=["OCR"])
@@ -68,6 +88,7 @@ app.include_router(translate_routes.router, prefix="/translate", tags=["Translat
 app.include_router(audio_routes.router, prefix="/audio", tags=["Audio"])
 app.include_router(dosage_routes.router, prefix="/dosage", tags=["Dosage"])
 app.include_router(auth_routes.router, prefix="/auth", tags=["Auth"])
+app.include_router(jobs_routes.router, prefix="/jobs", tags=["Jobs"])
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,73 +1,332 @@
-﻿from fastapi import APIRouter, HTTPException
+﻿from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
-from gtts import gTTS
+from collections import deque
+from pathlib import Path
+from typing import AsyncIterator, List, Optional, Tuple
+import asyncio
 import base64
-import io
+import os
+from ..services.audio_generator import audio_url, split_sentences
+from ..services.gemini_extractor import GeminiExtractor, get_gemini_extractor
+from ..services.tts_backends import TTS, TTSBackend, split_wav, streaming_wav_header
+from ..utils.audio_cache import AUDIO_CACHE, audio_key, is_audio_key
+from ..utils.single_flight import SingleFlight, content_key
 
 router = APIRouter()
 
+# Clicking play on the same card twice renders the clip once
+TTS_FLIGHTS = SingleFlight("tts")
+
+# Clip URLs are content-addressed, so they never change
+IMMUTABLE = "public, max-age=31536000, immutable"
+CHUNK_SIZE = 64 * 1024
+MEDIA_TYPES = {"mp3": "audio/mpeg", "wav": "audio/wav"}
+
+# Sentences rendered ahead of the one being sent, per stream
+TTS_PREFETCH = int(os.getenv("TTS_STREAM_PREFETCH", "3"))
+
 class AudioRequest(BaseModel):
     text: str
     language: str = "en"
+    # Include the clip as base64 in the JSON (older clients); otherwise fetch `audio_url`
+    inline: bool = True
+    # Force a TTS backend ("gtts", "pyttsx3"); default is TTS_BACKEND with fallback
+    engine: Optional[str] = None
+
+def _backends(engine: Optional[str]) -> List[TTSBackend]:
+    if not engine:
+        return TTS.preferred()
+    try:
+        return [TTS.backend(engine)]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def _spoken_text(text: str, language: str, extractor: GeminiExtractor) -> Tuple[str, bool]:
+    """(text to speak, whether it is in `language`); False when translation fell back to the original."""
+    # Translate text if target language is not English
+    # This ensures that even existing English records are read out in the target language
+    if language == "English" or language == "en":
+        return text, True
+    if not extractor.api_key:
+        return text, False
+    try:
+        return await extractor.translate_text(text, language), True
+    except Exception as tr_error:
+        print(f"Translation for audio failed: {tr_error}")
+        # Fallback to original text
+        return text, False
+
+async def _render(request: AudioRequest, extractor: GeminiExtractor) -> Tuple[str, TTSBackend, bytes, bool]:
+    """(key, backend, clip, whether the clip was stored and can be served from its URL)."""
+    final_text, translated = await _spoken_text(request.text, request.language, extractor)
+
+    # Generate audio
+    audio, backend = await TTS.render(final_text, request.language, request.engine)
+    # An untranslated clip gets its own key, so the next request translates again
+    key = audio_key(request.text, request.language, backend.voice, untranslated=not translated)
+    stored = await run_in_threadpool(AUDIO_CACHE.put, key, audio, backend.extension) is not None
+    return key, backend, audio, stored
+
+async def _cached_clip(text: str, language: str, backends: List[TTSBackend]):
+    """(key, backend, path) of a clip of `text` by any of `backends`, in order, or None."""
+    for backend in backends:
+        key = audio_key(text, language, backend.voice)
+        path = await run_in_threadpool(AUDIO_CACHE.get, key, backend.extension)
+        if path is not None:
+            return key, backend, path
+    return None
 
 @router.post("/generate")
-async def generate_audio(request: AudioRequest):
-    """Generate audio from text using gTTS and return as base64."""
+async def generate_audio(request: AudioRequest, extractor: GeminiExtractor = Depends(get_gemini_extractor)):
+    """
+    Generate audio from text with the configured TTS backend (gTTS by
+    default, offline pyttsx3 as fallback when installed).
+
+    Clips are cached on disk by (text, language, voice), so a repeat request
+    skips both translation and synthesis. Returns `audio_url`, a cacheable
+    clip served by GET /audio/files/{key}.{format}, and `audio_base64`
+    unless `inline` is false. If the clip could not be written to the cache,
+    `audio_url` is null and `audio_base64` is always included.
+    """
     try:
         if not request.text:
             raise HTTPException(status_code=400, detail="Text is required")
 
-        # Map frontend language names to gTTS codes
-        lang_map = {
-            "English": "en",
-            "Spanish": "es",
-            "French": "fr",
-            "Hindi": "hi",
-            "Telugu": "te",
-            "Tamil": "ta",
-            "Kannada": "kn",
-            "Malayalam": "ml",
-            "Marathi": "mr",
-            "Gujarati": "gu",
-            "Bengali": "bn",
-            "Punjabi": "pa",
-            "Urdu": "ur"
-        }
-        
-        # Use mapped code or default to provided language/en
-        lang_code = lang_map.get(request.language, request.language) or "en"
-        
-        # Translate text if target language is not English
-        # This ensures that even existing English records are read out in the target language
-        final_text = request.text
-        if request.language != "English" and request.language != "en":
-            try:
-                from ..services.gemini_extractor import GeminiExtractor
-                extractor = GeminiExtractor()
-                if extractor.api_key:
-                    final_text = await extractor.translate_text(request.text, request.language)
-            except Exception as tr_error:
-                print(f"Translation for audio failed: {tr_error}")
-                # Fallback to original text
-                pass
-
-        # Generate audio
-        tts = gTTS(text=final_text, lang=lang_code)
-        
-        # Save to memory buffer
-        mp3_fp = io.BytesIO()
-        tts.write_to_fp(mp3_fp)
-        mp3_fp.seek(0)
-        
-        # Encode to base64
-        audio_base64 = base64.b64encode(mp3_fp.read()).decode("utf-8")
-        
-        return {
-            "audio_base64": audio_base64,
-            "format": "mp3",
+        hit = await _cached_clip(request.text, request.language, _backends(request.engine))
+        audio = None
+        stored = True
+        if hit is not None:
+            key, backend, path = hit
+            if request.inline:
+                try:
+                    audio = await run_in_threadpool(path.read_bytes)
+                except FileNotFoundError:
+                    hit = None  # evicted in between; render it again
+        cached = hit is not None
+        if not cached:
+            flight = content_key(request.text, request.language, request.engine)
+            key, backend, audio, stored = await TTS_FLIGHTS.run(flight, lambda: _render(request, extractor))
+
+        result = {
+            "audio_url": audio_url(key, backend.extension) if stored else None,
+            "etag": key,
+            "cached": cached,
+            "engine": backend.name,
+            "format": backend.extension,
             "message": "Audio generated successfully"
         }
-        
+        if request.inline or not stored:
+            # Encode to base64
+            result["audio_base64"] = base64.b64encode(audio).decode("utf-8")
+        return result
+
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error generating audio: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+async def _speak_chunk(text: str, language: str, backend: TTSBackend, translated: bool = True) -> bytes:
+    """
+    One sentence's clip, from the clip cache when this sentence was spoken
+    before. Sentences left untranslated by a failed translation are cached
+    apart, so they never answer a later request for the translated clip.
+    """
+    key = audio_key(text, language, backend.voice, untranslated=not translated)
+    path = await run_in_threadpool(AUDIO_CACHE.get, key, backend.extension)
+    if path is not None:
+        try:
+            return await run_in_threadpool(path.read_bytes)
+        except FileNotFoundError:
+            pass  # evicted in between
+    audio = await backend.render(text, language)
+    await run_in_threadpool(AUDIO_CACHE.put, key, audio, backend.extension)
+    return audio
+
+async def _synthesize_in_order(
+    chunks: List[str], language: str, backend: TTSBackend, translated: bool = True
+) -> AsyncIterator[bytes]:
+    """
+    Synthesize `chunks` on the backend's pool, at most TTS_PREFETCH + 1 at a
+    time, and yield their clips in order.
+    """
+    pending = deque()
+    remaining = iter(chunks)
+
+    def submit_next() -> None:
+        chunk = next(remaining, None)
+        if chunk is not None:
+            pending.append(asyncio.ensure_future(_speak_chunk(chunk, language, backend, translated)))
+
+    for _ in range(TTS_PREFETCH + 1):
+        submit_next()
+    try:
+        while pending:
+            audio = await pending.popleft()
+            submit_next()
+            yield audio
+    finally:
+        # Listener went away: drop sentences that have not started
+        for future in pending:
+            future.cancel()
+
+async def _as_stream(clips: AsyncIterator[bytes], backend: TTSBackend) -> AsyncIterator[bytes]:
+    """
+    MP3 is a sequence of self-contained frames, so MP3 clips concatenate into
+    one playable stream. WAV clips are re-framed: one open-ended header, then
+    each clip's PCM samples.
+    """
+    try:
+        if backend.concatenable:
+            async for clip in clips:
+                yield clip
+            return
+        header_sent = False
+        async for clip in clips:
+            params, frames = split_wav(clip)
+            if not header_sent:
+                yield streaming_wav_header(*params)
+                header_sent = True
+            yield frames
+    finally:
+        await clips.aclose()
+
+async def _stream_speech(text: str, language: str, engine: Optional[str], extractor: GeminiExtractor) -> StreamingResponse:
+    if not text:
+        raise HTTPException(status_code=400, detail="Text is required")
+    final_text, translated = await _spoken_text(text, language, extractor)
+    chunks = split_sentences(final_text)
+    if not chunks:
+        raise HTTPException(status_code=400, detail="Text is required")
+
+    # One backend per stream, since MP3 and WAV clips cannot be mixed; if the
+    # first sentence fails, the next backend gets the whole stream
+    candidates = _backends(engine)
+    for i, backend in enumerate(candidates):
+        audio = _as_stream(_synthesize_in_order(chunks, language, backend, translated), backend)
+        try:
+            # Fail with a status code, not a truncated stream, if the first sentence cannot be spoken
+            first = await audio.__anext__()
+            break
+        except Exception as e:
+            await audio.aclose()
+            print(f"Error generating audio with {backend.name}: {str(e)}")
+            if i == len(candidates) - 1:
+                raise HTTPException(status_code=500, detail=str(e))
+
+    async def body() -> AsyncIterator[bytes]:
+        yield first
+        try:
+            async for clip in audio:
+                yield clip
+        except Exception as e:
+            # Headers are gone; end the stream early rather than send broken audio
+            print(f"Error generating audio: {str(e)}")
+        finally:
+            await audio.aclose()
+
+    return StreamingResponse(
+        body(),
+        media_type=backend.media_type,
+        headers={
+            "Cache-Control": "no-store",
+            "X-Accel-Buffering": "no",
+            "X-Audio-Chunks": str(len(chunks)),
+            "X-TTS-Engine": backend.name,
+        },
+    )
+
+@router.post("/stream")
+async def stream_audio(request: AudioRequest, extractor: GeminiExtractor = Depends(get_gemini_extractor)):
+    """
+    Speak `text` as a chunked audio stream that starts playing after the first
+    sentence is synthesized. Sentences are rendered concurrently on the TTS
+    backend's pool (TTS_STREAM_PREFETCH ahead) and sent in order; each is
+    cached on its own.
+    """
+    return await _stream_speech(request.text, request.language, request.engine, extractor)
+
+@router.get("/stream")
+async def stream_audio_get(
+    text: str,
+    language: str = "en",
+    engine: Optional[str] = None,
+    extractor: GeminiExtractor = Depends(get_gemini_extractor),
+):
+    """Same as POST /audio/stream, usable directly as an `<audio src>`."""
+    return await _stream_speech(text, language, engine, extractor)
+
+@router.get("/stats")
+async def audio_stats():
+    """Counters for the on-disk clip cache, request coalescing and TTS backends."""
+    return {"cache": AUDIO_CACHE.stats(), "single_flight": TTS_FLIGHTS.stats(), "backends": TTS.stats()}
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """(start, end) inclusive for a single `bytes=` range; None if unsatisfiable or unsupported."""
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:
+            length = int(last)
+            if length <= 0:
+                return None
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        return None
+    return start, end
+
+def _etag_matches(header: str, etag: str) -> bool:
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+async def _send_range(path: Path, start: int, end: int):
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await run_in_threadpool(f.read, min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+@router.get("/files/{name}")
+async def audio_file(name: str, request: Request):
+    """
+    Serve a cached clip with a strong ETag (If-None-Match -> 304), byte ranges
+    (Range / If-Range -> 206, for seeking) and long-lived Cache-Control.
+    """
+    key, _, ext = name.partition(".")
+    if ext not in MEDIA_TYPES or not is_audio_key(key):
+        raise HTTPException(status_code=404, detail="Audio not found")
+    path = await run_in_threadpool(AUDIO_CACHE.get, key, ext)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Audio not found")
+
+    etag = f'"{key}"'
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE, "Accept-Ranges": "bytes"}
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+
+    size = path.stat().st_size
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range == etag):
+        byte_range = _parse_range(range_header, size)
+        if byte_range is None:
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(_send_range(path, start, end), status_code=206, media_type=MEDIA_TYPES[ext], headers=headers)
+
+    return FileResponse(path, media_type=MEDIA_TYPES[ext], headers=headers)
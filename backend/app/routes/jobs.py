@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from typing import Dict
+import logging
+from ..utils.job_queue import QUEUED, RUNNING, JobQueue, get_job_queue
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Suggested polling interval while a job is pending
+POLL_AFTER_S = 2
+
+
+@router.post("", status_code=202)
+async def submit_extraction_job(
+    request: Request,
+    response: Response,
+    file: UploadFile = File(...),
+    language: str = Form("English"),
+    queue: JobQueue = Depends(get_job_queue),
+) -> Dict:
+    """
+    Queue a prescription extraction (same engine, cache and result as
+    /ocr/extract) for a worker process and return its id immediately.
+    Poll GET /jobs/{id} until `status` is `succeeded` or `dead`.
+    """
+    image_bytes = await file.read()
+    if not image_bytes:
+        raise HTTPException(status_code=400, detail="Empty file uploaded")
+
+    payload = {
+        "filename": file.filename,
+        "mime_type": file.content_type,
+        "language": language,
+        "fresh": "no-cache" in request.headers.get("cache-control", "").lower(),
+    }
+    job_id = await run_in_threadpool(queue.submit, "ocr.extract", payload, image_bytes)
+    logger.info(f"Queued extraction job {job_id} ({len(image_bytes)} bytes)")
+    response.headers["Location"] = f"/jobs/{job_id}"
+    response.headers["Retry-After"] = str(POLL_AFTER_S)
+    return {"id": job_id, "status": QUEUED, "poll": f"/jobs/{job_id}"}
+
+
+@router.get("/stats")
+async def job_stats(queue: JobQueue = Depends(get_job_queue)) -> Dict:
+    """Queue depth per status and age of the oldest waiting job."""
+    return await run_in_threadpool(queue.stats)
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str, response: Response, queue: JobQueue = Depends(get_job_queue)) -> Dict:
+    """Status of a job, with `result` once it succeeded or `error` from its last failed attempt."""
+    job = await run_in_threadpool(queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] in (QUEUED, RUNNING):
+        response.headers["Retry-After"] = str(POLL_AFTER_S)
+    return job
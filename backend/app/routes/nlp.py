@@ -1,29 +1,27 @@
-﻿from fastapi import APIRouter
+﻿from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from typing import Dict, List
+import os
+from ..services.entity_extractor import ENTITY_EXTRACTOR
 
 router = APIRouter()
 
 @router.post("/extract")
 async def extract_entities(data: Dict) -> Dict:
-    """Extract named entities (medical terms) from text."""
+    """Extract named entities (medical terms) from text, with their types and character offsets."""
     text = data.get("text", "")
-    
-    words = text.split()
-    entities = []
-    
-    # Medical term mappings
-    medical_terms = {
-        "fever": "Symptom", "headache": "Symptom", "cough": "Symptom", "pain": "Symptom",
-        "paracetamol": "Drug", "aspirin": "Drug", "ibuprofen": "Drug", "amoxicillin": "Drug",
-        "tablet": "Form", "capsule": "Form", "injection": "Form",
-        "orally": "Route", "intravenous": "Route",
-        "mg": "Dosage", "ml": "Dosage", "gm": "Dosage",
-        "twice": "Frequency", "thrice": "Frequency", "daily": "Frequency"
-    }
-    
-    for word in words:
-        word_lower = word.lower().rstrip('.,;:')
-        if word_lower in medical_terms:
-            entities.append({"text": word, "type": medical_terms[word_lower]})
-    
+    entities = await run_in_threadpool(ENTITY_EXTRACTOR.extract, text)
     return {"entities": entities}
+
+
+@router.post("/extract-batch")
+async def extract_entities_batch(data: Dict) -> Dict:
+    """Extract entities from many texts in one call; results are in input order."""
+    texts: List[str] = data.get("texts", [])
+    max_texts = int(os.getenv("NLP_BATCH_MAX_TEXTS", "1000"))
+    if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+        raise HTTPException(status_code=400, detail="texts must be a list of strings")
+    if len(texts) > max_texts:
+        raise HTTPException(status_code=413, detail=f"At most {max_texts} texts per batch")
+    results = await run_in_threadpool(ENTITY_EXTRACTOR.extract_many, texts)
+    return {"results": [{"entities": entities} for entities in results], "count": len(results)}
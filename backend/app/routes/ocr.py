@@ -1,54 +1,124 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from typing import Dict, List
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import json
 import logging
+import math
 import os
-from ..utils.vision_ocr import process_prescription_image
+from ..utils.vision_ocr import process_prescription_image, DRUG_MATCH_CACHE, ENGINE_BREAKERS
+from ..services import fuzzy_matching
+from ..services.model_registry import MODELS
+from ..services.gemini_extractor import GEMINI_MODEL, PROMPT_VERSION, GeminiExtractor, get_gemini_extractor
+from ..utils.ocr_pool import OCR_POOL, PoolSaturated
+from ..utils.result_cache import RESULT_CACHE, extraction_key
+from ..utils.near_duplicate import NEAR_DUPLICATES, fingerprint
+from ..utils.image_normalize import split_pages
+from ..utils.rate_limiter import RateLimitExceeded
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
-@router.post("/extract")
-async def extract_text(file: UploadFile = File(...), language: str = Form("English")) -> Dict:
+def _overloaded(e: RateLimitExceeded) -> HTTPException:
+    """503 for requests shed by the Gemini rate limiter, never a fabricated result."""
+    return HTTPException(
+        status_code=503,
+        detail=f"Extraction service is busy, please retry: {e}",
+        headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+    )
+
+
+async def _fingerprint(image_bytes: bytes) -> Optional[Tuple[int, int]]:
+    if not NEAR_DUPLICATES.enabled:
+        return None
+    try:
+        return await run_in_threadpool(fingerprint, image_bytes)
+    except ValueError:
+        # Not decodable here (e.g. HEIC); only exact-bytes caching applies
+        return None
+
+
+def _cache_key(image_bytes: bytes, ocr_engine: str, language: str) -> str:
+    return extraction_key(image_bytes, f"{ocr_engine}:{GEMINI_MODEL}", PROMPT_VERSION, language)
+
+
+def _wants_fresh(request: Request) -> bool:
+    return "no-cache" in request.headers.get("cache-control", "").lower()
+
+
+async def _lookup_cache(
+    image_bytes: bytes, cache_key: str, bypass: bool = False
+) -> Tuple[Optional[Dict], Dict[str, str], Optional[Tuple[int, int]]]:
     """
-    Extract text and entities from prescription image using Google Vision API.
-    
-    Returns:
-    - raw_ocr_text: Full OCR text from image
-    - tokens: All tokens with per-token OCR confidence
-    - drug_candidates: Fuzzy-matched drug names from lexicon
-    - dosages: Extracted dosage values (mg, etc.)
-    - dosage_forms: Extracted forms (tablet, capsule, etc.)
-    - frequencies: Extracted frequency patterns (once daily, etc.)
-    - confidence_metrics: OCR confidence statistics
+    Exact-content cache, then (if enabled) the near-duplicate index.
+    Returns (cached result or None, cache headers, fingerprint to store with a fresh result).
+    """
+    if not bypass:
+        cached, tier = await run_in_threadpool(RESULT_CACHE.get, cache_key)
+        if cached is not None:
+            return cached, {"X-Cache": "HIT", "X-Cache-Tier": tier}, None
+
+    # A retake of the same prescription reuses the earlier extraction
+    fp = await _fingerprint(image_bytes)
+    if fp is not None and not bypass:
+        namespace = cache_key[cache_key.index(":"):]
+        cached, distance = await run_in_threadpool(NEAR_DUPLICATES.find_cached, RESULT_CACHE, fp, namespace)
+        if cached is not None:
+            headers = {"X-Cache": "HIT", "X-Cache-Tier": "near-duplicate", "X-Cache-Distance": str(distance)}
+            return cached, headers, fp
+    return None, {"X-Cache": "BYPASS" if bypass else "MISS"}, fp
+
+
+async def _store(cache_key: str, result: Dict, fp: Optional[Tuple[int, int]] = None) -> Dict:
+    """Store a fresh extraction in the result cache and near-duplicate index."""
+    if result:
+        await run_in_threadpool(RESULT_CACHE.put, cache_key, result)
+        if fp is not None:
+            NEAR_DUPLICATES.add(fp, cache_key)
+    return result
+
+
+async def _extract_one(
+    image_bytes: bytes,
+    mime_type: Optional[str],
+    language: str,
+    extractor: GeminiExtractor,
+    bypass: bool = False,
+) -> Tuple[Dict, Dict[str, str]]:
+    """
+    One extraction with the configured engine (OCR_ENGINE), through the result
+    cache. Returns (result, cache headers); failures raise HTTPException.
+    Shared by /extract and /extract-batch.
     """
     try:
-        # Log current env var state for debugging
-        creds_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
-        logger.info(f"[DEBUG OCR] GOOGLE_APPLICATION_CREDENTIALS={creds_path}")
-        
-        # Read uploaded file
-        image_bytes = await file.read()
-        
         if not image_bytes:
             raise HTTPException(status_code=400, detail="Empty file uploaded")
 
         # Check for preferred OCR engine
         ocr_engine = os.getenv("OCR_ENGINE", "gemini").lower() # Default to gemini if not set
 
+        # Repeat uploads of the same photo are answered from the result cache
+        cache_key = _cache_key(image_bytes, ocr_engine, language)
+        cached, cache_headers, fp = await _lookup_cache(image_bytes, cache_key, bypass=bypass)
+        if cached is not None:
+            return cached, cache_headers
+
         if ocr_engine == "gemini":
             try:
-                from ..services.gemini_extractor import GeminiExtractor
-                extractor = GeminiExtractor()
                 # Check if API key is present before attempting
                 if extractor.api_key:
-                    logger.info(f"Using Gemini Flash Latest for extraction (Mime: {file.content_type}, Language: {language})")
-                    result = await extractor.extract_prescription_data(image_bytes, mime_type=file.content_type, language=language)
-                    return result
+                    logger.info(f"Using Gemini Flash Latest for extraction (Mime: {mime_type}, Language: {language})")
+                    result = await extractor.extract_prescription_data(image_bytes, mime_type=mime_type, language=language)
+                    return await _store(cache_key, result, fp), cache_headers
                 else:
                     # Explicitly warn if API key is missing when Gemini is expected
                     logger.warning("Gemini API key not found. Please set GOOGLE_API_KEY in .env.")
                     raise HTTPException(status_code=500, detail="Gemini API Key not found. Please set GOOGLE_API_KEY.")
+            except RateLimitExceeded as e:
+                logger.warning(f"Gemini extraction shed: {e}")
+                raise _overloaded(e)
             except Exception as e:
                 logger.error(f"Gemini extraction failed: {e}")
                 # Raise the actual Gemini error so the user knows why it failed
@@ -58,33 +128,29 @@ async def extract_text(file: UploadFile = File(...), language: str = Form("Engli
              try:
                 # 1. Extract raw text using Tesseract
                 logger.info("Using Hybrid Pipeline: Tesseract OCR -> Gemini NLP")
-                # process_prescription_image handles the OCR preference
-                # We need to temporarily set env var or modify call if we want to force it, 
-                # but we modified vision_ocr.py to respect "PREFERRED_OCR" env var if passed? 
-                # Actually, process_prescription_image reads os.getenv("PREFERRED_OCR").
-                # Let's set it here for this request context if possible, or assume user set it globally.
-                # BETTER: We can just manually call the underlying functions or trust the environment.
-                # BUT, since we are in code, let's just use os.environ context for safety or update process_prescription_image to accept an arg.
-                # Updating process_prescription_image signature is riskier. Let's set env var temporarily.
-                os.environ["PREFERRED_OCR"] = "pytesseract"
-                
-                ocr_result = process_prescription_image(image_bytes)
+                # Prefer tesseract for this call only (no process-wide env mutation),
+                # and run the CPU-bound pipeline in the worker pool, off the event loop.
+                ocr_result = await OCR_POOL.run(process_prescription_image, image_bytes, preferred="pytesseract")
                 raw_text = ocr_result.get("raw_ocr_text", "")
                 
                 if not raw_text:
                      raise ValueError("Tesseract failed to extract any text.")
 
                 # 2. Pass text to Gemini for structured extraction
-                from ..services.gemini_extractor import GeminiExtractor
-                extractor = GeminiExtractor()
                 if extractor.api_key:
                      result = await extractor.extract_from_text(raw_text, language=language)
-                     return result
+                     return await _store(cache_key, result, fp), cache_headers
                 else:
                      logger.warning("Gemini API key missing for hybrid mode. Returning raw Tesseract text only.")
                      # Fallback: return raw OCR structure if Gemini is missing
-                     return ocr_result
+                     return ocr_result, cache_headers
 
+             except PoolSaturated as e:
+                logger.warning(f"Hybrid extraction rejected: {e}")
+                raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+             except RateLimitExceeded as e:
+                logger.warning(f"Hybrid extraction shed: {e}")
+                raise _overloaded(e)
              except Exception as e:
                 logger.error(f"Hybrid extraction failed: {e}")
                 raise HTTPException(status_code=500, detail=f"Hybrid Extraction Failed: {str(e)}")
@@ -93,6 +159,242 @@ async def extract_text(file: UploadFile = File(...), language: str = Form("Engli
         # default fall through to legacy behavior or error
         raise HTTPException(status_code=400, detail="OCR_ENGINE must be set to 'gemini' or 'tesseract'.")
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"OCR extraction failed: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to extract text from image: {str(e)}")
+
+
+@router.post("/extract")
+async def extract_text(
+    request: Request,
+    response: Response,
+    file: UploadFile = File(...),
+    language: str = Form("English"),
+    extractor: GeminiExtractor = Depends(get_gemini_extractor),
+) -> Dict:
+    """
+    Extract text and entities from prescription image using Google Vision API.
+
+    Results are cached by image content, engine, prompt version and language
+    (X-Cache: HIT/MISS/BYPASS, X-Cache-Tier: memory/disk), and retakes of an
+    already-scanned photo are matched by perceptual hash
+    (X-Cache-Tier: near-duplicate, X-Cache-Distance). Send
+    `Cache-Control: no-cache` to force a fresh extraction.
+    
+    Returns:
+    - raw_ocr_text: Full OCR text from image
+    - tokens: All tokens with per-token OCR confidence
+    - drug_candidates: Fuzzy-matched drug names from lexicon
+    - dosages: Extracted dosage values (mg, etc.)
+    - dosage_forms: Extracted forms (tablet, capsule, etc.)
+    - frequencies: Extracted frequency patterns (once daily, etc.)
+    - confidence_metrics: OCR confidence statistics
+    """
+    # Log current env var state for debugging
+    creds_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+    logger.info(f"[DEBUG OCR] GOOGLE_APPLICATION_CREDENTIALS={creds_path}")
+
+    # Read uploaded file
+    image_bytes = await file.read()
+    result, cache_headers = await _extract_one(
+        image_bytes, file.content_type, language, extractor, bypass=_wants_fresh(request)
+    )
+    response.headers.update(cache_headers)
+    return result
+
+
+def _batch_concurrency() -> int:
+    # Items still queue on the shared OCR pool and Gemini limiter; this only caps
+    # how many one batch puts in flight, so a large stack cannot starve single uploads.
+    return int(os.getenv("OCR_BATCH_CONCURRENCY", "0")) or OCR_POOL.workers
+
+
+async def _batch_items(files: List[UploadFile]) -> List[Dict]:
+    """Read uploads in order; multi-page scans become one item per page."""
+    items = []
+    for file in files:
+        data = await file.read()
+        pages = await run_in_threadpool(split_pages, data, file.content_type) if data else [(data, file.content_type)]
+        for page, (page_bytes, mime_type) in enumerate(pages, start=1):
+            items.append({
+                "filename": file.filename,
+                "page": page if len(pages) > 1 else None,
+                "bytes": page_bytes,
+                "mime_type": mime_type,
+            })
+    return items
+
+
+@router.post("/extract-batch")
+async def extract_batch(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    language: str = Form("English"),
+    stream: bool = Form(False),
+    extractor: GeminiExtractor = Depends(get_gemini_extractor),
+):
+    """
+    Extract several prescriptions in one request (many files, or multi-page TIFF scans).
+
+    Each item goes through the same engine selection and result cache as
+    /extract; at most OCR_BATCH_CONCURRENCY (default: OCR pool workers) run at
+    once. Returns `items` in input order, each with `status` and either
+    `result` or `error`; one failing item does not fail the batch. With
+    `stream=true` the response is server-sent events: one `item` event per
+    item as it completes (carrying its `index`), then `done`.
+    """
+    items = await _batch_items(files)
+    max_files = int(os.getenv("OCR_BATCH_MAX_FILES", "50"))
+    if max_files and len(items) > max_files:
+        raise HTTPException(status_code=413, detail=f"Batch has {len(items)} images; the limit is {max_files}")
+
+    bypass = _wants_fresh(request)
+    semaphore = asyncio.Semaphore(_batch_concurrency())
+
+    async def run(index: int, item: Dict) -> Dict:
+        entry = {"index": index, "filename": item["filename"], "page": item["page"]}
+        async with semaphore:
+            try:
+                result, cache_headers = await _extract_one(
+                    item["bytes"], item["mime_type"], language, extractor, bypass=bypass
+                )
+            except HTTPException as e:
+                entry.update(status=e.status_code, error=e.detail)
+                if e.headers and "Retry-After" in e.headers:
+                    entry["retry_after"] = int(e.headers["Retry-After"])
+                return entry
+        entry.update(status=200, cache=cache_headers.get("X-Cache"), result=result)
+        return entry
+
+    def summary(entries: List[Dict]) -> Dict:
+        succeeded = sum(1 for e in entries if e["status"] == 200)
+        return {"count": len(entries), "succeeded": succeeded, "failed": len(entries) - succeeded}
+
+    if not stream:
+        entries = await asyncio.gather(*(run(i, item) for i, item in enumerate(items)))
+        return {**summary(entries), "items": entries}
+
+    async def body() -> AsyncIterator[str]:
+        tasks = [asyncio.ensure_future(run(i, item)) for i, item in enumerate(items)]
+        entries = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                entry = await next_done
+                entries.append(entry)
+                yield _sse("item", entry)
+            yield _sse("done", summary(entries))
+        finally:
+            # Client went away: stop the items that have not finished
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _replay(result: Dict) -> AsyncIterator[Tuple[str, Dict]]:
+    """Cached results are sent as the same event sequence a live extraction produces."""
+    yield "patient_name", {"patient_name": result.get("patient_name")}
+    for drug in result.get("drug_candidates") or []:
+        yield "drug_candidate", drug
+    yield "result", result
+
+
+async def _live_events(
+    image_bytes: bytes, mime_type: str, language: str, ocr_engine: str, extractor: GeminiExtractor
+) -> AsyncIterator[Tuple[str, Dict]]:
+    if ocr_engine == "gemini":
+        async for event in extractor.stream_prescription_data(image_bytes, mime_type=mime_type, language=language):
+            yield event
+        return
+
+    ocr_result = await OCR_POOL.run(process_prescription_image, image_bytes, preferred="pytesseract")
+    raw_text = ocr_result.get("raw_ocr_text", "")
+    if not raw_text:
+        raise ValueError("Tesseract failed to extract any text.")
+    async for event in extractor.stream_from_text(raw_text, language=language):
+        yield event
+
+
+@router.post("/extract-stream")
+async def extract_text_stream(
+    request: Request,
+    file: UploadFile = File(...),
+    language: str = Form("English"),
+    extractor: GeminiExtractor = Depends(get_gemini_extractor),
+) -> StreamingResponse:
+    """
+    Streaming variant of /extract as server-sent events.
+
+    Emits `patient_name` and one `drug_candidate` per medicine as soon as each is
+    complete in Gemini's streamed output, then `result` with the same payload
+    /extract returns. Failures after the stream has started arrive as an `error`
+    event with `status`, `detail` and (for 503s) `retry_after`. Cached results
+    are replayed as the same event sequence.
+    """
+    image_bytes = await file.read()
+    if not image_bytes:
+        raise HTTPException(status_code=400, detail="Empty file uploaded")
+
+    ocr_engine = os.getenv("OCR_ENGINE", "gemini").lower()
+    if ocr_engine not in ["gemini", "tesseract", "hybrid", "pytesseract"]:
+        raise HTTPException(status_code=400, detail="OCR_ENGINE must be set to 'gemini' or 'tesseract'.")
+    if not extractor.api_key:
+        raise HTTPException(status_code=500, detail="Gemini API Key not found. Please set GOOGLE_API_KEY.")
+
+    cache_key = _cache_key(image_bytes, ocr_engine, language)
+    cached, cache_headers, fp = await _lookup_cache(image_bytes, cache_key, bypass=_wants_fresh(request))
+    if cached is not None:
+        events = _replay(cached)
+    else:
+        events = _live_events(image_bytes, file.content_type, language, ocr_engine, extractor)
+
+    async def body() -> AsyncIterator[str]:
+        try:
+            async for event, data in events:
+                if event == "result" and cached is None:
+                    await _store(cache_key, data, fp)
+                yield _sse(event, data)
+        except RateLimitExceeded as e:
+            logger.warning(f"Streaming extraction shed: {e}")
+            yield _sse("error", {"status": 503, "detail": f"Extraction service is busy, please retry: {e}",
+                                 "retry_after": max(1, math.ceil(e.retry_after))})
+        except PoolSaturated as e:
+            logger.warning(f"Streaming extraction rejected: {e}")
+            yield _sse("error", {"status": 503, "detail": str(e), "retry_after": 5})
+        except Exception as e:
+            logger.error(f"Streaming extraction failed: {e}")
+            yield _sse("error", {"status": 500, "detail": f"Extraction Failed: {str(e)}"})
+
+    headers = dict(cache_headers)
+    headers.update({"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    return StreamingResponse(body(), media_type="text/event-stream", headers=headers)
+
+
+@router.get("/stats")
+async def ocr_stats(extractor: GeminiExtractor = Depends(get_gemini_extractor)) -> Dict:
+    """Runtime counters for the OCR pipeline (match and result caches, local models, worker pool, Gemini client)."""
+    return {
+        "drug_match_cache": DRUG_MATCH_CACHE.stats(),
+        "medicine_match_cache": fuzzy_matching.MATCH_CACHE.stats(),
+        "models": MODELS.status(),
+        "worker_pool": OCR_POOL.stats(),
+        "result_cache": RESULT_CACHE.stats(),
+        "near_duplicates": NEAR_DUPLICATES.stats(),
+        "gemini": extractor.stats(),
+    }
+
+
+@router.get("/engines")
+async def ocr_engines() -> Dict:
+    """Circuit-breaker state per OCR engine (why a request skipped an engine)."""
+    return {"engines": ENGINE_BREAKERS.snapshot()}
@@ -6,6 +6,7 @@ from fastapi import APIRouter, UploadFile, File, HTTPException
 from typing import Dict, List
 import logging
 from ..utils.vision_ocr import process_prescription_image, associate_dosages
+from ..utils.ocr_pool import OCR_POOL, PoolSaturated
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -24,8 +25,8 @@ async def extract_clean(file: UploadFile = File(...)) -> Dict:
         # Read file
         contents = await file.read()
         
-        # Run full pipeline
-        result = process_prescription_image(contents)
+        # Run full pipeline in the worker pool so the event loop stays responsive
+        result = await OCR_POOL.run(process_prescription_image, contents)
         
         # Extract only medicines with dosages
         drug_candidates = result.get('drug_candidates', [])
@@ -47,6 +48,9 @@ async def extract_clean(file: UploadFile = File(...)) -> Dict:
             'medicines': clean_medicines
         }
         
+    except PoolSaturated as e:
+        logger.warning(f"OCR extraction rejected: {e}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         logger.error(f"OCR extraction failed: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to extract: {str(e)}")
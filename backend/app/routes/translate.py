@@ -1,8 +1,11 @@
 ﻿
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import Optional
-from ..services.translator import translate_text
+from ..services.translator import TRANSLATE_FLIGHTS, translate_text
+from ..utils.glossary import GLOSSARY
+from ..utils.translation_memory import TRANSLATION_MEMORY
 
 router = APIRouter()
 
@@ -17,7 +20,15 @@ async def translate_content(request: TranslationRequest):
     Note: Endpoint is /content relative to /translate prefix
     """
     try:
-        translated_text = translate_text(request.text, request.target_lang)
+        # deep_translator blocks on HTTP; keep it off the event loop
+        translated_text = await run_in_threadpool(translate_text, request.text, request.target_lang)
         return {"translated_text": translated_text}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/stats")
+async def translate_stats():
+    """Coalescing counters for upstream translation calls, glossary coverage and translation memory hit rates."""
+    stats = await run_in_threadpool(TRANSLATION_MEMORY.stats)
+    return {"single_flight": TRANSLATE_FLIGHTS.stats(), "glossary": GLOSSARY.stats(), "memory": stats}
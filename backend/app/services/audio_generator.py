@@ -1,14 +1,50 @@
 from gtts import gTTS
-import uuid
-import os
+import io
+from ..utils.audio_cache import AUDIO_CACHE, audio_key
+from ..utils.languages import language_code
+from ..utils.text_chunks import fit, pieces
 
-AUDIO_PATH = "app/static/audio/"
+# Voice id in cache keys; a different engine or voice must not share clips
+VOICE = "gtts"
 
-def generate_audio(text):
-    filename = f"{uuid.uuid4()}.mp3"
-    filepath = AUDIO_PATH + filename
+def lang_code(language):
+    # gTTS takes ISO codes; the frontend sends names
+    return language_code(language)
 
-    tts = gTTS(text=text, lang="en")
-    tts.save(filepath)
+def synthesize(text, language="en"):
+    """MP3 bytes for `text`, rendered in memory."""
+    tts = gTTS(text=text, lang=lang_code(language))
+    mp3_fp = io.BytesIO()
+    tts.write_to_fp(mp3_fp)
+    return mp3_fp.getvalue()
 
-    return f"/static/audio/{filename}"
+def audio_url(key, extension="mp3"):
+    return f"/audio/files/{key}.{extension}"
+
+def generate_audio(text, language="en"):
+    """Synthesize `text` (or reuse the cached clip) and return its URL."""
+    key = audio_key(text, language, VOICE)
+    if AUDIO_CACHE.get(key) is None:
+        AUDIO_CACHE.put(key, synthesize(text, language))
+    return audio_url(key)
+
+def split_sentences(text, max_chars=200, first_max_chars=80):
+    """
+    Split `text` into speakable chunks of at most `max_chars`, on sentence
+    boundaries where possible. Short sentences are merged up to the limit,
+    except the first chunk, which stays short (`first_max_chars`) so
+    playback can start quickly.
+    """
+    chunks = []
+    for sentence in pieces(text.strip()):
+        for part in fit(sentence.strip(), first_max_chars if not chunks else max_chars):
+            part = part.strip()
+            if not part:
+                continue
+            # Chunks are merged only into the last one, whose limit depends on its position
+            limit = first_max_chars if len(chunks) == 1 else max_chars
+            if chunks and len(chunks[-1]) + 1 + len(part) <= limit:
+                chunks[-1] = f"{chunks[-1]} {part}"
+            else:
+                chunks.append(part)
+    return chunks
@@ -0,0 +1,192 @@
+"""
+Indexed drug-lexicon matcher.
+
+Replaces the linear `process.extractOne(query, COMMON_DRUGS, scorer=fuzz.token_sort_ratio)`
+scan with a character-bigram inverted index. Only a short candidate list reaches the
+exact scorer, and the score reported for a candidate is exactly what
+`fuzz.token_sort_ratio` would return for it.
+
+Why bigrams: ratio = 2 * M / (len_a + len_b) where M is the number of matched
+characters. If two padded strings share no bigram, every pair of consecutive
+matches (and both string ends) is separated by an unmatched character, so
+len_a + len_b >= 3M + 1 and the score cannot exceed 67. For the cutoffs we use
+(70/75) every entry that can pass therefore shows up in the posting lists.
+"""
+
+import hashlib
+from collections import Counter, defaultdict
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from fuzzywuzzy import fuzz, utils
+
+from ..utils.lru_cache import LRUCache, MISSING
+
+try:
+    from rapidfuzz import fuzz as rf_fuzz, process as rf_process
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
+# Upper bound on query x lexicon cells scored per cdist call (float32 => 4 bytes each)
+BATCH_MAX_CELLS = 4_000_000
+
+
+def sort_key(text: str) -> str:
+    """Normalize text the same way `fuzz.token_sort_ratio` does before scoring."""
+    processed = utils.full_process(text, force_ascii=True)
+    return " ".join(sorted(processed.split())).strip()
+
+
+def bigrams(key: str) -> Dict[str, int]:
+    """Space-padded character bigrams of a normalized key, with multiplicities."""
+    padded = f" {key} "
+    grams: Dict[str, int] = defaultdict(int)
+    for i in range(len(padded) - 1):
+        grams[padded[i:i + 2]] += 1
+    return grams
+
+
+class DrugIndex:
+    """
+    Bigram inverted index over a drug lexicon.
+
+    `extract_one` mirrors `process.extractOne(query, names, scorer=fuzz.token_sort_ratio)`:
+    it returns `(name, score)` for the best-scoring entry, preferring the earliest entry
+    in lexicon order on ties. Candidates are the `max_candidates` entries with the best
+    bigram overlap that can still reach `score_cutoff` by length; the cap is the only
+    approximation, and it only matters once the lexicon is far larger than the cap.
+
+    With a `cache`, best matches are memoized per (normalized query, cutoff) across
+    calls. The cache is bound to the lexicon `version`, a hash of its contents.
+    """
+
+    def __init__(self, names: Iterable[str], max_candidates: int = 64, cache: Optional[LRUCache] = None):
+        self.names: List[str] = list(names)
+        self.keys: List[str] = [sort_key(n) for n in self.names]
+        self.max_candidates = max_candidates
+        self.version = hashlib.sha1("\n".join(self.names).encode("utf-8")).hexdigest()[:12]
+        self.cache = cache
+        if self.cache is not None:
+            self.cache.bind(self.version)
+        self._key_lengths = np.array([len(k) for k in self.keys], dtype=np.float64)
+        self._gram_counts: List[int] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        for idx, key in enumerate(self.keys):
+            self._gram_counts.append(len(key) + 1)
+            for gram in bigrams(key):
+                self._postings[gram].append(idx)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def candidates(self, query_key: str, score_cutoff: int = 0) -> List[int]:
+        """Return lexicon ids worth exact-scoring for an already-normalized query."""
+        # Counter over the chained posting lists keeps the counting loop in C.
+        counts = Counter(chain.from_iterable(
+            self._postings.get(gram, ()) for gram in bigrams(query_key)
+        ))
+
+        # Shortlist by raw shared-gram count (C-level heap), then re-rank the
+        # shortlist by Dice overlap so long entries do not win on raw counts.
+        shortlist = [idx for idx, _ in counts.most_common(self.max_candidates * 8)]
+
+        # M <= min(len_a, len_b), so entries too short or too long for the
+        # cutoff can never pass regardless of their content.
+        qlen = len(query_key)
+        threshold = (score_cutoff - 0.5) / 100.0
+        feasible = [
+            idx for idx in shortlist
+            if threshold <= 0
+            or 2.0 * min(qlen, len(self.keys[idx])) / (qlen + len(self.keys[idx])) >= threshold
+        ]
+        grams = qlen + 1
+        feasible.sort(key=lambda idx: (-counts[idx] / (grams + self._gram_counts[idx]), idx))
+        return sorted(feasible[:self.max_candidates])
+
+    def extract_one(self, query: str, score_cutoff: int = 0) -> Optional[Tuple[str, int]]:
+        """Best `(name, token_sort_ratio score)` for `query`, or None below `score_cutoff`."""
+        query_key = sort_key(query)
+        if not query_key:
+            return None
+        cached = self._cache_get(query_key, score_cutoff)
+        if cached is not MISSING:
+            return cached
+        best = self._best_for_key(query_key, score_cutoff)
+        self._cache_put(query_key, score_cutoff, best)
+        return best
+
+    def extract_many(self, queries: Iterable[str], score_cutoff: int = 0) -> Dict[str, Optional[Tuple[str, int]]]:
+        """
+        Batch version of `extract_one`: returns {query: best match or None}.
+
+        Queries are deduplicated on their normalized key first. With rapidfuzz
+        installed the whole query x lexicon matrix is scored in C (`cdist`,
+        all cores), which is exhaustive rather than shortlist-based.
+        """
+        keys_by_query = {q: sort_key(q) for q in queries}
+        best_by_key: Dict[str, Optional[Tuple[str, int]]] = {}
+        pending = []
+        for key in dict.fromkeys(k for k in keys_by_query.values() if k):
+            cached = self._cache_get(key, score_cutoff)
+            if cached is MISSING:
+                pending.append(key)
+            else:
+                best_by_key[key] = cached
+
+        if RAPIDFUZZ_AVAILABLE and pending and self.keys:
+            scored = self._cdist_best(pending, score_cutoff)
+        else:
+            scored = {k: self._best_for_key(k, score_cutoff) for k in pending}
+        for key, best in scored.items():
+            self._cache_put(key, score_cutoff, best)
+        best_by_key.update(scored)
+
+        return {q: best_by_key.get(k) for q, k in keys_by_query.items()}
+
+    def _cache_get(self, query_key: str, score_cutoff: int):
+        if self.cache is None:
+            return MISSING
+        return self.cache.get((query_key, score_cutoff))
+
+    def _cache_put(self, query_key: str, score_cutoff: int, best: Optional[Tuple[str, int]]) -> None:
+        if self.cache is not None:
+            self.cache.put((query_key, score_cutoff), best)
+
+    def _best_for_key(self, query_key: str, score_cutoff: int) -> Optional[Tuple[str, int]]:
+        best: Optional[Tuple[str, int]] = None
+        for idx in self.candidates(query_key, score_cutoff):
+            # token_sort_ratio(a, b) == ratio(sort_key(a), sort_key(b))
+            score = fuzz.ratio(query_key, self.keys[idx])
+            if best is None or score > best[1]:
+                best = (self.names[idx], score)
+
+        if best is None or best[1] < score_cutoff:
+            return None
+        return best
+
+    def _cdist_best(self, query_keys: List[str], score_cutoff: int) -> Dict[str, Optional[Tuple[str, int]]]:
+        results: Dict[str, Optional[Tuple[str, int]]] = {}
+        rows = max(1, BATCH_MAX_CELLS // len(self.keys))
+        for start in range(0, len(query_keys), rows):
+            chunk = query_keys[start:start + rows]
+            # A fuzzywuzzy score of `score_cutoff` can come from a raw ratio as low
+            # as score_cutoff - 0.5, so let cdist zero out only what is safely below.
+            raw = rf_process.cdist(
+                chunk, self.keys, scorer=rf_fuzz.ratio, dtype=np.float32,
+                workers=-1, score_cutoff=max(0, score_cutoff - 1),
+            )
+            # Snap float scores back to integer match counts M and round exactly
+            # like fuzzywuzzy: round(100 * (2M / (len_a + len_b))), half to even.
+            total = np.array([len(k) for k in chunk], dtype=np.float64)[:, None] + self._key_lengths[None, :]
+            matches = np.rint(raw * total / 200.0)
+            scores = np.round(100.0 * (2.0 * matches / total))
+
+            # argmax returns the first maximum, i.e. lexicon order on ties
+            best_idx = scores.argmax(axis=1)
+            best_scores = scores[np.arange(len(chunk)), best_idx]
+            for key, idx, score in zip(chunk, best_idx, best_scores):
+                score = int(score)
+                results[key] = (self.names[idx], score) if score >= score_cutoff else None
+        return results
@@ -0,0 +1,146 @@
+"""
+Dictionary-based medical entity tagging.
+
+Drugs (names and their variants), dosage forms, routes, symptoms, frequency
+phrases and dosage units are compiled into one Aho-Corasick automaton. A text
+is tagged in a single pass, in time linear in its length however large the
+lexicons grow. Matches are whole words, case-insensitive, leftmost-longest
+("twice daily" over "daily", "Pan D" over "Pan").
+
+Lexicons:
+- drugs: backend/app/data/medicines.json and supabase/seed/medicines.csv (with `variants`)
+- symptoms: supabase/seed/medical_terms.csv rows with category "symptom"
+- form abbreviations: supabase/seed/abbrev.csv ("Cap." -> Capsule)
+- frequency codes: supabase/seed/dosage_rules.csv ("1-0-1" -> Morning and Night)
+- plus the built-in lists below
+"""
+
+import csv
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from ..utils.aho_corasick import AhoCorasick, Match, is_word_boundary
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+SEED_DIR = Path(__file__).parent.parent.parent.parent / "supabase" / "seed"
+
+DRUG, FORM, ROUTE, SYMPTOM, FREQUENCY, DOSAGE = "Drug", "Form", "Route", "Symptom", "Frequency", "Dosage"
+
+FORMS = {
+    "tablet": "Tablet", "tablets": "Tablet", "tab": "Tablet", "tab.": "Tablet",
+    "capsule": "Capsule", "capsules": "Capsule", "cap": "Capsule",
+    "syrup": "Syrup", "syp": "Syrup", "injection": "Injection", "inj": "Injection", "inj.": "Injection",
+    "cream": "Cream", "ointment": "Ointment", "lotion": "Lotion", "gel": "Gel",
+    "suspension": "Suspension", "solution": "Solution", "powder": "Powder",
+    "drops": "Drops", "eye drops": "Eye drops", "ear drops": "Ear drops", "inhaler": "Inhaler",
+}
+
+ROUTES = {
+    "orally": "Oral", "oral": "Oral", "by mouth": "Oral", "intravenous": "Intravenous",
+    "intravenously": "Intravenous", "intramuscular": "Intramuscular", "subcutaneous": "Subcutaneous",
+    "sublingual": "Sublingual", "topical": "Topical", "topically": "Topical", "inhaled": "Inhalation",
+    "nasal": "Nasal", "rectal": "Rectal",
+}
+
+SYMPTOMS = [
+    "fever", "headache", "cough", "pain", "cold", "body pain", "sore throat", "vomiting", "nausea",
+    "diarrhea", "diarrhoea", "acidity", "gastritis", "constipation", "dizziness", "rash", "itching",
+    "allergy", "infection", "inflammation", "high blood pressure", "chest pain", "stomach pain",
+    "back pain", "joint pain", "breathlessness", "fatigue", "weakness",
+]
+
+FREQUENCIES = {
+    "once daily": "Once daily", "once a day": "Once daily", "od": "Once daily",
+    "twice daily": "Twice daily", "twice a day": "Twice daily", "bd": "Twice daily", "bid": "Twice daily",
+    "thrice daily": "Thrice daily", "three times a day": "Thrice daily", "tds": "Thrice daily",
+    "tid": "Thrice daily", "four times a day": "Four times daily", "qid": "Four times daily",
+    "at bedtime": "At bedtime", "hs": "At bedtime", "as needed": "As needed", "prn": "As needed",
+    "sos": "As needed", "twice": "Twice", "thrice": "Thrice", "daily": "Daily",
+    "every morning": "Every morning", "every night": "Every night",
+}
+
+UNITS = ["mg", "mcg", "g", "gm", "ml", "iu", "units"]
+
+
+def _read_csv(path: Path) -> List[Dict[str, str]]:
+    try:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            return list(csv.DictReader(f))
+    except OSError as e:
+        logger.warning(f"Entity lexicon not loaded ({path}): {e}")
+        return []
+
+
+def drug_lexicon(data_dir: Path = DATA_DIR, seed_dir: Path = SEED_DIR) -> Dict[str, str]:
+    """{surface form: canonical drug name} from medicines.json and medicines.csv (with variants)."""
+    drugs: Dict[str, str] = {}
+    try:
+        with open(data_dir / "medicines.json", "r", encoding="utf-8") as f:
+            drugs.update((name, name) for name in json.load(f))
+    except (OSError, ValueError) as e:
+        logger.warning(f"Entity lexicon not loaded (medicines.json): {e}")
+    for row in _read_csv(seed_dir / "medicines.csv"):
+        name = (row.get("name") or "").strip()
+        if not name:
+            continue
+        drugs[name] = name
+        for variant in (row.get("variants") or "").split("|"):
+            if variant.strip():
+                drugs[variant.strip()] = name
+    return drugs
+
+
+def default_vocabulary(data_dir: Path = DATA_DIR, seed_dir: Path = SEED_DIR) -> Dict[str, Tuple[str, str]]:
+    """{surface form: (entity type, canonical form)}. Later groups win on collisions, so drugs win."""
+    vocabulary: Dict[str, Tuple[str, str]] = {}
+    vocabulary.update((unit, (DOSAGE, unit)) for unit in UNITS)
+    vocabulary.update((term, (FREQUENCY, canonical)) for term, canonical in FREQUENCIES.items())
+    for row in _read_csv(seed_dir / "dosage_rules.csv"):
+        if row.get("pattern") and row.get("meaning"):
+            vocabulary[row["pattern"].strip()] = (FREQUENCY, row["meaning"].strip())
+    vocabulary.update((term, (ROUTE, canonical)) for term, canonical in ROUTES.items())
+    vocabulary.update((term, (FORM, canonical)) for term, canonical in FORMS.items())
+    for row in _read_csv(seed_dir / "abbrev.csv"):
+        if row.get("short") and row.get("expanded"):
+            vocabulary[row["short"].strip()] = (FORM, row["expanded"].strip())
+    vocabulary.update((term, (SYMPTOM, term)) for term in SYMPTOMS)
+    for row in _read_csv(seed_dir / "medical_terms.csv"):
+        if (row.get("category") or "").strip().lower() == "symptom" and row.get("english_term"):
+            vocabulary[row["english_term"].strip()] = (SYMPTOM, row["english_term"].strip().lower())
+    vocabulary.update((surface, (DRUG, name)) for surface, name in drug_lexicon(data_dir, seed_dir).items())
+    return vocabulary
+
+
+def _accept(text: str, match: Match) -> bool:
+    if is_word_boundary(text, match.start, match.end):
+        return True
+    # Units may follow their quantity directly ("500mg")
+    return (
+        match.value[0] == DOSAGE and match.start > 0 and text[match.start - 1].isdigit()
+        and (match.end == len(text) or not text[match.end].isalnum())
+    )
+
+
+class EntityExtractor:
+    def __init__(self, vocabulary: Dict[str, Tuple[str, str]]):
+        self.matcher = AhoCorasick(vocabulary)
+
+    def __len__(self) -> int:
+        return len(self.matcher)
+
+    def extract(self, text: str) -> List[Dict]:
+        """Entities in `text`, in order: matched text, type, canonical form and character offsets."""
+        return [
+            {"text": text[m.start:m.end], "type": m.value[0], "canonical": m.value[1], "start": m.start, "end": m.end}
+            for m in self.matcher.find(text, accept=_accept)
+        ]
+
+    def extract_many(self, texts: Iterable[str]) -> List[List[Dict]]:
+        return [self.extract(text) for text in texts]
+
+
+ENTITY_EXTRACTOR = EntityExtractor(default_vocabulary())
@@ -1,13 +1,30 @@
+import hashlib
+import os
+
 from rapidfuzz import process
 
+from ..utils.lru_cache import LRUCache, MISSING
+
 MEDICINES = [
     "Acemiz-CT", "OfloPod", "Pan-D", "Ascodil-D",
     "Coscavelt-LM", "Emfolt", "Montair-LC"
 ]
 
+# word -> (best match, score); bound to the current MEDICINES contents
+MATCH_CACHE = LRUCache(maxsize=int(os.getenv("MEDICINE_MATCH_CACHE_SIZE", "20000")))
+
+def _lexicon_version():
+    return hashlib.sha1("\n".join(MEDICINES).encode("utf-8")).hexdigest()[:12]
+
 def correct_medicines(text):
+    MATCH_CACHE.bind(_lexicon_version())
     corrected = []
     for word in text.split():
-        match, score, _ = process.extractOne(word, MEDICINES)
+        best = MATCH_CACHE.get(word)
+        if best is MISSING:
+            match, score, _ = process.extractOne(word, MEDICINES)
+            best = (match, score)
+            MATCH_CACHE.put(word, best)
+        match, score = best
         corrected.append(match if score > 70 else word)
     return " ".join(corrected)
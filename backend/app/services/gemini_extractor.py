@@ -1,159 +1,332 @@
 
+import asyncio
+import math
 import os
 import json
 import logging
+import random
+import re
+from contextlib import asynccontextmanager
+from functools import lru_cache
 import google.generativeai as genai
-from typing import Dict, Optional
+from typing import AsyncIterator, Dict, Optional, Tuple
 from PIL import Image
 import io
 
+from ..utils.image_normalize import max_side_for, prepare_for_upload, read_size
+from ..utils.single_flight import SingleFlight, content_key
+from ..utils.rate_limiter import RateLimiter, RateLimitExceeded
+from ..utils.circuit_breaker import classify_error
+from ..utils.glossary import GLOSSARY
+from ..utils.json_stream import JSONStreamParser
+from ..utils.translation_memory import TRANSLATION_MEMORY
+
 logger = logging.getLogger(__name__)
 
+GEMINI_MODEL = 'gemini-2.5-flash'
+# Translation memory engine for Gemini translations
+TRANSLATION_ENGINE = f"gemini:{GEMINI_MODEL}"
+HYBRID_ENGINE = "tesseract+gemini"
+IMAGE_CONFIDENCE_NOTE = "Confidence scores not directly available from generative extraction"
+HYBRID_CONFIDENCE_NOTE = "Hybrid extraction"
+# Bump when the extraction prompts or output shape change; part of the result cache key
+PROMPT_VERSION = "1"
+
+# Identical concurrent calls (double submits, several people scanning the same
+# prescription) share one upstream request
+GEMINI_FLIGHTS = SingleFlight("gemini")
+
+# Client-side quota: GEMINI_RPM / GEMINI_TPM per worker (defaults match the free
+# tier of gemini-2.5-flash), queueing up to GEMINI_QUEUE_TIMEOUT_S
+GEMINI_LIMITER = RateLimiter.from_env("GEMINI", rpm=10, tpm=250_000)
+
+# Gemini bills images in 768x768 tiles of 258 tokens; responses are ~1k tokens
+IMAGE_TILE_TOKENS = 258
+EXPECTED_OUTPUT_TOKENS = 1024
+
+
+def estimate_tokens(prompt: str, image_bytes: Optional[bytes] = None) -> int:
+    """Rough request + response token count, used to reserve TPM budget before a call."""
+    tokens = len(prompt) // 4 + EXPECTED_OUTPUT_TOKENS
+    if image_bytes is not None:
+        size = read_size(image_bytes) or (768, 768)
+        tokens += IMAGE_TILE_TOKENS * math.ceil(size[0] / 768) * math.ceil(size[1] / 768)
+    return tokens
+
+
+def _server_retry_delay(exc: BaseException) -> float:
+    """Retry delay suggested in a 429 message ("retry in 12.5s" / "retry_delay { seconds: 12 }")."""
+    match = re.search(r"retry\D{0,20}?(\d+(?:\.\d+)?)", str(exc), re.IGNORECASE)
+    return float(match.group(1)) if match else 0.0
+
 class GeminiExtractor:
+    """
+    Gemini client shared by every request (see `get_gemini_extractor`).
+
+    Calls go through `generate_content_async`, whose gRPC asyncio channel is created
+    once per process and multiplexes concurrent requests over pooled HTTP/2
+    connections. At most GEMINI_MAX_CONCURRENCY calls are in flight per worker;
+    the rest wait for a slot without blocking the event loop.
+
+    Every call first reserves budget from GEMINI_LIMITER. A 429 is retried with
+    jittered exponential backoff (GEMINI_MAX_RETRIES); when the budget or the
+    retries run out, `RateLimitExceeded` is raised. Fabricated results are never
+    returned instead.
+    """
+
     def __init__(self):
         self.api_key = os.getenv("GOOGLE_API_KEY")
+        self.max_in_flight = int(os.getenv("GEMINI_MAX_CONCURRENCY", "16"))
+        self.in_flight = 0
+        self.waiting = 0
+        self.calls = 0
+        self.quota_errors = 0
+        self.max_retries = int(os.getenv("GEMINI_MAX_RETRIES", "3"))
+        self.retry_base = float(os.getenv("GEMINI_RETRY_BASE_S", "1"))
+        self.retry_max = float(os.getenv("GEMINI_RETRY_MAX_S", "20"))
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
         if not self.api_key:
             logger.warning("GOOGLE_API_KEY not found. Gemini extraction will fail.")
         else:
             genai.configure(api_key=self.api_key)
             print(f"[DEBUG] Configured Gemini with Key: ...{self.api_key[-5:] if self.api_key else 'None'}")
-            self.model = genai.GenerativeModel('gemini-2.5-flash')
+            self.model = genai.GenerativeModel(GEMINI_MODEL)
+
+    @asynccontextmanager
+    async def _slot(self):
+        """Bound in-flight calls for this event loop."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._semaphore_loop = loop
+        semaphore = self._semaphore
+        self.waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            semaphore.release()
+
+    async def _generate(self, contents, estimated_tokens: int = EXPECTED_OUTPUT_TOKENS):
+        for attempt in range(self.max_retries + 1):
+            await GEMINI_LIMITER.acquire(estimated_tokens)
+            try:
+                async with self._slot():
+                    self.calls += 1
+                    response = await self.model.generate_content_async(contents)
+            except Exception as e:
+                await self._backoff(e, attempt)
+                continue
+            usage = getattr(response, "usage_metadata", None)
+            GEMINI_LIMITER.settle(estimated_tokens, getattr(usage, "total_token_count", None))
+            return response
+
+    async def _backoff(self, exc: Exception, attempt: int) -> None:
+        """Sleep before retrying a 429; re-raise anything else, or RateLimitExceeded when out of retries."""
+        if classify_error(exc) != "quota":
+            raise exc
+        self.quota_errors += 1
+        # Full jitter, but never sooner than the server asked for
+        delay = random.uniform(0, min(self.retry_max, self.retry_base * 2 ** attempt))
+        delay = max(delay, _server_retry_delay(exc))
+        if attempt == self.max_retries or delay > self.retry_max:
+            raise RateLimitExceeded(f"Gemini quota exhausted: {exc}", retry_after=max(delay, self.retry_base))
+        logger.warning(f"Gemini rate limited (attempt {attempt + 1}); retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+    async def _generate_stream(self, contents, estimated_tokens: int) -> AsyncIterator[str]:
+        """Stream response text chunks. A 429 is retried only before the first chunk arrives."""
+        for attempt in range(self.max_retries + 1):
+            await GEMINI_LIMITER.acquire(estimated_tokens)
+            streamed = False
+            try:
+                async with self._slot():
+                    self.calls += 1
+                    response = await self.model.generate_content_async(contents, stream=True)
+                    async for chunk in response:
+                        streamed = True
+                        yield chunk.text
+            except Exception as e:
+                if streamed:
+                    raise
+                await self._backoff(e, attempt)
+                continue
+            usage = getattr(response, "usage_metadata", None)
+            GEMINI_LIMITER.settle(estimated_tokens, getattr(usage, "total_token_count", None))
+            return
+
+    def stats(self) -> Dict:
+        return {
+            "configured": bool(self.api_key),
+            "model": GEMINI_MODEL,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "calls": self.calls,
+            "quota_errors": self.quota_errors,
+            "rate_limiter": GEMINI_LIMITER.stats(),
+            "single_flight": GEMINI_FLIGHTS.stats(),
+        }
 
     async def extract_prescription_data(self, image_bytes: bytes, mime_type: str = "image/jpeg", language: str = "English") -> Dict:
         """
         Extracts structured prescription data from an image using Gemini Flash.
+        Concurrent calls with the same image and options are coalesced.
         """
+        key = content_key("image", GEMINI_MODEL, PROMPT_VERSION, image_bytes, mime_type, language)
+        return await GEMINI_FLIGHTS.run(key, lambda: self._extract_prescription_data(image_bytes, mime_type, language))
+
+    async def stream_prescription_data(
+        self, image_bytes: bytes, mime_type: str = "image/jpeg", language: str = "English"
+    ) -> AsyncIterator[Tuple[str, Dict]]:
+        """Streaming variant of `extract_prescription_data`; see `_stream_extraction`."""
         if not self.api_key:
-            # Return mock data if no key is configured, useful for dev without keys
-            logger.warning("No API Key. Returning mock data.")
-            return self._get_mock_data(language)
+            raise ValueError("GOOGLE_API_KEY is missing. Please set it in your .env file.")
+        contents, estimated_tokens = await self._image_request(image_bytes, mime_type, language)
+        async for event in self._stream_extraction(contents, estimated_tokens, GEMINI_MODEL, IMAGE_CONFIDENCE_NOTE):
+            yield event
 
-        try:
-            # Create the image part directly with bytes and mime_type
-            image_part = {
-                "mime_type": mime_type,
-                "data": image_bytes
-            }
+    async def stream_from_text(self, text: str, language: str = "English") -> AsyncIterator[Tuple[str, Dict]]:
+        """Streaming variant of `extract_from_text`; see `_stream_extraction`."""
+        if not self.api_key:
+            raise ValueError("GOOGLE_API_KEY is missing. Please set it in your .env file.")
+        prompt, estimated_tokens = self._text_request(text, language)
+        async for event in self._stream_extraction(prompt, estimated_tokens, HYBRID_ENGINE, HYBRID_CONFIDENCE_NOTE):
+            yield event
 
-            prompt = f"""
-            You are an expert medical pharmacist assistant. Analyze this prescription image and extract the following information in strict JSON format.
-            
-            Focus ONLY on the Patient Name and the Medicines prescribed. 
-            
-            Instructions:
-            1. **Medicines**: Extract the exact brand name or generic name of the drug.
-               - Look for drug names like 'Paracetamol', 'Augmentin', 'Dolo', 'Pan 40', etc.
-               - Ignore isolated numbers or small random text.
-               - Infer valid dosages (e.g., '500mg', '10ml') and frequencies (e.g., 'BD', 'QD', '1-0-1').
-            2. **Patient Name**: Look for "Name:", "Pt Name:", or a name at the top of the prescription.
-            
-            IMPORTANT:
-            - Provide the 'description' and 'category' fields strictly in {language} language.
-            - Provide the 'drug' name in its original language (as seen on prescription) but you may transliterate to {language} in parentheses if useful.
-            - Keep JSON keys in English.
-            
-            IGNORE:
-            - Hospital details, doctor degrees, phone numbers, addresses.
-            - Patient vitals (BP, Weight, etc.).
-            - Diagnosis or symptoms.
-            
-            Return ONLY the JSON object, no markdown formatting.
-            
-            Structure:
-            {{
-                "patient_name": "Name found or null",
-                "drug_candidates": [
-                    {{
-                        "drug": "Exact Name of drug",
-                        "category": "Therapeutic category (in {language})",
-                        "description": "Short explanation of use (1 sentence in {language}).",
-                        "score": 100,
-                        "dosages": ["500mg", "Tablet", etc],
-                        "frequencies": ["once daily", "1-0-1", etc]
-                    }}
-                ],
-                "raw_ocr_text": "Summary of extracted medicines."
-            }}
-            
-            If a field is not found, return null or empty list.
-            """
+    async def _stream_extraction(self, contents, estimated_tokens: int, ocr_engine: str, note: str):
+        """
+        Yield ("patient_name", {...}) and one ("drug_candidate", {...}) per drug as soon
+        as each is complete in the streamed JSON, then ("result", full_result) with the
+        same shape `extract_prescription_data` returns.
+        """
+        parser = JSONStreamParser()
+        data: Dict = {}
+        async for text in self._generate_stream(contents, estimated_tokens):
+            for kind, key, value in parser.feed(text):
+                if kind == "field":
+                    data[key] = value
+                    if key == "patient_name":
+                        yield "patient_name", {"patient_name": value}
+                elif key == "drug_candidates" and isinstance(value, dict):
+                    yield "drug_candidate", value
+        if not parser.done:
+            raise ValueError("Gemini stream ended before the JSON object was complete")
+        yield "result", self._finalize(data, ocr_engine, note)
+
+    async def _image_request(self, image_bytes: bytes, mime_type: str, language: str) -> Tuple[list, int]:
+        """Gemini contents for an image extraction and their estimated token cost."""
+        # Phone photos are 12+ MP; downscale and recompress before upload
+        image_bytes, mime_type = await asyncio.to_thread(
+            prepare_for_upload,
+            image_bytes,
+            mime_type,
+            max_side_for("gemini"),
+            int(os.getenv("GEMINI_JPEG_QUALITY", "85")),
+        )
+
+        # Create the image part directly with bytes and mime_type
+        image_part = {
+            "mime_type": mime_type,
+            "data": image_bytes
+        }
+
+        prompt = f"""
+        You are an expert medical pharmacist assistant. Analyze this prescription image and extract the following information in strict JSON format.
+        
+        Focus ONLY on the Patient Name and the Medicines prescribed. 
+        
+        Instructions:
+        1. **Medicines**: Extract the exact brand name or generic name of the drug.
+           - Look for drug names like 'Paracetamol', 'Augmentin', 'Dolo', 'Pan 40', etc.
+           - Ignore isolated numbers or small random text.
+           - Infer valid dosages (e.g., '500mg', '10ml') and frequencies (e.g., 'BD', 'QD', '1-0-1').
+        2. **Patient Name**: Look for "Name:", "Pt Name:", or a name at the top of the prescription.
+        
+        IMPORTANT:
+        - Provide the 'description' and 'category' fields strictly in {language} language.
+        - Provide the 'drug' name in its original language (as seen on prescription) but you may transliterate to {language} in parentheses if useful.
+        - Keep JSON keys in English.
+        
+        IGNORE:
+        - Hospital details, doctor degrees, phone numbers, addresses.
+        - Patient vitals (BP, Weight, etc.).
+        - Diagnosis or symptoms.
+        
+        Return ONLY the JSON object, no markdown formatting.
+        
+        Structure:
+        {{
+            "patient_name": "Name found or null",
+            "drug_candidates": [
+                {{
+                    "drug": "Exact Name of drug",
+                    "category": "Therapeutic category (in {language})",
+                    "description": "Short explanation of use (1 sentence in {language}).",
+                    "score": 100,
+                    "dosages": ["500mg", "Tablet", etc],
+                    "frequencies": ["once daily", "1-0-1", etc]
+                }}
+            ],
+            "raw_ocr_text": "Summary of extracted medicines."
+        }}
+        
+        If a field is not found, return null or empty list.
+        """
 
-            response = self.model.generate_content([prompt, image_part])
+        return [prompt, image_part], estimate_tokens(prompt, image_bytes)
+
+    async def _extract_prescription_data(self, image_bytes: bytes, mime_type: str, language: str) -> Dict:
+        if not self.api_key:
+            raise ValueError("GOOGLE_API_KEY is missing. Please set it in your .env file.")
+
+        try:
+            contents, estimated_tokens = await self._image_request(image_bytes, mime_type, language)
+            response = await self._generate(contents, estimated_tokens)
             
             # Clean response text
             text_response = self._clean_json(response.text)
             
             data = json.loads(text_response.strip())
-            
-            # Add metadata to match the expected application format
-            data["ocr_engine"] = "gemini-2.5-flash"
-             # Mock tokens as Gemini doesn't return per-token confidence in this mode easily
-            data["tokens"] = [] 
-            data["confidence_metrics"] = {
-                "avg_token_confidence": 1.0, 
-                "note": "Confidence scores not directly available from generative extraction"
-            }
-            
-            # Flatten lists for compatibility if needed or ensure types
-            # The current frontend expects specific keys, we try to match them.
-            
-            # Extract dosages/frequencies to top-level lists for compatibility if the frontend relies on them there
-            all_dosages = []
-            all_frequencies = {}
-            for drug in data.get("drug_candidates", []):
-                if "dosages" in drug:
-                    all_dosages.extend(drug["dosages"])
-                if "frequencies" in drug:
-                    # Simple heuristic mapping for the top-level frequency dict
-                    for freq in drug["frequencies"]:
-                        all_frequencies[freq] = [freq] # map key to pattern list
-
-            data["dosages"] = list(set(all_dosages))
-            data["frequencies"] = all_frequencies
-            data["dosage_forms"] = [] # Gemini prompt could be improved to extract forms specifically if needed
-
-            return data
+            return self._finalize(data, GEMINI_MODEL, IMAGE_CONFIDENCE_NOTE)
 
+        except RateLimitExceeded:
+            raise
         except Exception as e:
-            # Check for quota error
-            error_str = str(e)
-            if "429" in error_str or "Quota exceeded" in error_str or "ResourceExhausted" in error_str:
-                logger.warning(f"Gemini Log: Quota exceeded. Returning fallback mock data. Error: {e}")
-                return self._get_mock_data(language)
-            
             logger.error(f"Gemini extraction failed: {e}")
             raise Exception(f"Gemini extraction failed: {str(e)}")
 
-    def _get_mock_data(self, language: str) -> Dict:
-        """Returns mock prescription data when API quota is exceeded."""
-        return {
-            "patient_name": "Guest Patient (Quota Limit)",
-            "drug_candidates": [
-                {
-                    "drug": "Amoxicillin",
-                    "category": "Antibiotic",
-                    "description": "Common antibiotic used for bacterial infections.",
-                    "score": 100,
-                    "dosages": ["500mg"],
-                    "frequencies": ["Twice Daily"]
-                },
-                {
-                    "drug": "Paracetamol",
-                    "category": "Analgesic / Antipyretic",
-                    "description": "Used to relieve pain and reduce fever.",
-                    "score": 98,
-                    "dosages": ["650mg"],
-                    "frequencies": ["After Food"]
-                }
-            ],
-            "raw_ocr_text": "Quota limit reached. Displaying sample data.",
-            "ocr_engine": "mock-fallback",
-            "tokens": [],
-            "confidence_metrics": {"avg_token_confidence": 1.0, "note": "Mock Data"},
-            "dosages": ["500mg", "650mg"],
-            "frequencies": {"Twice Daily": ["Twice Daily"], "After Food": ["After Food"]},
-            "dosage_forms": []
+    def _finalize(self, data: Dict, ocr_engine: str, note: str) -> Dict:
+        """Add metadata and the top-level dosage/frequency lists the frontend expects."""
+        data["ocr_engine"] = ocr_engine
+        # Mock tokens as Gemini doesn't return per-token confidence in this mode easily
+        data["tokens"] = [] 
+        data["confidence_metrics"] = {
+            "avg_token_confidence": 1.0, 
+            "note": note
         }
+        
+        # Extract dosages/frequencies to top-level lists for compatibility if the frontend relies on them there
+        all_dosages = []
+        all_frequencies = {}
+        for drug in data.get("drug_candidates") or []:
+            if "dosages" in drug:
+                all_dosages.extend(drug["dosages"])
+            if "frequencies" in drug:
+                # Simple heuristic mapping for the top-level frequency dict
+                for freq in drug["frequencies"]:
+                    all_frequencies[freq] = [freq] # map key to pattern list
+
+        data["dosages"] = list(set(all_dosages))
+        data["frequencies"] = all_frequencies
+        data["dosage_forms"] = [] # Gemini prompt could be improved to extract forms specifically if needed
+        return data
 
     def _clean_json(self, text: str) -> str:
         """
@@ -201,74 +374,68 @@ class GeminiExtractor:
         # If we didn't find a matching brace, return best effort slice (or whole text)
         return text[start_idx:]
 
-    async def extract_prescription_data(self, image_bytes: bytes, mime_type: str = "image/jpeg", language: str = "English") -> Dict:
-        """
-        Extracts structured prescription data from an image using Gemini Flash.
-        """
-        # ... (rest of the method logic is same, just updating JSON parsing call site)
-        # Using _clean_json would be better but I need to replace the whole block or be careful.
-        # This replace block is getting too large if I replace everything.
-        # Let's just focus on adding _clean_json and updating extract_from_text first, 
-        # then I can apply _clean_json to extract_prescription_data in a separate call or same if contiguous.
-        # However, they are not contiguous. `extract_from_text` is at the bottom.
-        # I will replace `extract_from_text` fully here and add `_clean_json` before it? 
-        # No, `_clean_json` should be a helper. 
-        # I'll just rewrite `extract_from_text` to include the robust parsing logic inline for now to avoid moving unrelated code,
-        # or add the helper at the end or inside.
-        pass
-
     async def extract_from_text(self, text: str, language: str = "English") -> Dict:
         """
         Extracts structured data from raw text using Gemini.
+        Concurrent calls with the same text and language are coalesced.
         """
+        key = content_key("text", GEMINI_MODEL, PROMPT_VERSION, text, language)
+        return await GEMINI_FLIGHTS.run(key, lambda: self._extract_from_text(text, language))
+
+    def _text_request(self, text: str, language: str) -> Tuple[str, int]:
+        """Prompt for a text (hybrid) extraction and its estimated token cost."""
+        prompt = f"""
+        You are an expert medical pharmacist assistant. Analyze the following OCR text from a prescription and extract the information in strict JSON format.
+        
+        OCR TEXT:
+        \"\"\"
+        {text}
+        \"\"\"
+        
+        Focus ONLY on the Patient Name and the Medicines prescribed.
+        
+        IMPORTANT:
+        - Provide the 'description' and 'category' fields strictly in {language} language.
+        - Provide the 'drug' name in its original language.
+        - Keep JSON keys in English.
+
+        IGNORE:
+        - Hospital details (headers, footers, logos)
+        - Doctor names/degrees
+        - Patient Address
+        - Vitals (Temperature, BP, Pulse, Weight, Height)
+        - Clinical Complaints (C/o, Symptoms like 'Fever', 'Body pains')
+        
+        Return ONLY the JSON object, no markdown formatting or other text.
+        
+        Structure:
+        {{
+            "patient_name": "Name found",
+            "drug_candidates": [
+                {{
+                    "drug": "Name of drug",
+                    "category": "Therapeutic category (in {language})",
+                    "description": "A short, simple layman-friendly explanation of what the drug treats (1-2 sentences in {language}).",
+                    "score": 100,
+                    "dosages": ["Tablet", "10ml", etc],
+                    "frequencies": ["once daily", "2x daily", etc]
+                }}
+            ],
+            "raw_ocr_text": "Generate a clean summary list of ONLY the Patient Name and Medicines found. Do NOT include vitals, address, or symptoms here."
+        }}
+        
+        If a field is not found, return null or empty list.
+        """
+
+        return prompt, estimate_tokens(prompt)
+
+    async def _extract_from_text(self, text: str, language: str) -> Dict:
         if not self.api_key:
             raise ValueError("GOOGLE_API_KEY is missing. Please set it in your .env file.")
 
         try:
-            prompt = f"""
-            You are an expert medical pharmacist assistant. Analyze the following OCR text from a prescription and extract the information in strict JSON format.
-            
-            OCR TEXT:
-            \"\"\"
-            {text}
-            \"\"\"
-            
-            Focus ONLY on the Patient Name and the Medicines prescribed.
-            
-            IMPORTANT:
-            - Provide the 'description' and 'category' fields strictly in {language} language.
-            - Provide the 'drug' name in its original language.
-            - Keep JSON keys in English.
-
-            IGNORE:
-            - Hospital details (headers, footers, logos)
-            - Doctor names/degrees
-            - Patient Address
-            - Vitals (Temperature, BP, Pulse, Weight, Height)
-            - Clinical Complaints (C/o, Symptoms like 'Fever', 'Body pains')
-            
-            Return ONLY the JSON object, no markdown formatting or other text.
-            
-            Structure:
-            {{
-                "patient_name": "Name found",
-                "drug_candidates": [
-                    {{
-                        "drug": "Name of drug",
-                        "category": "Therapeutic category (in {language})",
-                        "description": "A short, simple layman-friendly explanation of what the drug treats (1-2 sentences in {language}).",
-                        "score": 100,
-                        "dosages": ["Tablet", "10ml", etc],
-                        "frequencies": ["once daily", "2x daily", etc]
-                    }}
-                ],
-                "raw_ocr_text": "Generate a clean summary list of ONLY the Patient Name and Medicines found. Do NOT include vitals, address, or symptoms here."
-            }}
-            
-            If a field is not found, return null or empty list.
-            """
-
-            response = self.model.generate_content(prompt)
+            prompt, estimated_tokens = self._text_request(text, language)
+            response = await self._generate(prompt, estimated_tokens)
             
             text_response = response.text.strip()
             
@@ -276,31 +443,10 @@ class GeminiExtractor:
             text_response = self._clean_json(text_response)
             
             data = json.loads(text_response.strip())
-            
-            # Metadata
-            data["ocr_engine"] = "tesseract+gemini"
-            data["tokens"] = [] 
-            data["confidence_metrics"] = {
-                "avg_token_confidence": 1.0, 
-                "note": "Hybrid extraction"
-            }
-            
-            # Post-process dosages/frequencies like in image method
-            all_dosages = []
-            all_frequencies = {}
-            for drug in data.get("drug_candidates", []):
-                if "dosages" in drug:
-                    all_dosages.extend(drug["dosages"])
-                if "frequencies" in drug:
-                    for freq in drug["frequencies"]:
-                        all_frequencies[freq] = [freq]
-
-            data["dosages"] = list(set(all_dosages))
-            data["frequencies"] = all_frequencies
-            data["dosage_forms"] = []
-            
-            return data
+            return self._finalize(data, HYBRID_ENGINE, HYBRID_CONFIDENCE_NOTE)
 
+        except RateLimitExceeded:
+            raise
         except Exception as e:
             logger.error(f"Gemini text processing failed: {e}")
             raise Exception(f"Gemini text processing failed: {str(e)}")
@@ -308,10 +454,26 @@ class GeminiExtractor:
     async def translate_text(self, text: str, target_language: str) -> str:
         """
         Translates text to the target language using Gemini.
+        Texts made only of glossary terms are translated offline; anything
+        else goes to Gemini whole. Repeat translations are served from the
+        translation memory; concurrent calls with the same text and language
+        are coalesced. Raises when Gemini is unavailable, rate limited or
+        fails, so callers can tell a fallback from a translation.
         """
+        return await GLOSSARY.translate_async(
+            text, target_language, lambda whole: self._translate_remembered(whole, target_language)
+        )
+
+    async def _translate_remembered(self, text: str, target_language: str) -> str:
+        remembered = await asyncio.to_thread(TRANSLATION_MEMORY.get, text, target_language, "auto", TRANSLATION_ENGINE)
+        if remembered is not None:
+            return remembered
+        key = content_key("translate", GEMINI_MODEL, text, target_language)
+        return await GEMINI_FLIGHTS.run(key, lambda: self._translate_text(text, target_language))
+
+    async def _translate_text(self, text: str, target_language: str) -> str:
         if not self.api_key:
-             # Fallback if no key (shouldn't happen in this flow usually)
-             return text
+            raise Exception("Gemini API key not configured")
 
         try:
             prompt = f"""
@@ -323,13 +485,21 @@ class GeminiExtractor:
             "{text}"
             """
             
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
+            response = await self._generate(prompt, estimate_tokens(prompt))
+            translated = response.text.strip()
+        except RateLimitExceeded as e:
+            logger.warning(f"Translation rate limited: {e}")
+            raise
         except Exception as e:
-            error_str = str(e)
-            if "429" in error_str or "Quota exceeded" in error_str:
-                logger.warning(f"Translation Quota exceeded. Returning original text. Error: {e}")
-                return text # Fallback
-            
             logger.error(f"Translation failed: {e}")
-            return text # Fallback to original text on error
+            raise
+        if not translated:
+            raise Exception("Gemini returned an empty translation")
+        await asyncio.to_thread(TRANSLATION_MEMORY.put, text, translated, target_language, "auto", TRANSLATION_ENGINE)
+        return translated
+
+
+@lru_cache(maxsize=None)
+def get_gemini_extractor() -> GeminiExtractor:
+    """Process-wide GeminiExtractor; use as a FastAPI dependency."""
+    return GeminiExtractor()
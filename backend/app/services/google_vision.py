@@ -1,24 +1,15 @@
 import io
 import logging
 from PIL import Image
-from transformers import TrOCRProcessor, VisionEncoderDecoderModel
 from google.cloud import vision
+from .model_registry import MODELS
 
 logger = logging.getLogger(__name__)
 
-# Load TrOCR model once at startup (lazy load on first use)
-_trocr_processor = None
-_trocr_model = None
-
 def _load_trocr():
-    """Lazy load TrOCR model and processor."""
-    global _trocr_processor, _trocr_model
-    if _trocr_processor is None or _trocr_model is None:
-        logger.info("Loading TrOCR model...")
-        # Use handwritten TrOCR for better prescription handwriting handling
-        _trocr_processor = TrOCRProcessor.from_pretrained("microsoft/trocr-base-handwritten")
-        _trocr_model = VisionEncoderDecoderModel.from_pretrained("microsoft/trocr-base-handwritten")
-    return _trocr_processor, _trocr_model
+    """TrOCR model and processor from the shared registry (loaded once per process)."""
+    # Use handwritten TrOCR for better prescription handwriting handling
+    return MODELS.get("trocr")
 
 async def extract_text_trocr(img_bytes: bytes) -> str:
     """Extract text using TrOCR (local, no billing required)."""
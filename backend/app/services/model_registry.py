@@ -0,0 +1,119 @@
+"""
+Process-wide registry for the local OCR models (EasyOCR, TrOCR).
+
+Each model is loaded at most once per process, under its own lock, so concurrent
+first requests do not load it twice. Weights are read from a local directory
+(`OCR_MODEL_DIR`, default `backend/models`) with downloads disabled; populate it
+once at build time. `warm()` is called from the FastAPI startup hook and
+`status()` reports load time and resident memory for each model.
+"""
+
+import logging
+import os
+import resource
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+MODEL_DIR = Path(os.getenv("OCR_MODEL_DIR", str(Path(__file__).parent.parent.parent / "models")))
+TROCR_MODEL_NAME = "microsoft/trocr-base-handwritten"
+
+
+def _rss_mb() -> float:
+    """Current resident set size in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except Exception:
+        # ru_maxrss is KB on Linux, bytes on macOS; good enough as a fallback
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._models: Dict[str, Any] = {}
+        self._status: Dict[str, Dict] = {}
+
+    def register(self, name: str, loader: Callable[[], Any]) -> None:
+        self._loaders[name] = loader
+        self._locks[name] = threading.Lock()
+        self._status[name] = {"loaded": False}
+
+    def get(self, name: str) -> Any:
+        """Return the loaded model, loading it on first use (once per process)."""
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        with self._locks[name]:
+            # Another thread may have finished loading while we waited
+            if name in self._models:
+                return self._models[name]
+            rss_before = _rss_mb()
+            started = time.perf_counter()
+            try:
+                model = self._loaders[name]()
+            except Exception as e:
+                self._status[name] = {"loaded": False, "error": str(e)[:300]}
+                raise
+            load_time = time.perf_counter() - started
+            rss_after = _rss_mb()
+            self._models[name] = model
+            self._status[name] = {
+                "loaded": True,
+                "load_time_s": round(load_time, 2),
+                "rss_delta_mb": round(rss_after - rss_before, 1),
+                "rss_after_mb": round(rss_after, 1),
+            }
+            logger.info(f"Loaded model {name} in {load_time:.2f}s (+{rss_after - rss_before:.0f}MB RSS)")
+            return model
+
+    def warm(self, names: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+        """Load the given models (default: all registered), logging rather than raising on failure."""
+        for name in names if names is not None else list(self._loaders):
+            if name not in self._loaders:
+                logger.warning(f"Unknown model '{name}' requested for warm-up")
+                continue
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.warning(f"Model {name} failed to warm up: {e}")
+        return self.status()
+
+    def status(self) -> Dict[str, Dict]:
+        return {
+            "model_dir": str(MODEL_DIR),
+            "rss_mb": round(_rss_mb(), 1),
+            "models": {name: dict(s) for name, s in self._status.items()},
+        }
+
+
+def _load_easyocr():
+    import easyocr
+    return easyocr.Reader(
+        ['en'],
+        gpu=False,
+        model_storage_directory=str(MODEL_DIR / "easyocr"),
+        download_enabled=False,
+    )
+
+
+def _load_trocr():
+    from transformers import TrOCRProcessor, VisionEncoderDecoderModel
+    # Prefer a vendored copy; otherwise use the HF cache, but never hit the network
+    local_dir = MODEL_DIR / "trocr-base-handwritten"
+    source = str(local_dir) if local_dir.exists() else TROCR_MODEL_NAME
+    processor = TrOCRProcessor.from_pretrained(source, local_files_only=True)
+    model = VisionEncoderDecoderModel.from_pretrained(source, local_files_only=True)
+    model.eval()
+    return processor, model
+
+
+MODELS = ModelRegistry()
+MODELS.register("easyocr", _load_easyocr)
+MODELS.register("trocr", _load_trocr)
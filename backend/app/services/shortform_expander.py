@@ -1,3 +1,5 @@
+import re
+
 SHORTFORMS = {
     "T.": "Tablet",
     "Tab": "Tablet",
@@ -7,7 +9,12 @@ SHORTFORMS = {
     "SOS": "When Needed",
 }
 
+# Whole tokens only, in one pass: "Tab" inside "Tablet" or "T." at the end of
+# "PAT." is left alone, and an expansion is never expanded again.
+SHORTFORM_RE = re.compile("|".join(
+    r"(?<!\w)" + re.escape(key) + (r"\b" if key[-1].isalnum() else "")
+    for key in sorted(SHORTFORMS, key=len, reverse=True)
+))
+
 def expand_shortforms(text):
-    for key, value in SHORTFORMS.items():
-        text = text.replace(key, value)
-    return text
+    return SHORTFORM_RE.sub(lambda m: SHORTFORMS[m.group()], text)
@@ -1,16 +1,77 @@
 
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 from deep_translator import GoogleTranslator
 
+from ..utils.glossary import GLOSSARY
+from ..utils.single_flight import SingleFlight, content_key
+from ..utils.text_chunks import fit, pieces
+from ..utils.translation_memory import TRANSLATION_MEMORY
+
+# Concurrent requests for the same text and language share one upstream call
+TRANSLATE_FLIGHTS = SingleFlight("translate")
+
+# Google Translate rejects more than 5000 characters per request. Long texts
+# are split into chunks translated in parallel, so smaller chunks spread the
+# work across more of the pool.
+MAX_CHUNK_CHARS = min(int(os.getenv("TRANSLATE_CHUNK_CHARS", "2000")), 5000)
+TRANSLATE_WORKERS = int(os.getenv("TRANSLATE_WORKERS", "4"))
+TRANSLATE_POOL = ThreadPoolExecutor(max_workers=TRANSLATE_WORKERS, thread_name_prefix="translate")
+
+
+def _translate(text, target_lang):
+    return GoogleTranslator(source='auto', target=target_lang).translate(text)
+
+
+def _translate_remembered(text, target_lang):
+    remembered = TRANSLATION_MEMORY.get(text, target_lang)
+    if remembered is not None:
+        return remembered
+    translated = TRANSLATE_FLIGHTS.call(content_key(text, target_lang), lambda: _translate(text, target_lang))
+    if translated:
+        TRANSLATION_MEMORY.put(text, translated, target_lang)
+    return translated
+
+
+def _translate_chunk(chunk, target_lang):
+    return GLOSSARY.translate(chunk, target_lang, lambda whole: _translate_remembered(whole, target_lang))
+
+
+def split_chunks(text, max_chars=MAX_CHUNK_CHARS):
+    """
+    Split `text` into chunks of at most `max_chars`, on sentence boundaries
+    where possible. Consecutive sentences are packed up to the limit; joining
+    the chunks gives back `text` exactly.
+    """
+    chunks, current = [], ""
+    for sentence in pieces(text):
+        for piece in fit(sentence, max_chars):
+            if current and len(current) + len(piece) > max_chars:
+                chunks.append(current)
+                current = ""
+            current += piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
 def translate_text(text, target_lang='te'):
     """
     Translates text to the target language using deep-translator (Google Translate).
-    Default target is Telugu ('te').
+    Default target is Telugu ('te'). Blocking; call from a worker thread.
+    Texts made only of glossary terms are translated offline; anything else
+    goes upstream whole, and repeat translations are served from the
+    translation memory.
+    Long texts are translated in chunks on TRANSLATE_POOL and reassembled in order.
     """
     try:
         if not text:
             return ""
-        translator = GoogleTranslator(source='auto', target=target_lang)
-        return translator.translate(text)
+        chunks = split_chunks(text)
+        if len(chunks) == 1:
+            return _translate_chunk(text, target_lang)
+        return "".join(TRANSLATE_POOL.map(lambda chunk: _translate_chunk(chunk, target_lang), chunks))
     except Exception as e:
         print(f"Translation failed: {e}")
         return text 
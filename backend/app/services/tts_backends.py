@@ -0,0 +1,285 @@
+"""
+Pluggable text-to-speech backends.
+
+- gtts: Google Translate TTS. MP3, needs a network round trip per ~100
+  characters; runs on a thread pool (TTS_WORKERS).
+- pyttsx3: offline synthesis through the platform driver (espeak-ng on Linux,
+  SAPI5 on Windows, NSSpeechSynthesizer on macOS). WAV. pyttsx3 engines are
+  not thread-safe and keep driver state, so a dedicated process pool
+  (TTS_LOCAL_WORKERS) gives each worker process its own engine, rendering one
+  clip at a time. pyttsx3 can only write files, so clips are written to
+  RAM-backed scratch space (/dev/shm where available) and returned as bytes.
+
+`SpeechSynthesizer` renders with TTS_BACKEND (default gtts) and falls back to
+TTS_FALLBACK (default pyttsx3 when installed) when the primary fails. The
+primary sits behind a circuit breaker, so during an outage requests go
+straight to the fallback instead of waiting on a dead upstream first.
+"""
+
+import asyncio
+import io
+import logging
+import os
+import struct
+import tempfile
+import threading
+import wave
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from ..utils.circuit_breaker import CLOSED, CircuitBreaker
+from . import audio_generator
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyttsx3
+    PYTTSX3_AVAILABLE = True
+except ImportError:
+    PYTTSX3_AVAILABLE = False
+
+
+class TTSBackend:
+    """One speech engine: `synthesize` renders a clip to bytes; `render` runs it on the backend's pool."""
+
+    name = ""
+    media_type = "audio/mpeg"
+    extension = "mp3"
+    # Whether clips can be concatenated as-is into one stream (MP3 frames can, WAV files cannot)
+    concatenable = True
+
+    @property
+    def voice(self) -> str:
+        """Identity of the rendered voice, part of the clip cache key."""
+        return self.name
+
+    def synthesize(self, text: str, language: str) -> bytes:
+        raise NotImplementedError
+
+    def _executor(self) -> Executor:
+        raise NotImplementedError
+
+    async def render(self, text: str, language: str) -> bytes:
+        return await asyncio.get_running_loop().run_in_executor(self._executor(), self.synthesize, text, language)
+
+    def shutdown(self) -> None:
+        pass
+
+    def __deepcopy__(self, memo) -> "TTSBackend":
+        # A shared engine, not data: copied results (e.g. from SingleFlight) keep the same backend
+        return self
+
+
+class GTTSBackend(TTSBackend):
+    name = "gtts"
+
+    def __init__(self, workers: int = 4):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts")
+
+    def synthesize(self, text: str, language: str) -> bytes:
+        return audio_generator.synthesize(text, language)
+
+    def _executor(self) -> Executor:
+        return self._pool
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# pyttsx3 state of the current pool process
+_ENGINE = None
+_VOICE_IDS: Dict[str, Optional[str]] = {}
+_SCRATCH_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+
+def _init_pyttsx3() -> None:
+    global _ENGINE
+    _ENGINE = pyttsx3.init()
+
+
+def _pyttsx3_voice(engine, language: str) -> Optional[str]:
+    """Installed voice for `language`, or None for the driver's default."""
+    code = audio_generator.lang_code(language)
+    if code not in _VOICE_IDS:
+        _VOICE_IDS[code] = None
+        for voice in engine.getProperty("voices"):
+            tags = [t.decode("utf-8", "ignore") if isinstance(t, bytes) else str(t) for t in voice.languages or []]
+            # espeak prefixes each tag with a priority byte, e.g. b"\x05hi"
+            tags = [t[1:] if t and not t[0].isalnum() else t for t in tags]
+            if any(t.lower().split("-")[0] == code for t in tags):
+                _VOICE_IDS[code] = voice.id
+                break
+    return _VOICE_IDS[code]
+
+
+def _pyttsx3_render(text: str, language: str, rate: int) -> bytes:
+    engine = _ENGINE or pyttsx3.init()
+    voice_id = _pyttsx3_voice(engine, language)
+    if voice_id:
+        engine.setProperty("voice", voice_id)
+    engine.setProperty("rate", rate)
+    fd, path = tempfile.mkstemp(suffix=".wav", dir=_SCRATCH_DIR)
+    os.close(fd)
+    try:
+        engine.save_to_file(text, path)
+        engine.runAndWait()
+        with open(path, "rb") as f:
+            audio = f.read()
+    finally:
+        os.unlink(path)
+    if not audio:
+        raise RuntimeError("pyttsx3 produced no audio (is espeak-ng installed?)")
+    return audio
+
+
+class Pyttsx3Backend(TTSBackend):
+    name = "pyttsx3"
+    media_type = "audio/wav"
+    extension = "wav"
+    concatenable = False
+
+    def __init__(self, workers: int = 2, rate: int = 160):
+        self.workers = workers
+        self.rate = rate
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def voice(self) -> str:
+        return f"{self.name}:{self.rate}"
+
+    def synthesize(self, text: str, language: str) -> bytes:
+        # In-process, for scripts; the service goes through `render`
+        return _pyttsx3_render(text, language, self.rate)
+
+    def _executor(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_pyttsx3)
+            return self._pool
+
+    async def render(self, text: str, language: str) -> bytes:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor(), _pyttsx3_render, text, language, self.rate
+        )
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+def split_wav(data: bytes) -> Tuple[Tuple[int, int, int], bytes]:
+    """((channels, sample width, frame rate), PCM frames) of a WAV clip."""
+    with wave.open(io.BytesIO(data), "rb") as w:
+        return (w.getnchannels(), w.getsampwidth(), w.getframerate()), w.readframes(w.getnframes())
+
+
+def streaming_wav_header(channels: int, sample_width: int, frame_rate: int) -> bytes:
+    """RIFF/WAVE header for PCM of unknown length (sizes set to the maximum, as streaming players expect)."""
+    block_align = channels * sample_width
+    return (
+        b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, frame_rate, frame_rate * block_align,
+                                block_align, sample_width * 8)
+        + b"data" + struct.pack("<I", 0xFFFFFFFF)
+    )
+
+
+def _backend(name: str, workers: int) -> Optional[TTSBackend]:
+    name = name.strip().lower()
+    if name == "gtts":
+        return GTTSBackend(workers=workers)
+    if name == "pyttsx3":
+        if not PYTTSX3_AVAILABLE:
+            logger.warning("TTS backend pyttsx3 requested but not installed")
+            return None
+        return Pyttsx3Backend(
+            workers=int(os.getenv("TTS_LOCAL_WORKERS", "2")),
+            rate=int(os.getenv("TTS_LOCAL_RATE", "160")),
+        )
+    if name:
+        logger.warning(f"Unknown TTS backend: {name}")
+    return None
+
+
+class SpeechSynthesizer:
+    def __init__(self, primary: TTSBackend, fallback: Optional[TTSBackend] = None, breaker: Optional[CircuitBreaker] = None):
+        self.primary = primary
+        self.fallback = fallback
+        self.breaker = breaker or CircuitBreaker(f"tts:{primary.name}")
+        self.renders = 0
+        self.fallbacks = 0
+
+    @classmethod
+    def from_env(cls) -> "SpeechSynthesizer":
+        workers = int(os.getenv("TTS_WORKERS", "4"))
+        primary = _backend(os.getenv("TTS_BACKEND", "gtts"), workers) or GTTSBackend(workers=workers)
+        fallback = _backend(os.getenv("TTS_FALLBACK", "pyttsx3" if PYTTSX3_AVAILABLE else ""), workers)
+        if fallback is not None and fallback.name == primary.name:
+            fallback = None
+        return cls(
+            primary,
+            fallback,
+            CircuitBreaker(
+                f"tts:{primary.name}",
+                failure_threshold=int(os.getenv("TTS_BREAKER_FAILURES", "3")),
+                cooldown=float(os.getenv("TTS_BREAKER_COOLDOWN_S", "30")),
+            ),
+        )
+
+    @property
+    def backends(self) -> List[TTSBackend]:
+        return [b for b in (self.primary, self.fallback) if b is not None]
+
+    def backend(self, name: str) -> TTSBackend:
+        for b in self.backends:
+            if b.name == name:
+                return b
+        raise ValueError(f"TTS engine '{name}' is not available; choose from {[b.name for b in self.backends]}")
+
+    def preferred(self) -> List[TTSBackend]:
+        """Backends in the order they would be tried now: the fallback first while the primary's breaker is open."""
+        if self.fallback is not None and self.breaker.state != CLOSED:
+            return [self.fallback, self.primary]
+        return self.backends
+
+    async def render(self, text: str, language: str, engine: Optional[str] = None) -> Tuple[bytes, TTSBackend]:
+        """Render one clip; returns (audio, backend that rendered it)."""
+        self.renders += 1
+        if engine:
+            backend = self.backend(engine)
+            return await backend.render(text, language), backend
+
+        if self.breaker.allow():
+            try:
+                audio = await self.primary.render(text, language)
+                self.breaker.record_success()
+                return audio, self.primary
+            except Exception as e:
+                self.breaker.record_failure(e)
+                if self.fallback is None:
+                    raise
+                logger.warning(f"TTS {self.primary.name} failed ({e}); using {self.fallback.name}")
+        elif self.fallback is None:
+            raise self.breaker.open_error()
+
+        self.fallbacks += 1
+        return await self.fallback.render(text, language), self.fallback
+
+    def stats(self) -> Dict:
+        return {
+            "primary": self.primary.name,
+            "fallback": self.fallback.name if self.fallback else None,
+            "renders": self.renders,
+            "fallbacks": self.fallbacks,
+            "breaker": self.breaker.snapshot(),
+        }
+
+    def shutdown(self) -> None:
+        for backend in self.backends:
+            backend.shutdown()
+
+
+TTS = SpeechSynthesizer.from_env()
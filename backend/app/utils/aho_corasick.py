@@ -0,0 +1,152 @@
+"""
+Aho-Corasick multi-pattern matcher.
+
+Compiles a set of patterns into one automaton and finds every occurrence of
+every pattern in a single left-to-right pass, in time linear in the text
+length plus the number of matches, however many patterns there are.
+
+Matching is case-insensitive by default. Characters are folded one at a
+time, so match offsets always index the original text.
+"""
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+
+class Match(NamedTuple):
+    start: int
+    end: int
+    pattern: str
+    value: Any
+
+
+def _fold(ch: str) -> str:
+    lowered = ch.lower()
+    # A few characters lower-case to two ("İ"); keep those as-is so offsets stay aligned
+    return lowered if len(lowered) == 1 else ch
+
+
+def fold_case(text: str) -> str:
+    """Lower-cased `text` with the same length, so offsets into it index `text`."""
+    lowered = text.lower()
+    return lowered if len(lowered) == len(text) else "".join(_fold(ch) for ch in text)
+
+
+def is_word_boundary(text: str, start: int, end: int) -> bool:
+    """Whether text[start:end] is not glued to a letter or digit on either side."""
+    return (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum())
+
+
+# Transition keys are node * _RADIX + code point: one flat dict for the whole
+# automaton instead of a dict per node, which keeps 100k-pattern lexicons small
+_RADIX = 0x110000
+
+
+class AhoCorasick:
+    def __init__(self, patterns: Union[Mapping[str, Any], Iterable[str]], ignore_case: bool = True):
+        """`patterns` is an iterable of strings or a mapping of pattern -> value returned with its matches."""
+        if not isinstance(patterns, Mapping):
+            patterns = {p: p for p in patterns}
+        self.ignore_case = ignore_case
+        self._patterns: List[str] = []
+        self._values: List[Any] = []
+        self._goto: Dict[int, int] = {}
+        self._nodes = 1  # node 0 is the root
+        # Pattern ending at a node, and the node's nearest proper suffix that ends a pattern
+        self._out: Dict[int, int] = {}
+        self._suffix_out: Dict[int, int] = {}
+        self._fail: List[int] = []
+        edges: List[List[Tuple[int, int, int]]] = []  # (parent, code point, child) by child depth
+        for pattern, value in patterns.items():
+            self._add(pattern, value, edges)
+        self._link(edges)
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    @property
+    def nodes(self) -> int:
+        return self._nodes
+
+    def _add(self, pattern: str, value: Any, edges: List[List[Tuple[int, int, int]]]) -> None:
+        if not pattern:
+            return
+        node = 0
+        for depth, ch in enumerate(fold_case(pattern) if self.ignore_case else pattern):
+            key = node * _RADIX + ord(ch)
+            child = self._goto.get(key)
+            if child is None:
+                child = self._nodes
+                self._nodes += 1
+                self._goto[key] = child
+                if depth == len(edges):
+                    edges.append([])
+                edges[depth].append((node, ord(ch), child))
+            node = child
+        if node in self._out:
+            # Same pattern after folding: the last value wins
+            self._values[self._out[node]] = value
+            return
+        self._out[node] = len(self._patterns)
+        self._patterns.append(pattern)
+        self._values.append(value)
+
+    def _link(self, edges: List[List[Tuple[int, int, int]]]) -> None:
+        """Failure and output links, one depth at a time (every suffix of a node is shallower)."""
+        goto, out = self._goto, self._out
+        fail = self._fail = [0] * self._nodes
+        for level in edges[1:]:
+            for parent, code, child in level:
+                state = fail[parent]
+                while state and state * _RADIX + code not in goto:
+                    state = fail[state]
+                target = goto.get(state * _RADIX + code, 0)
+                fail[child] = target
+                if target in out:
+                    self._suffix_out[child] = target
+                elif target in self._suffix_out:
+                    self._suffix_out[child] = self._suffix_out[target]
+
+    def iter_matches(self, text: str) -> Iterator[Match]:
+        """Every occurrence of every pattern, overlaps included, ordered by end offset."""
+        goto, fail, out, suffix_out = self._goto, self._fail, self._out, self._suffix_out
+        patterns, values = self._patterns, self._values
+        node = 0
+        for i, ch in enumerate(fold_case(text) if self.ignore_case else text):
+            code = ord(ch)
+            child = goto.get(node * _RADIX + code)
+            while child is None and node:
+                node = fail[node]
+                child = goto.get(node * _RADIX + code)
+            node = child or 0
+            hit = node if node in out else suffix_out.get(node)
+            while hit is not None:
+                index = out[hit]
+                yield Match(i + 1 - len(patterns[index]), i + 1, patterns[index], values[index])
+                hit = suffix_out.get(hit)
+
+    def find(
+        self, text: str, whole_words: bool = True, accept: Optional[Callable[[str, Match], bool]] = None
+    ) -> List[Match]:
+        """
+        Non-overlapping matches, leftmost first and longest at each position
+        ("high blood pressure" wins over "blood pressure"). With `whole_words`,
+        matches inside a longer word ("fever" in "feverish") are skipped;
+        `accept(text, match)`, if given, decides instead.
+        """
+        longest: List[Optional[Match]] = [None] * len(text)
+        for match in self.iter_matches(text):
+            if accept is not None:
+                if not accept(text, match):
+                    continue
+            elif whole_words and not is_word_boundary(text, match.start, match.end):
+                continue
+            best = longest[match.start]
+            if best is None or match.end > best.end:
+                longest[match.start] = match
+        selected: List[Match] = []
+        position = 0
+        for match in longest:
+            if match is not None and match.start >= position:
+                selected.append(match)
+                position = match.end
+        return selected
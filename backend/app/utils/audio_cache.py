@@ -0,0 +1,174 @@
+"""
+Content-addressed disk cache for synthesized speech.
+
+Each clip is stored once as `<root>/<key[:2]>/<key>.<ext>`, where the key is the
+SHA-256 of (text, language, voice). The key is the clip's identity, so it
+doubles as a strong ETag and the file URL can be cached by browsers and CDNs
+forever (`immutable`).
+
+Files are written to a temporary name and renamed into place, so readers never
+see a partial clip and several workers can share one directory. Recency is the
+file's mtime, refreshed on every hit; when the directory grows past
+`max_bytes`, the least recently used clips are deleted down to 90% of the
+budget.
+
+If the cache directory cannot be created, clips go to a per-process temporary
+directory instead; if that fails too, nothing is cached and `put` returns None.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROOT = Path(__file__).parent.parent.parent / "cache" / "tts"
+
+
+def audio_key(text: str, language: str, voice: str, untranslated: bool = False) -> str:
+    parts = [text, language.strip().lower(), voice]
+    if untranslated:
+        # Spoken without translation because it failed; a later request that
+        # translates must not be answered with this clip
+        parts.append("untranslated")
+    payload = json.dumps(parts, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_audio_key(key: str) -> bool:
+    return len(key) == 64 and all(c in "0123456789abcdef" for c in key)
+
+
+def _usable_root(root: Path) -> Optional[Path]:
+    try:
+        root.mkdir(parents=True, exist_ok=True)
+        return root
+    except OSError as e:
+        logger.warning(f"TTS cache directory unusable ({root}): {e}")
+    try:
+        return Path(tempfile.mkdtemp(prefix="meditranslate-tts-"))
+    except OSError as e:
+        logger.warning(f"TTS cache disabled: {e}")
+        return None
+
+
+class AudioCache:
+    def __init__(self, root: str, max_bytes: int = 512 * 1024 * 1024):
+        self.root = _usable_root(Path(root))
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._total = sum(p.stat().st_size for p in self._files())
+
+    @classmethod
+    def from_env(cls) -> "AudioCache":
+        return cls(
+            root=os.getenv("TTS_CACHE_DIR", str(DEFAULT_ROOT)),
+            max_bytes=int(float(os.getenv("TTS_CACHE_MAX_MB", "512")) * 1024 * 1024),
+        )
+
+    def _files(self):
+        if self.root is None:
+            return iter(())
+        return (p for p in self.root.glob("*/*.*") if p.suffix != ".tmp")
+
+    def path(self, key: str, extension: str = "mp3") -> Optional[Path]:
+        if self.root is None:
+            return None
+        return self.root / key[:2] / f"{key}.{extension}"
+
+    def get(self, key: str, extension: str = "mp3") -> Optional[Path]:
+        """Path of the cached clip (marking it recently used), or None."""
+        path = self.path(key, extension)
+        if path is not None:
+            try:
+                os.utime(path)
+            except (FileNotFoundError, NotADirectoryError):
+                path = None
+        with self._lock:
+            if path is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return path
+
+    def put(self, key: str, audio: bytes, extension: str = "mp3") -> Optional[Path]:
+        """Store a clip and return its path, or None if it could not be written."""
+        path = self.path(key, extension)
+        if path is None:
+            return None
+        tmp = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            existed = path.exists()
+            os.replace(tmp, path)
+        except OSError as e:
+            # A full or read-only disk costs us the cached copy, not the clip
+            if tmp is not None:
+                Path(tmp).unlink(missing_ok=True)
+            logger.warning(f"TTS cache write failed ({path}): {e}")
+            return None
+        except BaseException:
+            if tmp is not None:
+                Path(tmp).unlink(missing_ok=True)
+            raise
+        with self._lock:
+            if not existed:
+                self._total += len(audio)
+            over = self.max_bytes and self._total > self.max_bytes
+        if over:
+            self._evict()
+        return path
+
+    def _evict(self) -> None:
+        """Delete least recently used clips until the directory is under 90% of the budget."""
+        entries = []
+        total = 0
+        for p in self._files():
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+            total += st.st_size
+        entries.sort()
+        target = self.max_bytes * 0.9
+        removed = 0
+        for _, size, p in entries:
+            if total <= target:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        with self._lock:
+            # Rescanned, so this also picks up clips written by other workers
+            self._total = total
+            self.evictions += removed
+        if removed:
+            logger.info(f"TTS cache evicted {removed} clips ({total / 1e6:.1f} MB kept)")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "root": str(self.root) if self.root is not None else None,
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+AUDIO_CACHE = AudioCache.from_env()
@@ -0,0 +1,164 @@
+"""
+Per-engine circuit breakers for the OCR fallback chain.
+
+A breaker opens after `failure_threshold` consecutive failures, or immediately on
+errors that will not go away by retrying (missing credentials, exhausted quota,
+engine not installed). While open, callers skip the engine without paying for the
+call. After the cooldown one half-open probe is let through: success closes the
+breaker, failure re-opens it with a doubled cooldown (capped at `max_cooldown`).
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Error classes that trip the breaker on the first failure
+FATAL_ERROR_CLASSES = {"auth", "quota", "unavailable"}
+
+
+class CircuitOpenError(Exception):
+    """Raised (or returned) when an engine is skipped because its breaker is open."""
+
+
+def classify_error(exc: BaseException) -> str:
+    """Map an engine exception to a coarse error class."""
+    name = type(exc).__name__.lower()
+    msg = str(exc).lower()
+    if "credential" in name or "credential" in msg or "api key" in msg or "401" in msg or "403" in msg:
+        return "auth"
+    if "429" in msg or "quota" in msg or "resourceexhausted" in name or "rate limit" in msg or "within 24 hours" in msg:
+        return "quota"
+    if "not installed" in msg or "not in your path" in msg or "not available" in msg:
+        return "unavailable"
+    if "timeout" in name or "timed out" in msg:
+        return "timeout"
+    return "error"
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        fatal_cooldown: float = 300.0,
+        max_cooldown: float = 900.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.fatal_cooldown = fatal_cooldown
+        self.max_cooldown = max_cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.total_failures = 0
+        self.total_successes = 0
+        self.skipped = 0
+        self.last_error: Optional[str] = None
+        self.last_error_class: Optional[str] = None
+        self.opened_at: Optional[float] = None
+        self.current_cooldown = cooldown
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        """Whether a call may go through now. Moves open -> half-open after the cooldown."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self._clock() - self.opened_at >= self.current_cooldown:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.skipped += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.total_successes += 1
+            self.current_cooldown = self.cooldown
+            self.opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self, exc: BaseException) -> None:
+        with self._lock:
+            error_class = classify_error(exc)
+            self.consecutive_failures += 1
+            self.total_failures += 1
+            self.last_error = str(exc)[:300]
+            self.last_error_class = error_class
+
+            if self.state == HALF_OPEN:
+                # Failed probe: back off further
+                self.current_cooldown = min(self.current_cooldown * 2, self.max_cooldown)
+                self._open()
+            elif error_class in FATAL_ERROR_CLASSES:
+                self.current_cooldown = max(self.current_cooldown, self.fatal_cooldown)
+                self._open()
+            elif self.consecutive_failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = self._clock()
+        self._probe_in_flight = False
+
+    def open_error(self) -> CircuitOpenError:
+        return CircuitOpenError(
+            f"{self.name} circuit open after {self.consecutive_failures} failure(s) "
+            f"({self.last_error_class}: {self.last_error})"
+        )
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = max(0.0, self.current_cooldown - (self._clock() - self.opened_at))
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "total_failures": self.total_failures,
+                "total_successes": self.total_successes,
+                "skipped_calls": self.skipped,
+                "last_error_class": self.last_error_class,
+                "last_error": self.last_error,
+                "cooldown_s": self.current_cooldown,
+                "retry_in_s": retry_in,
+            }
+
+
+class BreakerRegistry:
+    """Lazily creates one breaker per engine name, configured from the environment."""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(
+                    name,
+                    failure_threshold=int(os.getenv("OCR_BREAKER_FAILURES", "3")),
+                    cooldown=float(os.getenv("OCR_BREAKER_COOLDOWN_S", "30")),
+                    fatal_cooldown=float(os.getenv("OCR_BREAKER_FATAL_COOLDOWN_S", "300")),
+                    max_cooldown=float(os.getenv("OCR_BREAKER_MAX_COOLDOWN_S", "900")),
+                )
+            return self._breakers[name]
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {name: b.snapshot() for name, b in breakers.items()}
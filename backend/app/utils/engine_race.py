@@ -0,0 +1,77 @@
+"""
+Run several OCR engines concurrently and keep the first acceptable result.
+
+`race_engines` submits every engine to a shared thread pool (the engines are
+network calls, subprocesses or native inference, so they release the GIL) and
+returns as soon as one result clears `accept_confidence`. When the deadline
+hits first, the most confident result finished so far wins. Stragglers are
+cancelled if they have not started and otherwise ignored, so the caller's
+latency is bounded by the deadline rather than by the engines' own timeouts.
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("OCR_RACE_WORKERS", "8")),
+    thread_name_prefix="ocr-race",
+)
+
+
+def race_engines(
+    engines: Dict[str, Callable[[], Any]],
+    deadline: float,
+    confidence: Callable[[str, Any], Optional[float]],
+    accept_confidence: float = 0.8,
+    executor: Optional[ThreadPoolExecutor] = None,
+) -> Optional[Tuple[str, Any]]:
+    """
+    Run `engines` ({name: zero-arg callable}) concurrently within `deadline` seconds.
+
+    `confidence(name, result)` scores a finished result, returning None for an
+    unusable one (empty text, engine error). Returns `(name, result)` for the winner,
+    or None if nothing usable finished in time. Ties on confidence go to the engine
+    listed first.
+    """
+    executor = executor or _EXECUTOR
+    priority = {name: i for i, name in enumerate(engines)}
+    futures = {executor.submit(fn): name for name, fn in engines.items()}
+
+    started = time.monotonic()
+    pending = set(futures)
+    finished = []  # (confidence, name, result)
+    try:
+        while pending:
+            remaining = deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for f in sorted(done, key=lambda f: priority[futures[f]]):
+                name = futures[f]
+                try:
+                    result = f.result()
+                    score = confidence(name, result)
+                except Exception as e:
+                    logger.warning(f"OCR race: {name} failed: {e}")
+                    continue
+                if score is None:
+                    continue
+                finished.append((score, name, result))
+                if score >= accept_confidence:
+                    logger.info(f"OCR race: {name} accepted after {time.monotonic() - started:.2f}s")
+                    return name, result
+    finally:
+        for f in pending:
+            f.cancel()
+
+    if pending:
+        logger.info(f"OCR race: deadline {deadline}s hit, ignoring {[futures[f] for f in pending]}")
+    if not finished:
+        return None
+    score, name, result = max(finished, key=lambda r: (r[0], -priority[r[1]]))
+    return name, result
@@ -0,0 +1,133 @@
+"""
+Glossary-first translation of medical terms.
+
+`supabase/seed/medical_terms.csv` has Hindi, Telugu and Tamil renderings of
+English terms. Each target language's terms are compiled into one
+Aho-Corasick automaton. `Glossary.plan` then splits a text in a single pass
+into glossary translations and the residual segments between them. When
+every word is covered, or the text is only numbers and punctuation between
+terms, the text is translated offline and nothing goes upstream.
+
+Otherwise the whole text goes upstream in one request. Translating the
+residual segments one by one would cut sentences at every term, which
+breaks the word order of Hindi, Telugu and Tamil (verb-final languages),
+and would turn one upstream call into several.
+"""
+
+import csv
+import logging
+import os
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from .aho_corasick import AhoCorasick
+from .languages import language_code
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = Path(__file__).parent.parent.parent.parent / "supabase" / "seed" / "medical_terms.csv"
+
+# medical_terms.csv column -> target language
+GLOSSARY_COLUMNS = {"hindi": "hi", "telugu": "te", "tamil": "ta"}
+
+
+def read_glossary_csv(path: str) -> Dict[str, Dict[str, str]]:
+    """{target language: {english term: translation}} from a medical_terms.csv-style file."""
+    terms: Dict[str, Dict[str, str]] = {target: {} for target in GLOSSARY_COLUMNS.values()}
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            term = (row.get("english_term") or "").strip()
+            for column, target in GLOSSARY_COLUMNS.items():
+                translation = (row.get(column) or "").strip()
+                if term and translation:
+                    terms[target][term] = translation
+    return terms
+
+
+class Segment(NamedTuple):
+    text: str
+    # False for residual source text that still needs translating
+    translated: bool
+
+
+def needs_translation(segment: Segment) -> bool:
+    return not segment.translated and any(ch.isalpha() for ch in segment.text)
+
+
+def _with_spacing(original: str, translated: str) -> str:
+    """`translated` with the leading/trailing whitespace of `original` (translators strip it)."""
+    core = original.strip()
+    start = original.index(core[0]) if core else 0
+    return original[:start] + translated + original[start + len(core):]
+
+
+class Glossary:
+    def __init__(self, terms: Dict[str, Dict[str, str]]):
+        self.matchers = {target: AhoCorasick(mapping) for target, mapping in terms.items() if mapping}
+        self.plans = 0
+        self.covered = 0
+
+    @classmethod
+    def from_csv(cls, path: str) -> "Glossary":
+        try:
+            return cls(read_glossary_csv(path))
+        except OSError as e:
+            logger.warning(f"Translation glossary not loaded ({path}): {e}")
+            return cls({})
+
+    @classmethod
+    def from_env(cls) -> "Glossary":
+        path = os.getenv("TRANSLATION_GLOSSARY", str(DEFAULT_PATH))
+        return cls.from_csv(path) if path else cls({})
+
+    def plan(self, text: str, target: str) -> List[Segment]:
+        """`text` split into glossary translations and untranslated residual segments, in order."""
+        matcher = self.matchers.get(language_code(target))
+        matches = matcher.find(text) if matcher else []
+        segments: List[Segment] = []
+        position = 0
+        for match in matches:
+            if match.start > position:
+                segments.append(Segment(text[position:match.start], False))
+            segments.append(Segment(match.value, True))
+            position = match.end
+        if position < len(text):
+            segments.append(Segment(text[position:], False))
+        self.plans += 1
+        if matches and not any(needs_translation(s) for s in segments):
+            self.covered += 1
+        return segments
+
+    def offline(self, text: str, target: str) -> Optional[str]:
+        """`text` translated from the glossary alone, or None if any words are not covered."""
+        segments = self.plan(text, target)
+        if any(needs_translation(s) for s in segments):
+            return None
+        return "".join(s.text for s in segments)
+
+    def translate(self, text: str, target: str, translate: Callable[[str], str]) -> str:
+        """
+        The glossary translation when it covers `text`; otherwise `translate`
+        on the whole text. Errors from `translate` propagate to the caller.
+        """
+        covered = self.offline(text, target)
+        if covered is not None:
+            return covered
+        return _with_spacing(text, translate(text.strip()))
+
+    async def translate_async(self, text: str, target: str, translate: Callable[[str], Awaitable[str]]) -> str:
+        """As `translate`, for an async translator."""
+        covered = self.offline(text, target)
+        if covered is not None:
+            return covered
+        return _with_spacing(text, await translate(text.strip()))
+
+    def stats(self) -> Dict:
+        return {
+            "terms": {target: len(matcher) for target, matcher in self.matchers.items()},
+            "plans": self.plans,
+            "fully_covered": self.covered,
+        }
+
+
+GLOSSARY = Glossary.from_env()
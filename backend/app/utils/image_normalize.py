@@ -0,0 +1,180 @@
+"""
+Resolution normalization for uploaded prescription photos.
+
+Phone cameras deliver 12+ megapixel images, but OCR accuracy depends on text
+height, not pixel count: ~20-40px per text line is enough for every engine we
+use, and a page's long side at 1600-2400px puts handwritten lines in that range
+(2000px on an A4 page is ~170 DPI). Anything larger only costs preprocessing
+time and upload bytes.
+
+Each engine has a target long side (`IMAGE_MAX_SIDE_<ENGINE>`, e.g.
+`IMAGE_MAX_SIDE_GEMINI=1600`; 0 disables downscaling for that engine). JPEGs are
+decoded with `IMREAD_REDUCED_COLOR_{2,4,8}` when the target allows, which scales
+in the DCT domain and skips most of the decode work; the remainder is an
+INTER_AREA resize. Images are never upscaled.
+"""
+
+import io
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image, ImageSequence
+
+DEFAULT_MAX_SIDE = {
+    "preprocess": 2000,   # binarization input, also what Google Vision receives
+    "google_vision": 2000,
+    "pytesseract": 2400,
+    "easyocr": 1600,
+    "trocr": 1024,        # the TrOCR processor resizes to 384px anyway
+    "ocr_space": 1600,    # free tier rejects uploads over 1MB
+    "gemini": 1600,
+}
+
+_REDUCED_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+
+def max_side_for(engine: str) -> int:
+    """Target long side in pixels for `engine` (0 = keep full resolution)."""
+    value = os.getenv(f"IMAGE_MAX_SIDE_{engine.upper()}")
+    if value is None:
+        value = os.getenv("IMAGE_MAX_SIDE", str(DEFAULT_MAX_SIDE.get(engine, 2000)))
+    return int(value)
+
+
+def read_size(image_bytes: bytes) -> Optional[Tuple[int, int]]:
+    """(width, height) from the image header without decoding pixels, or None."""
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            return img.size
+    except Exception:
+        return None
+
+
+def fit(img: np.ndarray, max_side: int) -> np.ndarray:
+    """Downscale `img` so its long side is at most `max_side` (no-op if it already fits)."""
+    h, w = img.shape[:2]
+    long_side = max(h, w)
+    if not max_side or long_side <= max_side:
+        return img
+    scale = max_side / long_side
+    size = (max(1, round(w * scale)), max(1, round(h * scale)))
+    return cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+
+
+def decode_reduced(image_bytes: bytes, max_side: int = 0) -> np.ndarray:
+    """
+    Decode to a BGR array whose long side is at most `max_side`.
+    Uses the largest reduced-decode factor that stays at or above the target,
+    then resizes the rest of the way.
+    """
+    flag = cv2.IMREAD_COLOR
+    size = read_size(image_bytes) if max_side else None
+    if size:
+        long_side = max(size)
+        for factor, reduced_flag in _REDUCED_FLAGS:
+            if long_side // factor >= max_side:
+                flag = reduced_flag
+                break
+
+    img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), flag)
+    if img is None:
+        raise ValueError("Failed to decode image")
+    return fit(img, max_side)
+
+
+def encode_jpeg(img: np.ndarray, quality: int = 90) -> bytes:
+    ok, buf = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("Failed to encode image")
+    return buf.tobytes()
+
+
+def prepare_for_upload(
+    image_bytes: bytes,
+    mime_type: str,
+    max_side: int,
+    quality: int = 85,
+) -> Tuple[bytes, str]:
+    """
+    Downscale and recompress an image before sending it to a remote model.
+    Returns the original bytes when they already fit and are smaller than the
+    re-encoded JPEG, or when the format cannot be decoded here (e.g. HEIC).
+    """
+    size = read_size(image_bytes)
+    fits = size is not None and (not max_side or max(size) <= max_side)
+    try:
+        img = decode_reduced(image_bytes, max_side)
+    except ValueError:
+        return image_bytes, mime_type
+    encoded = encode_jpeg(img, quality)
+    if fits and len(encoded) >= len(image_bytes):
+        return image_bytes, mime_type
+    return encoded, "image/jpeg"
+
+
+def split_pages(image_bytes: bytes, mime_type: str) -> List[Tuple[bytes, str]]:
+    """
+    Split a multi-page image (multi-frame TIFF, as written by document scanners)
+    into one PNG per page. Single-page and undecodable uploads, and PDFs (which
+    Gemini reads natively), come back unchanged as a one-element list.
+    """
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as im:
+            if getattr(im, "n_frames", 1) <= 1:
+                return [(image_bytes, mime_type)]
+            pages = []
+            for frame in ImageSequence.Iterator(im):
+                buf = io.BytesIO()
+                frame.convert("RGB").save(buf, format="PNG")
+                pages.append((buf.getvalue(), "image/png"))
+            return pages
+    except Exception:
+        return [(image_bytes, mime_type)]
+
+
+class NormalizedImage:
+    """
+    One upload, decoded once at the largest size any engine needs, with
+    per-engine arrays and encoded buffers derived lazily from that decode.
+    """
+
+    def __init__(self, image_bytes: bytes, max_side: int = 0):
+        self.source_bytes = image_bytes
+        self.source_size = read_size(image_bytes)
+        self.image = decode_reduced(image_bytes, max_side)
+        self._arrays: Dict[int, np.ndarray] = {}
+        self._encoded: Dict[int, bytes] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_engines(cls, image_bytes: bytes, engines) -> "NormalizedImage":
+        sides = [max_side_for(e) for e in engines]
+        # A single engine wanting full resolution forces a full decode
+        return cls(image_bytes, 0 if 0 in sides else max(sides, default=0))
+
+    def array(self, engine: str) -> np.ndarray:
+        """BGR array sized for `engine`."""
+        max_side = max_side_for(engine)
+        with self._lock:
+            if max_side not in self._arrays:
+                self._arrays[max_side] = fit(self.image, max_side)
+            return self._arrays[max_side]
+
+    def encoded(self, engine: str, quality: int = 90) -> bytes:
+        """Encoded bytes for engines that take a file: the original upload if it
+        already fits `engine`'s target, otherwise a JPEG of the downscaled array."""
+        max_side = max_side_for(engine)
+        if self.source_size and (not max_side or max(self.source_size) <= max_side):
+            return self.source_bytes
+        img = self.array(engine)
+        with self._lock:
+            if max_side not in self._encoded:
+                self._encoded[max_side] = encode_jpeg(img, quality)
+            return self._encoded[max_side]
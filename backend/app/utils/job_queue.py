@@ -0,0 +1,265 @@
+"""
+Durable job queue in SQLite for work too slow to hold an HTTP request open.
+
+The web tier `submit`s a job (JSON payload plus an optional binary input, e.g.
+the uploaded image) and returns its id; worker processes (`python -m
+app.worker`) `claim` jobs, run them and `complete` or `fail` them. Clients poll
+`get`.
+
+A claim leases the job for `visibility_timeout` seconds. If the worker dies,
+the lease expires and another worker picks the job up; a long job keeps its
+lease with `extend`. Each claim counts as an attempt: a failed attempt is
+requeued with exponential backoff until `max_attempts`, after which the job
+is parked as `dead` (the dead-letter state) with its last error, and stays
+there for inspection. Completing or failing requires the lease token, so a
+worker whose lease expired cannot overwrite the result of the one that
+replaced it.
+
+Statuses: queued -> running -> succeeded | queued (retry) | dead.
+
+The database file must be on storage the web tier and the workers share (one
+host, or one volume); WAL mode lets readers poll while workers write.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = Path(__file__).parent.parent.parent / "cache" / "jobs.sqlite3"
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+DEAD = "dead"
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    payload: Dict[str, Any]
+    data: Optional[bytes]
+    lease: str
+    attempts: int
+    max_attempts: int
+
+
+class JobQueue:
+    def __init__(
+        self,
+        path: str,
+        visibility_timeout: float = 300.0,
+        max_attempts: int = 3,
+        retry_base: float = 5.0,
+        retry_max: float = 300.0,
+        retention: float = 7 * 24 * 3600,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.retention = retention
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode; claims open their own IMMEDIATE transaction
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=10, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL,"
+            " payload TEXT NOT NULL, data BLOB, result TEXT, error TEXT,"
+            " attempts INTEGER NOT NULL DEFAULT 0, max_attempts INTEGER NOT NULL,"
+            " lease TEXT, visible_at REAL NOT NULL, created REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, visible_at)")
+
+    @classmethod
+    def from_env(cls) -> "JobQueue":
+        return cls(
+            path=os.getenv("JOB_QUEUE_PATH", str(DEFAULT_PATH)),
+            visibility_timeout=float(os.getenv("JOB_VISIBILITY_TIMEOUT_S", "300")),
+            max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "3")),
+            retry_base=float(os.getenv("JOB_RETRY_BASE_S", "5")),
+            retry_max=float(os.getenv("JOB_RETRY_MAX_S", "300")),
+            retention=float(os.getenv("JOB_RETENTION_S", str(7 * 24 * 3600))),
+        )
+
+    def submit(
+        self, kind: str, payload: Dict[str, Any], data: Optional[bytes] = None, max_attempts: Optional[int] = None
+    ) -> str:
+        job_id = uuid.uuid4().hex
+        now = self._clock()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, kind, status, payload, data, max_attempts, visible_at, created, updated)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, json.dumps(payload), data, max_attempts or self.max_attempts, now, now, now),
+            )
+        return job_id
+
+    def claim(self, visibility_timeout: Optional[float] = None) -> Optional[Job]:
+        """Lease the oldest ready job (queued, or running with an expired lease), or return None."""
+        timeout = visibility_timeout or self.visibility_timeout
+        now = self._clock()
+        lease = uuid.uuid4().hex
+        with self._lock:
+            db = self._db
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                # Workers that died on their last attempt leave nothing to retry
+                db.execute(
+                    "UPDATE jobs SET status = ?, lease = NULL, updated = ?,"
+                    " error = COALESCE(error, 'Worker lease expired on the last attempt')"
+                    " WHERE status = ? AND visible_at <= ? AND attempts >= max_attempts",
+                    (DEAD, now, RUNNING, now),
+                )
+                row = db.execute(
+                    "SELECT id FROM jobs WHERE status IN (?, ?) AND visible_at <= ?"
+                    " ORDER BY visible_at LIMIT 1",
+                    (QUEUED, RUNNING, now),
+                ).fetchone()
+                if row is None:
+                    db.execute("COMMIT")
+                    return None
+                db.execute(
+                    "UPDATE jobs SET status = ?, lease = ?, attempts = attempts + 1, visible_at = ?, updated = ?"
+                    " WHERE id = ?",
+                    (RUNNING, lease, now + timeout, now, row["id"]),
+                )
+                job = db.execute(
+                    "SELECT id, kind, payload, data, attempts, max_attempts FROM jobs WHERE id = ?", (row["id"],)
+                ).fetchone()
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return Job(
+            id=job["id"],
+            kind=job["kind"],
+            payload=json.loads(job["payload"]),
+            data=job["data"],
+            lease=lease,
+            attempts=job["attempts"],
+            max_attempts=job["max_attempts"],
+        )
+
+    def extend(self, job: Job, visibility_timeout: Optional[float] = None) -> bool:
+        """Push the lease out again; False if it was lost to another worker."""
+        timeout = visibility_timeout or self.visibility_timeout
+        now = self._clock()
+        with self._lock:
+            cur = self._db.execute(
+                "UPDATE jobs SET visible_at = ?, updated = ? WHERE id = ? AND lease = ? AND status = ?",
+                (now + timeout, now, job.id, job.lease, RUNNING),
+            )
+        return cur.rowcount == 1
+
+    def complete(self, job: Job, result: Any) -> bool:
+        now = self._clock()
+        with self._lock:
+            cur = self._db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = NULL, data = NULL, lease = NULL, updated = ?"
+                " WHERE id = ? AND lease = ? AND status = ?",
+                (SUCCEEDED, json.dumps(result), now, job.id, job.lease, RUNNING),
+            )
+        return cur.rowcount == 1
+
+    def fail(self, job: Job, error: str, retryable: bool = True, retry_after: Optional[float] = None) -> str:
+        """Record a failed attempt; returns the job's new status (queued for a retry, or dead)."""
+        now = self._clock()
+        if retryable and job.attempts < job.max_attempts:
+            delay = retry_after if retry_after is not None else self.retry_base * 2 ** (job.attempts - 1)
+            status, visible_at = QUEUED, now + min(delay, self.retry_max)
+        else:
+            status, visible_at = DEAD, now
+        with self._lock:
+            cur = self._db.execute(
+                "UPDATE jobs SET status = ?, error = ?, lease = NULL, visible_at = ?, updated = ?"
+                " WHERE id = ? AND lease = ? AND status = ?",
+                (status, error, visible_at, now, job.id, job.lease, RUNNING),
+            )
+        if cur.rowcount != 1:
+            return RUNNING
+        if status == DEAD:
+            logger.warning(f"Job {job.id} ({job.kind}) moved to dead-letter after {job.attempts} attempts: {error}")
+        return status
+
+    def redrive(self, job_id: str) -> bool:
+        """Send a dead job back to the queue with a fresh set of attempts."""
+        now = self._clock()
+        with self._lock:
+            cur = self._db.execute(
+                "UPDATE jobs SET status = ?, attempts = 0, visible_at = ?, updated = ? WHERE id = ? AND status = ?",
+                (QUEUED, now, now, job_id, DEAD),
+            )
+        return cur.rowcount == 1
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, kind, status, result, error, attempts, max_attempts, visible_at, created, updated"
+                " FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        job = {
+            "id": row["id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "max_attempts": row["max_attempts"],
+            "created_at": row["created"],
+            "updated_at": row["updated"],
+        }
+        if row["status"] == QUEUED and row["attempts"]:
+            job["next_attempt_at"] = row["visible_at"]
+        if row["result"] is not None:
+            job["result"] = json.loads(row["result"])
+        if row["error"] is not None:
+            job["error"] = row["error"]
+        return job
+
+    def purge(self) -> int:
+        """Delete finished (succeeded or dead) jobs older than the retention period."""
+        cutoff = self._clock() - self.retention
+        with self._lock:
+            cur = self._db.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated < ?", (SUCCEEDED, DEAD, cutoff)
+            )
+        return cur.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        now = self._clock()
+        with self._lock:
+            counts = dict(self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            oldest = self._db.execute(
+                "SELECT MIN(created) FROM jobs WHERE status = ? AND visible_at <= ?", (QUEUED, now)
+            ).fetchone()[0]
+        return {
+            **{status: counts.get(status, 0) for status in (QUEUED, RUNNING, SUCCEEDED, DEAD)},
+            "oldest_ready_age_s": round(now - oldest, 1) if oldest else 0.0,
+            "visibility_timeout_s": self.visibility_timeout,
+            "max_attempts": self.max_attempts,
+        }
+
+
+@lru_cache(maxsize=None)
+def get_job_queue() -> JobQueue:
+    """Process-wide queue, opened on first use (not at import, so the web tier starts without it)."""
+    return JobQueue.from_env()
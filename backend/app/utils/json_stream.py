@@ -0,0 +1,119 @@
+"""
+Incremental parser for a JSON object arriving in chunks (LLM streaming output).
+
+`feed()` returns events as soon as they are complete in the text seen so far:
+
+- ("field", key, value) when a member of the top-level object is complete;
+- ("item", key, value) when an element of a top-level array member is complete,
+  e.g. each entry of "drug_candidates" the moment its object closes.
+
+Text before the first "{" (markdown fences, preambles) is ignored, as is
+anything after the top-level object closes. Only the top two levels are
+tracked; deeper values are sliced out and decoded with `json.loads` once their
+enclosing item closes, so the scan is a single pass over each character.
+"""
+
+import json
+from typing import Any, List, Optional, Tuple
+
+Event = Tuple[str, str, Any]
+
+_DELIMITERS = ",}] \t\r\n"
+
+
+class JSONStreamParser:
+    def __init__(self):
+        self.buf = ""
+        self.done = False
+        self._pos = 0
+        self._started = False
+        # One frame per open container: [type ("{" or "["), current key, expecting a key]
+        self._stack: List[list] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._string_is_key = False
+        self._scalar_start: Optional[int] = None
+        # Start offset of the value currently open at depth 1 and 2
+        self._starts = {}
+
+    def feed(self, chunk: str) -> List[Event]:
+        events: List[Event] = []
+        if self.done:
+            return events
+        self.buf += chunk
+        buf = self.buf
+        i = self._pos
+        n = len(buf)
+        while i < n and not self.done:
+            c = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._string_is_key:
+                        self._stack[-1][1] = json.loads(buf[self._string_start:i + 1])
+                    else:
+                        self._value_end(i + 1, events)
+                i += 1
+                continue
+
+            if not self._started:
+                if c == "{":
+                    self._started = True
+                    self._stack.append(["{", None, True])
+                i += 1
+                continue
+
+            if self._scalar_start is not None:
+                if c not in _DELIMITERS:
+                    i += 1
+                    continue
+                self._value_end(i, events)
+                self._scalar_start = None
+
+            top = self._stack[-1]
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+                self._string_is_key = top[0] == "{" and top[2]
+                if not self._string_is_key:
+                    self._value_start(i)
+            elif c in "{[":
+                self._value_start(i)
+                self._stack.append([c, None, c == "{"])
+            elif c in "}]":
+                self._stack.pop()
+                if not self._stack:
+                    self.done = True
+                else:
+                    self._value_end(i + 1, events)
+            elif c == ":":
+                top[2] = False
+            elif c == ",":
+                if top[0] == "{":
+                    top[2] = True
+            elif c not in " \t\r\n":
+                # Number, true, false or null
+                self._value_start(i)
+                self._scalar_start = i
+            i += 1
+        self._pos = i
+        return events
+
+    def _value_start(self, i: int) -> None:
+        depth = len(self._stack)
+        if depth <= 2:
+            self._starts[depth] = i
+
+    def _value_end(self, end: int, events: List[Event]) -> None:
+        depth = len(self._stack)
+        if depth == 1:
+            key = self._stack[0][1]
+            events.append(("field", key, json.loads(self.buf[self._starts[1]:end])))
+        elif depth == 2 and self._stack[1][0] == "[":
+            key = self._stack[0][1]
+            events.append(("item", key, json.loads(self.buf[self._starts[2]:end])))
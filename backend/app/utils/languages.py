@@ -0,0 +1,23 @@
+"""Language names used by the frontend and their ISO 639-1 codes."""
+
+LANGUAGE_CODES = {
+    "English": "en",
+    "Spanish": "es",
+    "French": "fr",
+    "Hindi": "hi",
+    "Telugu": "te",
+    "Tamil": "ta",
+    "Kannada": "kn",
+    "Malayalam": "ml",
+    "Marathi": "mr",
+    "Gujarati": "gu",
+    "Bengali": "bn",
+    "Punjabi": "pa",
+    "Urdu": "ur"
+}
+
+
+def language_code(language: str, default: str = "en") -> str:
+    """ISO code for a language name ("Hindi") or code ("hi"); unknown values pass through lowercased."""
+    language = (language or "").strip()
+    return LANGUAGE_CODES.get(language) or LANGUAGE_CODES.get(language.title()) or language.lower() or default
@@ -0,0 +1,247 @@
+"""
+Perceptual near-duplicate lookup for prescription photos.
+
+The exact-bytes result cache misses when the same paper is photographed twice.
+Each upload gets a 64-bit pHash and a 64-bit dHash, computed on a small grayscale
+reduced decode of the normalized image. pHash is indexed and dHash verifies
+candidates. pHash separates different pages better: two different prescriptions
+on a plain page differ by ~4 dHash bits but ~22 pHash bits.
+
+The pHash index is a multi-index hash table. The 64 bits are split into 4 chunks
+of 16 bits and each chunk is indexed separately. Two hashes within Hamming
+distance r agree to within r // 4 bits on at least one chunk (pigeonhole), so a
+lookup probes only the buckets near each chunk value and checks full distances
+on those candidates. Lookup cost depends on bucket occupancy, not on the number
+of stored hashes.
+
+A global 64-bit hash cannot see glyph-level edits. The same form with one dose
+changed is as close as a retake of the identical page. Reuse is therefore off
+unless OCR_NEAR_DUP_MAX_DISTANCE is set (>= 0); a distance of 4 catches retakes
+with ~2 degrees of rotation and some cropping.
+
+The index follows the result cache: a key whose result has been evicted is
+dropped the first time a lookup finds it missing, and at most
+OCR_NEAR_DUP_MAX_ENTRIES fingerprints are kept, the oldest dropped first.
+Dropped entries are skipped until they outnumber the live ones, then the
+tables are rebuilt.
+"""
+
+import itertools
+import os
+import threading
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .image_normalize import decode_reduced
+
+HASH_BITS = 64
+FINGERPRINT_SIDE = 512
+
+
+def dhash(gray: np.ndarray) -> int:
+    """Difference hash: sign of horizontal gradients on a 9x8 thumbnail."""
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def phash(gray: np.ndarray) -> int:
+    """DCT hash: low-frequency 8x8 DCT coefficients (minus DC) against their median."""
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8].flatten()
+    bits = low > np.median(low[1:])
+    bits[0] = False
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def fingerprint(image_bytes: bytes) -> Tuple[int, int]:
+    """(dhash, phash) of an encoded image."""
+    img = decode_reduced(image_bytes, FINGERPRINT_SIDE)
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    return dhash(gray), phash(gray)
+
+
+class MultiIndexHash:
+    """Hamming-radius search over 64-bit hashes via per-chunk hash tables."""
+
+    def __init__(self, chunks: int = 4):
+        self.chunks = chunks
+        self.chunk_bits = HASH_BITS // chunks
+        self._mask = (1 << self.chunk_bits) - 1
+        self.hashes = array("Q")
+        self._tables: List[Dict[int, array]] = [{} for _ in range(chunks)]
+        self._flips: Dict[int, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def _chunk(self, h: int, i: int) -> int:
+        return (h >> (i * self.chunk_bits)) & self._mask
+
+    def _flip_masks(self, radius: int) -> List[int]:
+        """All chunk masks with at most `radius` bits set (0 first)."""
+        if radius not in self._flips:
+            masks = []
+            for r in range(radius + 1):
+                for bits in itertools.combinations(range(self.chunk_bits), r):
+                    masks.append(sum(1 << b for b in bits))
+            self._flips[radius] = masks
+        return self._flips[radius]
+
+    def add(self, h: int) -> int:
+        """Store `h` and return its id."""
+        idx = len(self.hashes)
+        self.hashes.append(h)
+        for i, table in enumerate(self._tables):
+            bucket = table.get(self._chunk(h, i))
+            if bucket is None:
+                table[self._chunk(h, i)] = array("I", (idx,))
+            else:
+                bucket.append(idx)
+        return idx
+
+    def search(self, h: int, radius: int) -> List[Tuple[int, int]]:
+        """(distance, id) for every stored hash within `radius` of `h`, nearest first."""
+        masks = self._flip_masks(radius // self.chunks)
+        seen = set()
+        found = []
+        for i, table in enumerate(self._tables):
+            chunk = self._chunk(h, i)
+            for mask in masks:
+                bucket = table.get(chunk ^ mask)
+                if bucket is None:
+                    continue
+                for idx in bucket:
+                    if idx in seen:
+                        continue
+                    seen.add(idx)
+                    distance = (self.hashes[idx] ^ h).bit_count()
+                    if distance <= radius:
+                        found.append((distance, idx))
+        found.sort()
+        return found
+
+
+class NearDuplicateIndex:
+    """
+    Maps photo fingerprints to result-cache keys. pHash finds candidates; when
+    `verify` is set the candidate's dHash must also be within `max_distance`.
+    A negative `max_distance` disables the index.
+    """
+
+    def __init__(self, max_distance: int = -1, verify: bool = True, max_entries: int = 10000):
+        self.max_distance = max_distance
+        self.verify = verify
+        self.max_entries = max_entries
+        self._index = MultiIndexHash()
+        self._dhashes = array("Q")
+        # By id; None once the entry is dropped
+        self._keys: List[Optional[str]] = []
+        # Live entries, oldest first: {key: id}
+        self._ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.matches = 0
+        self.rejected = 0
+        self.dropped = 0
+
+    @classmethod
+    def from_env(cls) -> "NearDuplicateIndex":
+        return cls(
+            max_distance=int(os.getenv("OCR_NEAR_DUP_MAX_DISTANCE", "-1")),
+            verify=os.getenv("OCR_NEAR_DUP_VERIFY", "1").strip().lower() not in ("0", "false", "no"),
+            max_entries=int(os.getenv("OCR_NEAR_DUP_MAX_ENTRIES", "10000")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_distance >= 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, fp: Tuple[int, int], key: str) -> None:
+        with self._lock:
+            if key in self._ids:
+                self._drop(key)
+            self._append(fp, key)
+            while len(self._ids) > self.max_entries:
+                self._drop(next(iter(self._ids)))
+            self._compact()
+
+    def discard(self, key: str) -> None:
+        """Forget `key`, e.g. once its result has left the cache."""
+        with self._lock:
+            if key in self._ids:
+                self._drop(key)
+                self._compact()
+
+    def _append(self, fp: Tuple[int, int], key: str) -> None:
+        self._ids[key] = len(self._keys)
+        self._dhashes.append(fp[0])
+        self._index.add(fp[1])
+        self._keys.append(key)
+
+    def _drop(self, key: str) -> None:
+        self._keys[self._ids.pop(key)] = None
+        self.dropped += 1
+
+    def _compact(self) -> None:
+        """Rebuild the tables without dropped entries once those are the majority."""
+        if len(self._keys) - len(self._ids) <= max(len(self._ids), 64):
+            return
+        live = [((self._dhashes[i], self._index.hashes[i]), key) for key, i in self._ids.items()]
+        self._index = MultiIndexHash()
+        self._dhashes = array("Q")
+        self._keys = []
+        self._ids = {}
+        for fp, key in live:
+            self._append(fp, key)
+
+    def lookup(self, fp: Tuple[int, int], namespace: str = "") -> List[Tuple[str, int]]:
+        """
+        Candidate (key, distance) pairs, nearest first, restricted to keys ending in
+        `namespace` (the engine/prompt/language part of a result-cache key).
+        """
+        with self._lock:
+            self.lookups += 1
+            candidates = []
+            for distance, idx in self._index.search(fp[1], self.max_distance):
+                key = self._keys[idx]
+                if key is None or not key.endswith(namespace):
+                    continue
+                if self.verify and (self._dhashes[idx] ^ fp[0]).bit_count() > self.max_distance:
+                    self.rejected += 1
+                    continue
+                candidates.append((key, distance))
+            if candidates:
+                self.matches += 1
+            return candidates
+
+    def find_cached(self, cache, fp: Tuple[int, int], namespace: str) -> Tuple[Optional[Dict], Optional[int]]:
+        """First near-duplicate whose result is still in `cache`: (result, distance)."""
+        for key, distance in self.lookup(fp, namespace):
+            result, _ = cache.get(key)
+            if result is not None:
+                return result, distance
+            self.discard(key)  # evicted or expired; never a candidate again
+        return None, None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._ids),
+                "max_entries": self.max_entries,
+                "dropped": self.dropped,
+                "max_distance": self.max_distance,
+                "verify": self.verify,
+                "lookups": self.lookups,
+                "matches": self.matches,
+                "rejected_by_verification": self.rejected,
+            }
+
+
+NEAR_DUPLICATES = NearDuplicateIndex.from_env()
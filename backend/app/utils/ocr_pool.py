@@ -0,0 +1,122 @@
+"""
+Bounded worker pool for running the synchronous OCR pipeline off the event loop.
+
+`process_prescription_image` does OpenCV preprocessing, tesseract and model
+inference; called directly from an `async def` route it blocks uvicorn's loop and
+stalls every other request, including `/health`. Routes await `OCR_POOL.run(...)`
+instead.
+
+OCR_POOL_KIND selects the executor:
+- "thread" (default): the heavy parts (OpenCV, tesseract subprocess, torch, network
+  I/O) release the GIL, and breakers, match caches and warm models stay shared.
+- "process": true multi-core isolation; each worker keeps its own breakers and
+  caches, and inherits models warmed before the pool forks.
+
+OCR_POOL_WORKERS bounds concurrency; OCR_POOL_MAX_PENDING (0 = unlimited) caps
+queued + running jobs, beyond which `run` raises `PoolSaturated`.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class PoolSaturated(Exception):
+    """Raised when the pool already holds OCR_POOL_MAX_PENDING jobs."""
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: dict) -> tuple:
+    # Wall-clock start time so queue wait can be measured across processes
+    return time.time(), fn(*args, **kwargs)
+
+
+class OCRWorkerPool:
+    def __init__(self, kind: str = "thread", workers: Optional[int] = None, max_pending: int = 0):
+        self.kind = kind
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+
+    @classmethod
+    def from_env(cls) -> "OCRWorkerPool":
+        workers = int(os.getenv("OCR_POOL_WORKERS", "0")) or None
+        return cls(
+            kind=os.getenv("OCR_POOL_KIND", "thread").strip().lower(),
+            workers=workers,
+            max_pending=int(os.getenv("OCR_POOL_MAX_PENDING", "0")),
+        )
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ocr-pool")
+            return self._executor
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run `fn(*args, **kwargs)` in the pool and await its result."""
+        with self._lock:
+            if self.max_pending and self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PoolSaturated(f"OCR pool is full ({self.pending} jobs pending)")
+            self.pending += 1
+
+        submitted = time.time()
+        loop = asyncio.get_running_loop()
+        try:
+            started, result = await loop.run_in_executor(self._get_executor(), _timed_call, fn, args, kwargs)
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+        finished = time.time()
+        with self._lock:
+            self.completed += 1
+            wait = max(0.0, started - submitted)
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+            self._run_total += finished - started
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            done = self.completed or 1
+            return {
+                "kind": self.kind,
+                "workers": self.workers,
+                "pending": self.pending,
+                "queued": max(0, self.pending - self.workers),
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(1000 * self._wait_total / done, 1),
+                "max_wait_ms": round(1000 * self._wait_max, 1),
+                "avg_run_ms": round(1000 * self._run_total / done, 1),
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+OCR_POOL = OCRWorkerPool.from_env()
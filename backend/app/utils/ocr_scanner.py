@@ -0,0 +1,176 @@
+"""
+Compiled scanner for OCR text: normalization and typed spans.
+
+Normalization runs every OCR clean-up rule in one compiled regex sweep:
+dash and multiplication-sign variants, "lmg"/"l0"/"Omg" and digit-o-digit
+confusions, a stand-alone "l" read as 1, punctuation and whitespace runs,
+and lower-casing. The output matches the rules applied one after another.
+
+Extraction then makes one sweep over the normalized text with a single
+alternation. Each match becomes a typed span:
+
+- dose / unit: "500 mg" -> dose "500", unit "mg"
+- form: tablet, capsule, syrup, ... (a dose unit that is a form also counts)
+- frequency: the `FREQUENCY_PATTERNS` phrase ("bd" -> twice daily)
+- code: 1-0-1 style codes and the other `DOSAGE_PATTERNS` / dosage_rules.csv entries
+- abbreviation: `MEDICAL_ABBREVIATIONS` and abbrev.csv ("cap." -> Capsule)
+
+Extraction needs the normalized text ("5Omg" only reads as a dose once it
+is "50mg"), so the two sweeps cannot be merged without changing results.
+"""
+
+import csv
+import logging
+import re
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from .regex_patterns import (
+    DOSAGE_FORMS,
+    DOSAGE_PATTERNS,
+    DOSE_PATTERN,
+    FREQUENCY_PATTERNS,
+    MEDICAL_ABBREVIATIONS,
+)
+
+logger = logging.getLogger(__name__)
+
+SEED_DIR = Path(__file__).parent.parent.parent.parent / "supabase" / "seed"
+
+DOSE, UNIT, FORM, FREQUENCY, CODE, ABBREVIATION = "dose", "unit", "form", "frequency", "code", "abbreviation"
+
+# One alternative per normalization rule. Where applying the rules in order
+# chains them, the chain gets its own alternative ("Olmg" -> "Omg" -> "0mg"),
+# and the digit-o-digit lookahead accepts "l0"/"Omg"/"Olmg", which would already be digits.
+# The leading lookahead lists every character a rule can start with, so other
+# positions fail at once; single spaces that are already clean are not matched.
+NORMALIZE = re.compile(
+    r"(?=[Olo…,;:\s–—×])(?:"
+    r"(?P<omg>Olmg|Omg)|(?P<lmg>lmg)|(?P<l0>l0)"
+    r"|(?P<digit_o>(?<=\d)\s*[oO]\s*(?=\d|l0|Ol?mg))"
+    r"|(?P<one>\bl\b)"
+    r"|(?P<space>(?! [^…,;:\s])[…,;:\s]+)"
+    r"|(?P<dash>[–—])"
+    r"|(?P<times>×)"
+    r")"
+)
+REWRITES = {"omg": "0mg", "lmg": "mg", "l0": "10", "digit_o": "0", "one": "1", "space": " ", "dash": "-", "times": "x"}
+
+
+class Span(NamedTuple):
+    kind: str
+    start: int
+    end: int
+    text: str
+    # Canonical meaning: frequency name, code meaning, abbreviation expansion, lower-cased form/unit
+    value: Optional[str]
+
+
+class Scan(NamedTuple):
+    text: str
+    spans: List[Span]
+
+    def of(self, kind: str) -> List[Span]:
+        return [s for s in self.spans if s.kind == kind]
+
+    def dosages(self) -> List[str]:
+        """Dose numbers, as `extract_dosages` returns them."""
+        return [s.text for s in self.of(DOSE)]
+
+    def dosage_forms(self) -> List[str]:
+        return [s.value for s in self.of(FORM)]
+
+    def frequencies(self) -> Dict[str, List[str]]:
+        """{frequency name: distinct matched phrases}, as `extract_frequencies` returns them."""
+        found: Dict[str, Dict[str, None]] = {}
+        for s in self.of(FREQUENCY):
+            found.setdefault(s.value, {})[s.text] = None
+        return {name: list(phrases) for name, phrases in found.items()}
+
+
+def _read_csv(path: Path) -> List[Dict[str, str]]:
+    try:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            return list(csv.DictReader(f))
+    except OSError as e:
+        logger.warning(f"OCR scanner table not loaded ({path}): {e}")
+        return []
+
+
+def _literal(term: str) -> str:
+    """Case-insensitive whole-token pattern for a CSV literal such as "Cap." or "1-0-1"."""
+    pattern = r"(?<!\w)" + re.escape(term)
+    return pattern + r"\b" if term[-1:].isalnum() else pattern
+
+
+class OCRScanner:
+    def __init__(self, seed_dir: Path = SEED_DIR):
+        # A 1-0-1 code directly followed by a unit also gives a dose for its last digit
+        alternatives = [f"(?P<dose>(?P<lead>\\b[0-1]-[0-1]-(?=[0-1]\\b))?{DOSE_PATTERN})"]
+        self._groups: Dict[str, tuple] = {}
+
+        def add(kind: str, pattern: str, value: Optional[str]) -> None:
+            name = f"g{len(self._groups)}"
+            self._groups[name] = (kind, value)
+            alternatives.append(f"(?P<{name}>{pattern})")
+
+        for name, patterns in FREQUENCY_PATTERNS.items():
+            for pattern in patterns:
+                add(FREQUENCY, pattern, name)
+        # Codes: dosage_rules.csv meanings; tokens already read as frequencies stay frequencies
+        self.meanings = {row["pattern"].strip().lower(): row["meaning"].strip()
+                         for row in _read_csv(seed_dir / "dosage_rules.csv") if row.get("pattern") and row.get("meaning")}
+        for pattern in DOSAGE_PATTERNS:
+            add(CODE, pattern, None)
+        for literal in self.meanings:
+            if not any(re.fullmatch(p, literal, re.I) for p in DOSAGE_PATTERNS):
+                add(CODE, _literal(literal), None)
+        add(FORM, r"\b(?:" + "|".join(DOSAGE_FORMS) + r")\b", None)
+        abbreviations = dict(MEDICAL_ABBREVIATIONS)
+        for row in _read_csv(seed_dir / "abbrev.csv"):
+            if row.get("short") and row.get("expanded"):
+                key = _literal(row["short"].strip())
+                if not any(re.fullmatch(p, row["short"].strip(), re.I) for p in abbreviations):
+                    abbreviations[key] = row["expanded"].strip()
+        for pattern, expansion in abbreviations.items():
+            add(ABBREVIATION, pattern, expansion)
+
+        # Every alternative starts at a word start (\b before a word character, or
+        # (?<!\w)); checking that once up front skips the alternation mid-word.
+        self.pattern = re.compile(r"(?<!\w)(?:" + "|".join(alternatives) + ")", re.I)
+        self._dose_group = self.pattern.groupindex["lead"] + 1  # the number inside DOSE_PATTERN
+
+    def normalize(self, text: str) -> str:
+        if not text:
+            return text
+        return NORMALIZE.sub(lambda m: REWRITES[m.lastgroup], text).strip().lower()
+
+    def extract(self, text: str) -> Scan:
+        """Typed spans of `text` (normally already normalized), in order."""
+        spans: List[Span] = []
+        for m in self.pattern.finditer(text):
+            if m.group("dose") is not None:
+                number, unit = self._dose_group, self._dose_group + 1
+                if m.group("lead") is not None:
+                    code = text[m.start("lead"):m.end("lead") + 1]
+                    spans.append(Span(CODE, m.start("lead"), m.end("lead") + 1, code, self.meanings.get(code.lower())))
+                spans.append(Span(DOSE, m.start(number), m.end(number), m.group(number), m.group(number)))
+                spans.append(Span(UNIT, m.start(unit), m.end(unit), m.group(unit), m.group(unit).lower()))
+                # "1 tablet" names a form too; "1tablet" does not (no word boundary), as before
+                if m.group(unit).lower() in DOSAGE_FORMS and m.start(unit) > m.end(number):
+                    spans.append(Span(FORM, m.start(unit), m.end(unit), m.group(unit), m.group(unit).lower()))
+                continue
+            kind, value = self._groups[m.lastgroup]
+            if kind == FORM:
+                value = m.group().lower()
+            elif kind == CODE:
+                value = self.meanings.get(m.group().lower())
+            spans.append(Span(kind, m.start(), m.end(), m.group(), value))
+        return Scan(text, spans)
+
+    def scan(self, text: str) -> Scan:
+        """Normalize OCR output and extract its spans; offsets index the normalized text."""
+        return self.extract(self.normalize(text) or "")
+
+
+OCR_SCANNER = OCRScanner()
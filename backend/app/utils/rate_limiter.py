@@ -0,0 +1,147 @@
+"""
+Client-side request and token budgets for an upstream API (Gemini).
+
+Two token buckets, one refilled at `rpm` requests per minute and one at `tpm`
+tokens per minute, each holding at most one minute of budget. A caller reserves
+its estimated tokens up front; if a bucket is short, the caller sleeps until
+its reservation is covered. Reservations are made in arrival order, so waiters
+are served FIFO without a lock held across the sleep. Callers are shed with
+`RateLimitExceeded` (mapped to 503 + Retry-After by the routes) when the wait
+would exceed `max_wait` or `max_queue` callers are already waiting. After the
+call, `settle` corrects the token bucket with the real usage.
+
+Budgets are per process; with several workers, divide the account quota.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+class RateLimitExceeded(Exception):
+    """The request was not admitted; retry after `retry_after` seconds."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float, clock: Callable[[], float]):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = per_minute
+        self._clock = clock
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` (the level may go negative) and return the wait until it is covered."""
+        self._refill()
+        self.level -= amount
+        return max(0.0, -self.level / self.rate)
+
+    def refund(self, amount: float) -> None:
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        rpm: float = 0,
+        tpm: float = 0,
+        max_wait: float = 10.0,
+        max_queue: int = 32,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self.requests = TokenBucket(rpm, clock) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm, clock) if tpm > 0 else None
+        self._lock = threading.Lock()
+
+        self.waiting = 0
+        self.admitted = 0
+        self.throttled = 0
+        self.rejected = 0
+        self._wait_total = 0.0
+
+    @classmethod
+    def from_env(cls, prefix: str, rpm: float = 0, tpm: float = 0) -> "RateLimiter":
+        """Read <prefix>_RPM, _TPM, _QUEUE_TIMEOUT_S and _MAX_QUEUE (0 disables a budget)."""
+        return cls(
+            rpm=float(os.getenv(f"{prefix}_RPM", str(rpm))),
+            tpm=float(os.getenv(f"{prefix}_TPM", str(tpm))),
+            max_wait=float(os.getenv(f"{prefix}_QUEUE_TIMEOUT_S", "10")),
+            max_queue=int(os.getenv(f"{prefix}_MAX_QUEUE", "32")),
+        )
+
+    def _reserve(self, tokens: float) -> float:
+        with self._lock:
+            if self.max_queue and self.waiting >= self.max_queue:
+                self.rejected += 1
+                raise RateLimitExceeded(
+                    f"Rate limit queue is full ({self.waiting} waiting)", retry_after=self.max_wait or 1.0
+                )
+            if self.tokens is not None:
+                # A single request larger than a minute of budget still goes through eventually
+                tokens = min(tokens, self.tokens.capacity)
+            wait = 0.0
+            if self.requests is not None:
+                wait = max(wait, self.requests.reserve(1))
+            if self.tokens is not None:
+                wait = max(wait, self.tokens.reserve(tokens))
+            if wait > self.max_wait:
+                if self.requests is not None:
+                    self.requests.refund(1)
+                if self.tokens is not None:
+                    self.tokens.refund(tokens)
+                self.rejected += 1
+                raise RateLimitExceeded(f"Rate limit budget exhausted; next slot in {wait:.1f}s", retry_after=wait)
+            self.admitted += 1
+            if wait > 0:
+                self.throttled += 1
+                self.waiting += 1
+                self._wait_total += wait
+            return wait
+
+    async def acquire(self, tokens: float = 0) -> None:
+        """Wait for budget for one request of `tokens` estimated tokens, or raise RateLimitExceeded."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                with self._lock:
+                    self.waiting -= 1
+
+    def settle(self, estimated: float, actual: Optional[float]) -> None:
+        """Correct the token bucket once the real usage of a call is known."""
+        if self.tokens is None or not actual:
+            return
+        with self._lock:
+            self.tokens.refund(estimated - actual)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            for bucket in (self.requests, self.tokens):
+                if bucket is not None:
+                    bucket._refill()
+            return {
+                "rpm": self.requests.capacity if self.requests else None,
+                "tpm": self.tokens.capacity if self.tokens else None,
+                "requests_available": round(self.requests.level, 2) if self.requests else None,
+                "tokens_available": round(self.tokens.level) if self.tokens else None,
+                "waiting": self.waiting,
+                "admitted": self.admitted,
+                "throttled": self.throttled,
+                "rejected": self.rejected,
+                "avg_throttle_wait_s": round(self._wait_total / self.throttled, 2) if self.throttled else 0.0,
+            }
@@ -6,9 +6,28 @@ DOSAGE_PATTERNS = [
     r"\bSOS\b"
 ]
 
+# No \b after the dot: "T. Dolo" has no word boundary there
 MEDICAL_ABBREVIATIONS = {
-    r"\bT\.\b": "Tablet",
-    r"\bCap\.\b": "Capsule",
-    r"\bSyp\.\b": "Syrup",
-    r"\bInj\.\b": "Injection"
+    r"\bT\.": "Tablet",
+    r"\bCap\.": "Capsule",
+    r"\bSyp\.": "Syrup",
+    r"\bInj\.": "Injection"
+}
+
+# A dose and its unit: "500 mg", "2 tablets"
+DOSE_PATTERN = r"\b(\d+(?:\.\d+)?)\s*(mg|g|ml|mcg|iu|tablets?|capsules?|puffs?|drops?)\b"
+
+DOSAGE_FORMS = [
+    "tablet", "capsule", "syrup", "injection", "cream", "ointment",
+    "lotion", "gel", "suspension", "solution", "powder",
+]
+
+FREQUENCY_PATTERNS = {
+    "once daily": [r"\bod\b", r"\bonce\s+daily\b", r"\b1x\b"],
+    "twice daily": [r"\bbd\b", r"\btwice\s+daily\b", r"\b2x\b", r"\bdouble\b"],
+    "thrice daily": [r"\btd\b", r"\bthrice\s+daily\b", r"\b3x\b", r"\btds\b"],
+    "four times daily": [r"\bqid\b", r"\b4x\b", r"\bfour\s+times\b"],
+    "every 4-6 hours": [r"\bq\s*[46]\s*h\b", r"\bevery\s+[46]\s*hours\b"],
+    "bedtime": [r"\bhs\b", r"\bbedtime\b", r"\bnightly\b"],
+    "as needed": [r"\bprn\b", r"\bas\s+needed\b"],
 }
@@ -0,0 +1,177 @@
+"""
+Content-addressed cache for prescription extraction results.
+
+Keys are the SHA-256 of the uploaded bytes plus everything else that changes the
+output (engine, prompt version, language), so a re-uploaded photo is answered
+without another OCR pass or Gemini call. Two tiers:
+
+- memory: an `LRUCache` of serialized results, per process;
+- disk: a SQLite table shared by every worker on the host, with a TTL and a
+  size budget enforced by evicting the least recently used rows.
+
+Values are stored as JSON and decoded on every hit, so callers can mutate what
+they get back without corrupting the cache.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .lru_cache import MISSING, LRUCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = Path(__file__).parent.parent.parent / "cache" / "ocr_results.sqlite3"
+
+
+def extraction_key(image_bytes: bytes, engine: str, prompt_version: str, language: str) -> str:
+    """Cache key for one extraction: content hash plus the inputs that shape the output."""
+    digest = hashlib.sha256(image_bytes).hexdigest()
+    return f"{digest}:{engine}:{prompt_version}:{language.strip().lower()}"
+
+
+class ResultCache:
+    def __init__(
+        self,
+        memory_size: int = 256,
+        path: Optional[str] = None,
+        ttl: float = 7 * 24 * 3600,
+        max_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.memory = LRUCache(memory_size)
+        self.disk_hits = 0
+        self.disk_evictions = 0
+        self.expired = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            self._open(path)
+
+    @classmethod
+    def from_env(cls) -> "ResultCache":
+        return cls(
+            memory_size=int(os.getenv("OCR_RESULT_CACHE_SIZE", "256")),
+            path=os.getenv("OCR_RESULT_CACHE_PATH", str(DEFAULT_PATH)),
+            ttl=float(os.getenv("OCR_RESULT_CACHE_TTL_S", str(7 * 24 * 3600))),
+            max_bytes=int(float(os.getenv("OCR_RESULT_CACHE_MAX_MB", "256")) * 1024 * 1024),
+        )
+
+    def _open(self, path: str) -> None:
+        try:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(path, check_same_thread=False, timeout=5)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+                " created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+            db.commit()
+            self._db = db
+        except (sqlite3.Error, OSError) as e:
+            # A read-only or full disk should cost us the disk tier, not the endpoint
+            logger.warning(f"Result cache disk tier disabled ({path}): {e}")
+
+    def get(self, key: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Return (result, tier) where tier is "memory" or "disk", or (None, None) on a miss."""
+        now = time.time()
+        entry = self.memory.get(key)
+        if entry is not MISSING:
+            created, payload = entry
+            if now - created <= self.ttl:
+                return json.loads(payload), "memory"
+            self.expired += 1
+
+        if self._db is None:
+            return None, None
+        with self._lock:
+            try:
+                row = self._db.execute("SELECT value, created FROM results WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None, None
+                payload, created = row
+                if now - created > self.ttl:
+                    self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                    self._db.commit()
+                    self.expired += 1
+                    return None, None
+                self._db.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Result cache read failed: {e}")
+                return None, None
+            self.disk_hits += 1
+        # Promote so the next repeat skips SQLite
+        self.memory.put(key, (created, payload))
+        return json.loads(payload), "disk"
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        now = time.time()
+        payload = json.dumps(result, ensure_ascii=False)
+        self.memory.put(key, (now, payload))
+        if self._db is None:
+            return
+        size = len(payload.encode("utf-8"))
+        with self._lock:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                    (key, payload, size, now, now),
+                )
+                self._evict(now)
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Result cache write failed: {e}")
+
+    def _evict(self, now: float) -> None:
+        """Drop expired rows, then least recently used rows until under the size budget."""
+        cur = self._db.execute("DELETE FROM results WHERE created < ?", (now - self.ttl,))
+        self.expired += max(cur.rowcount, 0)
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Evict down to 90% so a full cache does not evict on every write
+        target = total - int(self.max_bytes * 0.9)
+        freed = 0
+        doomed = []
+        for key, size in self._db.execute("SELECT key, size FROM results ORDER BY accessed"):
+            doomed.append((key,))
+            freed += size
+            if freed >= target:
+                break
+        self._db.executemany("DELETE FROM results WHERE key = ?", doomed)
+        self.disk_evictions += len(doomed)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self._db is not None:
+            with self._lock:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        disk = None
+        if self._db is not None:
+            with self._lock:
+                rows, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+            disk = {
+                "entries": rows,
+                "size_mb": round(size / (1024 * 1024), 2),
+                "max_mb": round(self.max_bytes / (1024 * 1024), 1),
+                "hits": self.disk_hits,
+                "evictions": self.disk_evictions,
+            }
+        return {"memory": self.memory.stats(), "disk": disk, "ttl_s": self.ttl, "expired": self.expired}
+
+
+RESULT_CACHE = ResultCache.from_env()
@@ -0,0 +1,102 @@
+"""
+Single-flight request coalescing.
+
+Identical upstream calls that overlap in time (a double-submitted form, several
+people scanning the same prescription) share one call: the first caller for a
+key runs it, later callers wait for its result instead of spending quota on
+their own. Works for coroutines (`run`) and for blocking calls made from worker
+threads (`call`). Every caller, the one that ran the call included, gets its
+own deep copy of the result, so no caller can mutate another's data. Exceptions propagate to every waiter.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+def content_key(*parts: Any) -> str:
+    """SHA-256 over the call's inputs; bytes are hashed as-is, everything else as JSON."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (bytes, bytearray)):
+            digest.update(b"b")
+            digest.update(hashlib.sha256(part).digest())
+        else:
+            digest.update(b"j")
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.coalesced = 0
+        self._tasks: Dict[Tuple[int, str], asyncio.Task] = {}
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await `fn()` once per key among concurrent callers on this event loop."""
+        loop_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            self.calls += 1
+            task = self._tasks.get(loop_key)
+            leader = task is None
+            if leader:
+                task = asyncio.ensure_future(fn())
+                self._tasks[loop_key] = task
+                task.add_done_callback(lambda _: self._forget_task(loop_key, task))
+            else:
+                self.coalesced += 1
+        # Shield so a disconnecting caller does not cancel the call for the others
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result)
+
+    def call(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run blocking `fn()` once per key among concurrent calling threads."""
+        with self._lock:
+            self.calls += 1
+            future = self._futures.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._futures[key] = future
+            else:
+                self.coalesced += 1
+        if not leader:
+            return copy.deepcopy(future.result())
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return copy.deepcopy(result)
+        finally:
+            with self._lock:
+                self._futures.pop(key, None)
+
+    def _forget_task(self, loop_key: Tuple[int, str], task: asyncio.Task) -> None:
+        with self._lock:
+            if self._tasks.get(loop_key) is task:
+                del self._tasks[loop_key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every waiter went away
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "upstream_calls": self.calls - self.coalesced,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._tasks) + len(self._futures),
+                "coalesced_rate": self.coalesced / self.calls if self.calls else 0.0,
+            }
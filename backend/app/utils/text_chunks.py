@@ -0,0 +1,43 @@
+"""
+Sentence and clause splitting shared by speech synthesis and translation.
+
+`pieces` splits after each boundary and keeps the separator with the piece
+before it, so joining the pieces gives back the text exactly; callers that
+don't need that (speech) strip the pieces. `fit` breaks a sentence that is
+over a length limit after clauses, then after spaces.
+"""
+
+import re
+from typing import List, Pattern
+
+# Sentence ends (Latin and Devanagari danda) and line breaks
+SENTENCE_END = re.compile(r'(?<=[.!?\u0964])\s+|\n+')
+CLAUSE_END = re.compile(r'(?<=[,;:])\s+')
+
+
+def pieces(text: str, boundary: Pattern = SENTENCE_END) -> List[str]:
+    """`text` split after each `boundary` match; the separators stay attached."""
+    found, start = [], 0
+    for match in boundary.finditer(text):
+        if match.start() > start:
+            found.append(text[start:match.end()])
+            start = match.end()
+    if start < len(text):
+        found.append(text[start:])
+    return found
+
+
+def fit(sentence: str, max_chars: int) -> List[str]:
+    """`sentence` as parts of at most `max_chars`, broken after clauses, then after spaces."""
+    if len(sentence) <= max_chars:
+        return [sentence]
+    parts = []
+    for clause in pieces(sentence, CLAUSE_END):
+        while len(clause) > max_chars:
+            cut = clause.rfind(" ", 0, max_chars) + 1
+            cut = cut if cut > 0 else max_chars
+            parts.append(clause[:cut])
+            clause = clause[cut:]
+        if clause:
+            parts.append(clause)
+    return parts
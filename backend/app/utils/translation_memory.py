@@ -0,0 +1,181 @@
+"""
+Translation memory: previously translated strings, reused without a network call.
+
+Entries are keyed by (normalized source text, source language, target
+language, engine). Normalization is Unicode NFC, collapsed whitespace and
+case folding, so "Twice daily" and "twice  daily" share an entry. Languages
+are stored as ISO codes, so "Hindi" (Gemini callers) and "hi"
+(deep_translator callers) share entries too.
+
+Two tiers, like the OCR result cache:
+
+- memory: an `LRUCache` per process;
+- disk: a SQLite table shared by every worker on the host.
+
+The glossary in `supabase/seed/medical_terms.csv` is loaded as engine
+"glossary" entries (English to Hindi, Telugu and Tamil). Every lookup falls
+back to them, so common terms never reach an upstream translator. Only
+successful translations should be stored: callers fall back to the source
+text on errors, and that must not be remembered as a translation.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from .glossary import read_glossary_csv
+from .languages import language_code
+from .lru_cache import MISSING, LRUCache
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = Path(__file__).parent.parent.parent.parent
+DEFAULT_PATH = REPO_ROOT / "backend" / "cache" / "translation_memory.sqlite3"
+DEFAULT_SEED = REPO_ROOT / "supabase" / "seed" / "medical_terms.csv"
+
+GLOSSARY = "glossary"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_source(text: str) -> str:
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip().casefold()
+
+
+class TranslationMemory:
+    def __init__(self, memory_size: int = 4096, path: Optional[str] = None):
+        self.memory = LRUCache(memory_size)
+        self.disk_hits = 0
+        self.stores = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            self._open(path)
+
+    @classmethod
+    def from_env(cls) -> "TranslationMemory":
+        memory = cls(
+            memory_size=int(os.getenv("TRANSLATION_MEMORY_SIZE", "4096")),
+            path=os.getenv("TRANSLATION_MEMORY_PATH", str(DEFAULT_PATH)),
+        )
+        seed = os.getenv("TRANSLATION_MEMORY_SEED", str(DEFAULT_SEED))
+        if seed:
+            memory.seed_csv(seed)
+        return memory
+
+    def _open(self, path: str) -> None:
+        try:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(path, check_same_thread=False, timeout=5)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                " source_lang TEXT NOT NULL, target_lang TEXT NOT NULL, engine TEXT NOT NULL,"
+                " source_text TEXT NOT NULL, translation TEXT NOT NULL, created REAL NOT NULL,"
+                " PRIMARY KEY (source_lang, target_lang, engine, source_text))"
+            )
+            db.commit()
+            self._db = db
+        except (sqlite3.Error, OSError) as e:
+            # A read-only or missing disk must not break translation; keep the memory tier
+            logger.warning(f"Translation memory disk tier disabled ({path}): {e}")
+
+    @staticmethod
+    def _key(text: str, source: str, target: str, engine: str) -> Tuple[str, str, str, str]:
+        return language_code(source, "auto"), language_code(target), engine, normalize_source(text)
+
+    def _lookup(self, key: Tuple[str, str, str, str]) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not MISSING:
+            return value
+        if self._db is None:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT translation FROM translations"
+                " WHERE source_lang = ? AND target_lang = ? AND engine = ? AND source_text = ?",
+                key,
+            ).fetchone()
+            if row is not None:
+                self.disk_hits += 1
+        if row is None:
+            return None
+        self.memory.put(key, row[0])
+        return row[0]
+
+    def get(self, text: str, target: str, source: str = "auto", engine: str = "google") -> Optional[str]:
+        """Remembered translation of `text` by `engine`, else the glossary's, else None."""
+        key = self._key(text, source, target, engine)
+        found = self._lookup(key)
+        if found is None and engine != GLOSSARY:
+            source_code = "en" if key[0] == "auto" else key[0]
+            found = self._lookup((source_code, key[1], GLOSSARY, key[3]))
+        return found
+
+    def put(self, text: str, translation: str, target: str, source: str = "auto", engine: str = "google") -> None:
+        self._store([(self._key(text, source, target, engine), translation)])
+
+    def _store(self, entries: Iterable[Tuple[Tuple[str, str, str, str], str]], replace: bool = True) -> int:
+        entries = [(key, value) for key, value in entries if key[3] and value]
+        for key, value in entries:
+            self.memory.put(key, value)
+        if self._db is None or not entries:
+            return len(entries)
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        now = time.time()
+        with self._lock:
+            try:
+                cur = self._db.executemany(
+                    f"{verb} INTO translations (source_lang, target_lang, engine, source_text, translation, created)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    [(*key, value, now) for key, value in entries],
+                )
+                self._db.commit()
+                self.stores += len(entries)
+                return cur.rowcount
+            except sqlite3.Error as e:
+                logger.warning(f"Translation memory write failed: {e}")
+                return 0
+
+    def seed_csv(self, path: str) -> int:
+        """Load glossary entries from a medical_terms.csv-style file; existing entries are kept."""
+        try:
+            terms = read_glossary_csv(path)
+        except OSError as e:
+            logger.warning(f"Translation memory seed not loaded ({path}): {e}")
+            return 0
+        entries = [
+            (("en", target, GLOSSARY, normalize_source(term)), translation)
+            for target, mapping in terms.items()
+            for term, translation in mapping.items()
+        ]
+        return self._store(entries, replace=False)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self._db is not None:
+            with self._lock:
+                self._db.execute("DELETE FROM translations")
+                self._db.commit()
+
+    def stats(self) -> Dict:
+        entries = None
+        if self._db is not None:
+            with self._lock:
+                entries = self._db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        return {
+            "memory": self.memory.stats(),
+            "disk_entries": entries,
+            "disk_hits": self.disk_hits,
+            "stores": self.stores,
+        }
+
+
+TRANSLATION_MEMORY = TranslationMemory.from_env()
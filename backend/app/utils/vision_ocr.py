@@ -5,9 +5,10 @@ Handles image preprocessing, Vision API calls, token extraction, and drug lexico
 
 import io
 import re
+import subprocess
 import tempfile
 import os
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from pathlib import Path
 
 # TrOCR (Hugging Face) optional local OCR fallback
@@ -19,38 +20,42 @@ try:
 except Exception:
     TROCR_AVAILABLE = False
 
-# Lazy-loaded TrOCR objects
-_TROCR_PROCESSOR = None
-_TROCR_MODEL = None
+from ..services.model_registry import MODELS
 
 def _load_trocr():
-    global _TROCR_PROCESSOR, _TROCR_MODEL
-    if _TROCR_PROCESSOR is None or _TROCR_MODEL is None:
-        # prefer handwritten TrOCR for prescriptions / handwriting
-        _TROCR_PROCESSOR = TrOCRProcessor.from_pretrained("microsoft/trocr-base-handwritten")
-        _TROCR_MODEL = VisionEncoderDecoderModel.from_pretrained("microsoft/trocr-base-handwritten")
-    return _TROCR_PROCESSOR, _TROCR_MODEL
+    # prefer handwritten TrOCR for prescriptions / handwriting; loaded once per process
+    return MODELS.get("trocr")
 
-def run_trocr_local(image_bytes: bytes) -> Tuple[str, Dict]:
-    """Run TrOCR locally on image bytes. Returns (raw_text, meta).
+def run_trocr_local(image: Union[bytes, "np.ndarray"]) -> Tuple[str, Dict]:
+    """Run TrOCR locally on encoded image bytes or a decoded BGR array. Returns (raw_text, meta).
 
-    Requires `transformers` and `torch` installed. This is a synchronous call
-    and may download model weights on first run (~200MB).
+    Requires `transformers` and `torch` installed. This is a synchronous call;
+    weights (~200MB) are read from the local model registry, never downloaded.
     """
     if not TROCR_AVAILABLE:
         raise Exception("TrOCR not available (install transformers and torch)")
 
     processor, model = _load_trocr()
-    img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+    if isinstance(image, np.ndarray):
+        img = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+    else:
+        img = Image.open(io.BytesIO(image)).convert("RGB")
     pixel_values = processor(images=img, return_tensors="pt").pixel_values
     generated_ids = model.generate(pixel_values)
     generated_text = processor.batch_decode(generated_ids, skip_special_tokens=True)[0]
     return generated_text, {"engine": "trocr", "success": True}
 import cv2
 import numpy as np
-from fuzzywuzzy import fuzz, process
 import requests
 
+from ..services.drug_index import DrugIndex
+from .lru_cache import LRUCache
+from .engine_race import race_engines
+from .circuit_breaker import BreakerRegistry
+from .image_normalize import NormalizedImage
+from .ocr_scanner import OCR_SCANNER
+from .regex_patterns import FREQUENCY_PATTERNS  # noqa: F401  (re-exported)
+
 try:
     import easyocr
     EASYOCR_AVAILABLE = True
@@ -89,6 +94,10 @@ def load_common_drugs():
         ]
 
 COMMON_DRUGS = load_common_drugs()
+# Letterhead text, vitals labels and common misspellings repeat across scans,
+# so best matches are memoized process-wide (bound to the lexicon version).
+DRUG_MATCH_CACHE = LRUCache(maxsize=int(os.getenv("DRUG_MATCH_CACHE_SIZE", "50000")))
+DRUG_INDEX = DrugIndex(COMMON_DRUGS, cache=DRUG_MATCH_CACHE)
 
 # Dosage units
 DOSAGE_UNITS = [
@@ -97,33 +106,32 @@ DOSAGE_UNITS = [
     r'\bcapsules\b', r'\bpuff\b', r'\bpuffs\b', r'\bdrop\b', r'\bdrops\b',
 ]
 
-# Frequency patterns
-FREQUENCY_PATTERNS = {
-    'once daily': [r'\bod\b', r'\bonce\s+daily\b', r'\b1x\b'],
-    'twice daily': [r'\bbd\b', r'\btwice\s+daily\b', r'\b2x\b', r'\bdouble\b'],
-    'thrice daily': [r'\btd\b', r'\bthrice\s+daily\b', r'\b3x\b', r'\btds\b'],
-    'four times daily': [r'\bqid\b', r'\b4x\b', r'\bfour\s+times\b'],
-    'every 4-6 hours': [r'\bq\s*[46]\s*h\b', r'\bevery\s+[46]\s*hours\b'],
-    'bedtime': [r'\bhs\b', r'\bbedtime\b', r'\bnightly\b'],
-    'as needed': [r'\bprn\b', r'\bas\s+needed\b'],
-}
-
-
 # ============================================================================
 # IMAGE PREPROCESSING
 # ============================================================================
-def preprocess_image(image_bytes: bytes, output_path: Optional[str] = None) -> str:
-    """
-    Preprocess image for OCR: denoise, increase contrast, adaptive threshold.
-    Returns path to preprocessed image.
-    """
-    # Read image from bytes
+def decode_image(image_bytes: bytes) -> np.ndarray:
+    """Decode uploaded image bytes into a BGR array (decoded once per request)."""
     nparr = np.frombuffer(image_bytes, np.uint8)
     img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
     
     if img is None:
         raise ValueError("Failed to decode image")
-    
+    return img
+
+
+def encode_png(img: np.ndarray) -> bytes:
+    """PNG-encode an array into an in-memory buffer."""
+    ok, buf = cv2.imencode('.png', img)
+    if not ok:
+        raise ValueError("Failed to encode image")
+    return buf.tobytes()
+
+
+def binarize_image(img: np.ndarray) -> np.ndarray:
+    """
+    Preprocess a decoded BGR image for OCR: denoise, increase contrast, adaptive threshold.
+    Returns the binarized grayscale array.
+    """
     # Convert to grayscale
     gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
     
@@ -147,11 +155,20 @@ def preprocess_image(image_bytes: bytes, output_path: Optional[str] = None) -> s
     # Optional: Remove very small noise blobs (morphological operation)
     kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
     binary = cv2.morphologyEx(binary, cv2.MORPH_OPEN, kernel, iterations=1)
+    return binary
+
+
+def preprocess_image(image_bytes: bytes, output_path: Optional[str] = None) -> str:
+    """
+    Preprocess image for OCR and write it to disk as PNG.
+    Returns path to preprocessed image. Kept for scripts that need a file;
+    the pipeline itself stays in memory (`decode_image` + `binarize_image`).
+    """
+    binary = binarize_image(decode_image(image_bytes))
     
     # Save to temp file if not specified
     if output_path is None:
         fd, output_path = tempfile.mkstemp(suffix='.png')
-        import os
         os.close(fd)
     
     cv2.imwrite(output_path, binary)
@@ -161,9 +178,10 @@ def preprocess_image(image_bytes: bytes, output_path: Optional[str] = None) -> s
 # ============================================================================
 # GOOGLE VISION OCR
 # ============================================================================
-def run_google_vision_ocr(image_path: str) -> Tuple[str, Dict]:
+def run_google_vision_ocr(image: Union[str, bytes, np.ndarray]) -> Tuple[str, Dict]:
     """
     Call Google Vision API with document_text_detection.
+    Accepts a file path, encoded image bytes, or a decoded array (PNG-encoded in memory).
     Returns (raw_text, document_annotation_object).
     """
     creds_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
@@ -171,8 +189,13 @@ def run_google_vision_ocr(image_path: str) -> Tuple[str, Dict]:
     
     client = vision.ImageAnnotatorClient()
     
-    with io.open(image_path, 'rb') as image_file:
-        content = image_file.read()
+    if isinstance(image, np.ndarray):
+        content = encode_png(image)
+    elif isinstance(image, bytes):
+        content = image
+    else:
+        with io.open(image, 'rb') as image_file:
+            content = image_file.read()
     
     image = vision.Image(content=content)
     
@@ -225,9 +248,10 @@ def run_ocr_space(image_bytes: bytes) -> Tuple[str, Dict]:
     return raw_text, j
 
 
-def run_easyocr(image_bytes: bytes) -> Tuple[str, Dict]:
+def run_easyocr(image: Union[bytes, np.ndarray]) -> Tuple[str, Dict]:
     """
     Local EasyOCR (no external dependencies required).
+    Accepts encoded image bytes or a decoded BGR array; nothing touches disk.
     Returns (raw_text, result_dict).
     """
     if not EASYOCR_AVAILABLE:
@@ -235,32 +259,31 @@ def run_easyocr(image_bytes: bytes) -> Tuple[str, Dict]:
     
     print(f"[DEBUG vision_ocr] Using local EasyOCR...")
     
-    # Save bytes to temp file
-    fd, temp_path = tempfile.mkstemp(suffix=".png")
-    try:
-        os.write(fd, image_bytes)
-        os.close(fd)
-        
-        # Initialize reader (downloads model on first use)
-        reader = easyocr.Reader(['en'], gpu=False)
-        
-        # Run OCR
-        results = reader.readtext(temp_path)
-        raw_text = "\n".join([text for (_, text, _) in results])
-        
-        print(f"[DEBUG vision_ocr] EasyOCR extracted {len(raw_text)} characters")
-        
-        return raw_text, {"engine": "easyocr", "success": True, "detections": len(results)}
-    finally:
-        try:
-            os.remove(temp_path)
-        except:
-            pass
+    # Shared reader, loaded once per process from local weights
+    reader = MODELS.get("easyocr")
+    
+    # Run OCR (easyocr expects RGB arrays; bytes are decoded by easyocr itself)
+    if isinstance(image, np.ndarray):
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    results = reader.readtext(image)
+    raw_text = "\n".join([text for (_, text, _) in results])
+    confs = [conf for (_, _, conf) in results]
+    
+    print(f"[DEBUG vision_ocr] EasyOCR extracted {len(raw_text)} characters")
+    
+    return raw_text, {
+        "engine": "easyocr",
+        "success": True,
+        "detections": len(results),
+        "confidence": sum(confs) / len(confs) if confs else 0.0,
+    }
 
 
-def run_pytesseract_local(image_bytes: bytes) -> Tuple[str, Dict]:
+def run_pytesseract_local(image: Union[bytes, np.ndarray]) -> Tuple[str, Dict]:
     """
-    Local Tesseract OCR via pytesseract (fallback).
+    Local Tesseract OCR (fallback).
+    The image is piped to the tesseract CLI on stdin (bytes as-is, arrays PNG-encoded
+    in memory) instead of being written to a temp file as pytesseract does.
     Returns (raw_text, empty_dict_as_placeholder).
     """
     if not PYTESSERACT_AVAILABLE:
@@ -268,20 +291,24 @@ def run_pytesseract_local(image_bytes: bytes) -> Tuple[str, Dict]:
     
     print(f"[DEBUG vision_ocr] Using local pytesseract...")
     
-    fd, temp_path = tempfile.mkstemp(suffix=".png")
+    content = encode_png(image) if isinstance(image, np.ndarray) else image
+    cmd = pytesseract.pytesseract.tesseract_cmd
     try:
-        os.write(fd, image_bytes)
-        os.close(fd)
-        
-        raw_text = pytesseract.image_to_string(temp_path, lang="eng")
-        print(f"[DEBUG vision_ocr] pytesseract extracted {len(raw_text)} characters")
-        
-        return raw_text, {"engine": "pytesseract", "success": True}
-    finally:
-        try:
-            os.remove(temp_path)
-        except:
-            pass
+        proc = subprocess.run(
+            [cmd, "stdin", "stdout", "-l", "eng"],
+            input=content,
+            capture_output=True,
+            timeout=int(os.getenv("TESSERACT_TIMEOUT_S", "60")),
+        )
+    except FileNotFoundError:
+        raise pytesseract.TesseractNotFoundError()
+    if proc.returncode != 0:
+        raise pytesseract.TesseractError(proc.returncode, proc.stderr.decode("utf-8", errors="ignore"))
+    
+    raw_text = proc.stdout.decode("utf-8", errors="ignore")
+    print(f"[DEBUG vision_ocr] pytesseract extracted {len(raw_text)} characters")
+    
+    return raw_text, {"engine": "pytesseract", "success": True}
 
 
 def extract_tokens_with_confidence(doc) -> List[Dict]:
@@ -312,37 +339,10 @@ def normalize_ocr_text(text: str) -> str:
     - Fix common character confusions (O/0, l/1, S/5)
     - Normalize whitespace and remove excessive punctuation
     - Lowercase for normalization
+
+    All rules run in one compiled sweep (see `ocr_scanner`).
     """
-    if not text:
-        return text
-    s = text
-    # Common OCR confusions mapping
-    replacements = {
-        '\\bO\\b': '0',  # single O -> 0
-    }
-    # Replace some typical character confusions within words
-    s = s.replace('\u2013', '-')
-    s = s.replace('\u2014', '-')
-    s = s.replace('—', '-')
-    # Normalize common visual confusions within tokens
-    s = s.replace('lmg', 'mg')
-    s = s.replace('l0', '10')
-    s = s.replace('Omg', '0mg')
-    s = s.replace('O', 'O')
-    # Replace letter-like digits heuristics
-    s = re.sub(r'(?<=\d)\s*[oO]\s*(?=\d)', '0', s)
-    # Correct some frequent OCR errors: I/1, l/1 in units context
-    s = re.sub(r'\bl\b', '1', s)
-    # Normalize multipliers like 'x' variants to 'x'
-    s = re.sub(r'[×xX]', 'x', s)
-    # Remove excessive punctuation
-    s = re.sub(r'[\u2026\,;:]+', ' ', s)
-    # Collapse whitespace
-    s = re.sub(r'\s+', ' ', s)
-    s = s.strip()
-    # Lowercase for matching against lexicon
-    s = s.lower()
-    return s
+    return OCR_SCANNER.normalize(text)
 
 
 # ============================================================================
@@ -356,6 +356,8 @@ def match_drug_candidates(
 ) -> List[Dict]:
     """
     Fuzzy-match against `COMMON_DRUGS` using n-gram search on `raw_text` and token fallback.
+    All n-grams and tokens are scored in one `DRUG_INDEX.extract_many` batch, so each
+    distinct query string is matched once per call.
 
     Strategy:
     - Generate n-grams (1..4 words) from `raw_text` (cleaned) and fuzzy-match each n-gram
@@ -368,7 +370,7 @@ def match_drug_candidates(
 
     text = clean_text(raw_text or "")
     words = [w for w in text.split() if w]
-    candidates = []
+    queries = []  # (query, match_text) in the order candidates are reported
 
     # n-gram search (1..4)
     max_n = 4
@@ -378,9 +380,7 @@ def match_drug_candidates(
             # skip too short
             if len(ngram) < 3:
                 continue
-            best = process.extractOne(ngram, COMMON_DRUGS, scorer=fuzz.token_sort_ratio)
-            if best and best[1] >= min_score:
-                candidates.append({'drug': best[0], 'score': best[1], 'match_text': ngram})
+            queries.append((ngram, ngram))
 
     # token-level fallback (if no candidates found yet or to boost confidence)
     token_texts = [t['text'] for t in tokens]
@@ -388,9 +388,14 @@ def match_drug_candidates(
         cleaned = clean_text(t)
         if not cleaned.strip():
             continue
-        best = process.extractOne(cleaned, COMMON_DRUGS, scorer=fuzz.token_sort_ratio)
-        if best and best[1] >= min_score:
-            candidates.append({'drug': best[0], 'score': best[1], 'match_text': t})
+        queries.append((cleaned, t))
+
+    best_by_query = DRUG_INDEX.extract_many([q for q, _ in queries], score_cutoff=min_score)
+    candidates = []
+    for query, match_text in queries:
+        best = best_by_query.get(query)
+        if best:
+            candidates.append({'drug': best[0], 'score': best[1], 'match_text': match_text})
 
     # Deduplicate by drug name, keep highest score and include example context
     unique = {}
@@ -411,9 +416,14 @@ def extract_dosages(text: str) -> List[str]:
     """
     Extract dosage patterns: {number}{unit}
     """
-    pattern = r'\b(\d+(?:\.\d+)?)\s*(?:mg|g|ml|mcg|iu|tablets?|capsules?|puffs?|drops?)\b'
-    matches = re.findall(pattern, text, flags=re.I)
-    return matches
+    return OCR_SCANNER.extract(text).dosages()
+
+
+# Full dosage substrings, e.g. '500 mg', '1 tablet', '2-3 tablets'
+DOSAGE_MATCH_RE = re.compile(
+    r"\b\d+(?:[-–—]\d+)?(?:\.\d+)?\s*(?:mg|g|ml|mcg|iu|tablets?|tablet|capsules?|capsule|puffs?|drops?|tabs?)\b",
+    flags=re.I,
+)
 
 
 def find_dosage_matches(text: str) -> List[str]:
@@ -421,10 +431,7 @@ def find_dosage_matches(text: str) -> List[str]:
     Find full dosage substrings in text, e.g. '500 mg', '1 tablet', '2-3 tablets'
     Returns list of matched substrings (raw appearance).
     """
-    pattern = r"\b\d+(?:[-–—]\d+)?(?:\.\d+)?\s*(?:mg|g|ml|mcg|iu|tablets?|tablet|capsules?|capsule|puffs?|drops?|tabs?)\b"
-    matches = re.findall(pattern, text, flags=re.I)
-    # normalize whitespace
-    return [m.strip() for m in matches]
+    return [m.strip() for m in DOSAGE_MATCH_RE.findall(text)]
 
 
 def associate_dosages(drug_candidates: List[Dict], raw_text: str, window_chars: int = 80) -> List[Dict]:
@@ -439,32 +446,21 @@ def associate_dosages(drug_candidates: List[Dict], raw_text: str, window_chars:
         return results
 
     text_lower = raw_text.lower()
+    # One scan of the whole text; each window takes the dosages that fall inside it
+    all_dosages = [(m.start(), m.end(), m.group().strip()) for m in DOSAGE_MATCH_RE.finditer(raw_text)]
     for c in drug_candidates:
         match_text = c.get('match_text', '') or ''
         dosages_found = set()
 
         # find all occurrences of the match_text in raw_text (case-insensitive)
-        try:
-            for m in re.finditer(re.escape(match_text.lower()), text_lower):
-                start, end = m.start(), m.end()
-                a = max(0, start - window_chars)
-                b = min(len(text_lower), end + window_chars)
-                window = raw_text[a:b]
-                found = find_dosage_matches(window)
-                for d in found:
-                    dosages_found.add(d)
-        except re.error:
-            # If match_text contains regex-sensitive content, fallback to scanning whole text
-            found = find_dosage_matches(raw_text)
-            for d in found:
-                dosages_found.add(d)
-
-        # If no dosages found near match_text, try scanning whole text for likely dosage associated with drug name
+        for m in re.finditer(re.escape(match_text.lower()), text_lower):
+            a = max(0, m.start() - window_chars)
+            b = min(len(text_lower), m.end() + window_chars)
+            dosages_found.update(d for start, end, d in all_dosages if start >= a and end <= b)
+
+        # If no dosages found near match_text, fall back to every dosage in the text
         if not dosages_found:
-            # naive approach: find any dosage that appears near the drug name words
-            found = find_dosage_matches(raw_text)
-            for d in found:
-                dosages_found.add(d)
+            dosages_found.update(d for _, _, d in all_dosages)
 
         results.append({
             'drug': c.get('drug'),
@@ -480,29 +476,14 @@ def extract_dosage_forms(text: str) -> List[str]:
     """
     Extract dosage forms: tablet, capsule, syrup, injection, etc.
     """
-    forms = [
-        'tablet', 'capsule', 'syrup', 'injection', 'cream', 'ointment',
-        'lotion', 'gel', 'suspension', 'solution', 'powder',
-    ]
-    pattern = r'\b(' + '|'.join(forms) + r')\b'
-    matches = re.findall(pattern, text, flags=re.I)
-    return [m.lower() for m in matches]
+    return OCR_SCANNER.extract(text).dosage_forms()
 
 
 def extract_frequencies(text: str) -> Dict[str, List[str]]:
     """
     Extract frequency patterns from text.
     """
-    frequencies = {}
-    for freq_name, patterns in FREQUENCY_PATTERNS.items():
-        matched = []
-        for p in patterns:
-            matches = re.findall(p, text, flags=re.I)
-            matched.extend(matches)
-        if matched:
-            frequencies[freq_name] = list(set(matched))
-    
-    return frequencies
+    return OCR_SCANNER.extract(text).frequencies()
 
 
 def extract_patient_name(raw_text: str, tokens: List[Dict]) -> Optional[str]:
@@ -562,21 +543,70 @@ def extract_patient_name(raw_text: str, tokens: List[Dict]) -> Optional[str]:
 # ============================================================================
 # MAIN PIPELINE
 # ============================================================================
-def process_prescription_image(image_bytes: bytes) -> Dict:
+# One breaker per engine, shared by all requests in this process
+ENGINE_BREAKERS = BreakerRegistry()
+
+
+def _call_engine(engine: str, fn):
+    """Run an engine call through its circuit breaker; known-dead engines fail instantly."""
+    breaker = ENGINE_BREAKERS.get(engine)
+    if not breaker.allow():
+        raise breaker.open_error()
+    try:
+        result = fn()
+    except Exception as e:
+        breaker.record_failure(e)
+        raise
+    breaker.record_success()
+    return result
+
+
+def _race_confidence(engine: str, result: Tuple) -> Optional[float]:
+    """Score an engine attempt `(raw_text, engine, doc_or_meta)` for the OCR race."""
+    raw_text, _, extra = result
+    if not raw_text or not raw_text.strip():
+        return None
+    if engine == 'google_vision':
+        tokens = extract_tokens_with_confidence(extra)
+        return sum(t['confidence'] for t in tokens) / len(tokens) if tokens else 0.5
+    if isinstance(extra, dict) and 'confidence' in extra:
+        return extra['confidence']
+    # Same default the pipeline assigns to tokens from engines without confidences
+    return 0.5
+
+
+# Engines whose inputs are derived from the normalized decode (Google Vision reads
+# the 'preprocess' binarization)
+PIPELINE_ENGINES = ('preprocess', 'trocr', 'easyocr', 'pytesseract', 'ocr_space')
+
+
+def process_prescription_image(image_bytes: bytes, preferred: Optional[str] = None) -> Dict:
     """
     Full pipeline: preprocess -> OCR (with fallback) -> extract tokens -> fuzzy match -> extract entities.
     Fallback order: Google Vision -> OCR.space -> EasyOCR -> pytesseract.
+    With OCR_EXECUTION_MODE=race, the engines in OCR_RACE_ENGINES run concurrently and
+    the first result above OCR_RACE_ACCEPT_CONFIDENCE (or the most confident one at
+    the OCR_RACE_DEADLINE_S deadline) is used instead of the serial chain.
+    Every engine call goes through its ENGINE_BREAKERS circuit breaker, so engines that
+    keep failing (missing credentials, exhausted quota) are skipped without a call.
+    `preferred` overrides the PREFERRED_OCR environment variable for this call.
+    The upload is downscaled per engine first (see utils.image_normalize).
     Returns structured prescription data.
     """
-    preprocessed_path = preprocess_image(image_bytes)
+    # Decode once (reduced to the largest per-engine target) and binarize at the
+    # preprocessing size; every engine works on in-memory arrays or buffers
+    normalized = NormalizedImage.for_engines(image_bytes, PIPELINE_ENGINES)
+    binary = binarize_image(normalized.array('preprocess'))
     
     raw_text = None
     ocr_engine = None
     tokens = []
     doc = None
     
-    # Determine preferred OCR engine: allow environment override
-    preferred = os.getenv("PREFERRED_OCR", "").strip().lower()
+    # Determine preferred OCR engine: allow argument or environment override
+    if preferred is None:
+        preferred = os.getenv("PREFERRED_OCR", "")
+    preferred = preferred.strip().lower()
 
     # Try engines in preferred order. Two common modes:
     # - preferred == 'trocr' : TrOCR -> Google Vision -> ...
@@ -593,7 +623,7 @@ def process_prescription_image(image_bytes: bytes) -> Dict:
         if TROCR_AVAILABLE:
             try:
                 print("[DEBUG] Attempting local TrOCR (HF)...")
-                rtext, _ = run_trocr_local(image_bytes)
+                rtext, _ = _call_engine('trocr', lambda: run_trocr_local(normalized.array('trocr')))
                 print("[DEBUG] TrOCR succeeded")
                 return rtext, "trocr", None
             except Exception as et:
@@ -607,7 +637,7 @@ def process_prescription_image(image_bytes: bytes) -> Dict:
         nonlocal vision_error
         try:
             print("[DEBUG] Attempting Google Vision OCR...")
-            rtext, doc = run_google_vision_ocr(preprocessed_path)
+            rtext, doc = _call_engine('google_vision', lambda: run_google_vision_ocr(binary))
             print("[DEBUG] Google Vision succeeded")
             return rtext, "google_vision", doc
         except Exception as e:
@@ -619,7 +649,7 @@ def process_prescription_image(image_bytes: bytes) -> Dict:
         nonlocal ocr_space_error
         try:
             print("[DEBUG] Attempting OCR.space...")
-            rtext, meta = run_ocr_space(image_bytes)
+            rtext, meta = _call_engine('ocr_space', lambda: run_ocr_space(normalized.encoded('ocr_space')))
             print("[DEBUG] OCR.space succeeded")
             return rtext, "ocr_space", meta
         except Exception as e:
@@ -631,7 +661,7 @@ def process_prescription_image(image_bytes: bytes) -> Dict:
         nonlocal easyocr_error
         try:
             print("[DEBUG] Attempting EasyOCR...")
-            rtext, meta = run_easyocr(image_bytes)
+            rtext, meta = _call_engine('easyocr', lambda: run_easyocr(normalized.array('easyocr')))
             print("[DEBUG] EasyOCR succeeded")
             return rtext, "easyocr", meta
         except Exception as e:
@@ -643,7 +673,7 @@ def process_prescription_image(image_bytes: bytes) -> Dict:
         nonlocal pytesseract_error
         try:
             print("[DEBUG] Attempting local pytesseract...")
-            rtext, meta = run_pytesseract_local(image_bytes)
+            rtext, meta = _call_engine('pytesseract', lambda: run_pytesseract_local(normalized.encoded('pytesseract')))
             print("[DEBUG] pytesseract succeeded")
             return rtext, "pytesseract", meta
         except Exception as e:
@@ -653,8 +683,29 @@ def process_prescription_image(image_bytes: bytes) -> Dict:
 
     raw_text = None
     doc = None
+    execution_mode = os.getenv("OCR_EXECUTION_MODE", "serial").strip().lower()
+    if execution_mode == 'race':
+        # Launch the configured engines together; latency is bounded by the deadline
+        engines = {
+            'google_vision': try_vision,
+            'trocr': try_tr0cr,
+            'pytesseract': try_pytesseract,
+            'ocr_space': try_ocr_space,
+            'easyocr': try_easyocr,
+        }
+        selected = [e.strip() for e in os.getenv("OCR_RACE_ENGINES", "google_vision,pytesseract,ocr_space").split(",")]
+        winner = race_engines(
+            {name: engines[name] for name in selected if name in engines},
+            deadline=float(os.getenv("OCR_RACE_DEADLINE_S", "8")),
+            confidence=_race_confidence,
+            accept_confidence=float(os.getenv("OCR_RACE_ACCEPT_CONFIDENCE", "0.8")),
+        )
+        if winner is not None:
+            raw_text, ocr_engine, extra = winner[1]
+            if ocr_engine == 'google_vision':
+                doc = extra
     # prefer trocr first if requested
-    if preferred == 'trocr':
+    elif preferred == 'trocr':
         raw_text, ocr_engine, e = try_tr0cr()
         if raw_text is None: raw_text, ocr_engine, e = try_vision()
         if raw_text is None: raw_text, ocr_engine, e = try_ocr_space()
@@ -679,8 +730,10 @@ def process_prescription_image(image_bytes: bytes) -> Dict:
     if not raw_text:
         raise Exception(f"All OCR engines failed. Vision: {vision_error} | TrOCR: {trocr_error} | OCR.space: {ocr_space_error} | EasyOCR: {easyocr_error} | pytesseract: {pytesseract_error}")
     
-    # Post-process OCR text to normalize common OCR errors before tokenization
-    raw_text = normalize_ocr_text(raw_text)
+    # Post-process OCR text to normalize common OCR errors before tokenization,
+    # and pick out dosages, forms and frequencies from the normalized text
+    scan = OCR_SCANNER.scan(raw_text)
+    raw_text = scan.text
 
     # Extract tokens with confidence (only if using Vision which provides token-level confidence)
     if doc is not None:
@@ -693,15 +746,9 @@ def process_prescription_image(image_bytes: bytes) -> Dict:
     drug_candidates = match_drug_candidates(tokens, raw_text, min_score=70, min_confidence=0.4)
     
     # Extract structured entities
-    dosages = extract_dosages(raw_text)
-    dosage_forms = extract_dosage_forms(raw_text)
-    frequencies = extract_frequencies(raw_text)
-    
-    # Clean up temp file
-    try:
-        os.remove(preprocessed_path)
-    except:
-        pass
+    dosages = scan.dosages()
+    dosage_forms = scan.dosage_forms()
+    frequencies = scan.frequencies()
     
     # Extract patient name heuristically
     patient_name = extract_patient_name(raw_text, tokens)
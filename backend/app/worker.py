@@ -0,0 +1,190 @@
+"""
+Job worker: runs jobs queued through POST /jobs outside the web tier.
+
+    cd backend
+    python -m app.worker --processes 4
+
+Each process claims jobs from the SQLite queue (utils/job_queue.py) and runs
+up to WORKER_CONCURRENCY of them at once (default 2; extraction is mostly
+waiting on Gemini). A running job's lease is renewed every third of the
+visibility timeout, so only a dead worker lets it expire. SIGTERM/SIGINT
+stop claiming and let in-flight jobs finish. `--until-idle` exits once the
+queue is empty, for running from cron or a scheduled task.
+
+Workers scale independently of the web tier: start more processes, or more
+hosts sharing the queue file's volume.
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import HTTPException
+
+from . import main as _web  # noqa: F401  (loads .env and Google credentials like the web tier)
+from .routes.ocr import _extract_one
+from .services.gemini_extractor import get_gemini_extractor
+from .services.model_registry import MODELS
+from .utils.job_queue import SUCCEEDED, Job, JobQueue, get_job_queue
+from .utils.ocr_pool import OCR_POOL
+
+logger = logging.getLogger(__name__)
+
+
+class JobFailed(Exception):
+    """A failed attempt; `retryable=False` sends the job straight to the dead-letter state."""
+
+    def __init__(self, message: str, retryable: bool = True, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+async def ocr_extract(job: Job) -> Dict:
+    """Same extraction as /ocr/extract; HTTP errors decide whether a retry can help."""
+    payload = job.payload
+    try:
+        result, _ = await _extract_one(
+            job.data or b"",
+            payload.get("mime_type"),
+            payload.get("language", "English"),
+            get_gemini_extractor(),
+            bypass=payload.get("fresh", False),
+        )
+    except HTTPException as e:
+        retry_after = (e.headers or {}).get("Retry-After")
+        raise JobFailed(
+            str(e.detail),
+            retryable=e.status_code >= 500,
+            retry_after=float(retry_after) if retry_after else None,
+        )
+    return result
+
+
+HANDLERS: Dict[str, Callable[[Job], Awaitable[Any]]] = {
+    "ocr.extract": ocr_extract,
+}
+
+
+async def _keep_lease(queue: JobQueue, job: Job) -> None:
+    while True:
+        await asyncio.sleep(queue.visibility_timeout / 3)
+        if not await asyncio.to_thread(queue.extend, job):
+            logger.warning(f"Lost the lease on job {job.id}; another worker may run it again")
+            return
+
+
+async def run_job(queue: JobQueue, job: Job) -> str:
+    """Run one claimed job and record the outcome; returns the job's new status."""
+    started = time.perf_counter()
+    heartbeat = asyncio.create_task(_keep_lease(queue, job))
+    try:
+        handler = HANDLERS.get(job.kind)
+        if handler is None:
+            raise JobFailed(f"Unknown job kind: {job.kind}", retryable=False)
+        result = await handler(job)
+    except JobFailed as e:
+        status = await asyncio.to_thread(queue.fail, job, str(e), e.retryable, e.retry_after)
+    except Exception as e:
+        logger.exception(f"Job {job.id} crashed")
+        status = await asyncio.to_thread(queue.fail, job, f"{type(e).__name__}: {e}")
+    else:
+        await asyncio.to_thread(queue.complete, job, result)
+        status = SUCCEEDED
+    finally:
+        heartbeat.cancel()
+    logger.info(
+        f"Job {job.id} ({job.kind}) attempt {job.attempts}/{job.max_attempts}: {status}"
+        f" in {time.perf_counter() - started:.1f}s"
+    )
+    return status
+
+
+async def work(
+    queue: JobQueue,
+    concurrency: int = 2,
+    poll_interval: float = 1.0,
+    stop: Optional[asyncio.Event] = None,
+    until_idle: bool = False,
+) -> None:
+    """Claim and run jobs until `stop` is set (or, with `until_idle`, the queue is empty)."""
+    stop = stop or asyncio.Event()
+    running = set()
+    last_purge = 0.0
+    while not stop.is_set():
+        if time.monotonic() - last_purge > 3600:
+            await asyncio.to_thread(queue.purge)
+            last_purge = time.monotonic()
+
+        while len(running) < concurrency:
+            job = await asyncio.to_thread(queue.claim)
+            if job is None:
+                break
+            running.add(asyncio.create_task(run_job(queue, job)))
+
+        if running:
+            _, running = await asyncio.wait(running, timeout=poll_interval, return_when=asyncio.FIRST_COMPLETED)
+        elif until_idle:
+            break
+        else:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=poll_interval)
+            except asyncio.TimeoutError:
+                pass
+    if running:
+        await asyncio.gather(*running)
+
+
+def _serve(concurrency: int, poll_interval: float, until_idle: bool) -> None:
+    logging.basicConfig(level=logging.INFO, format=f"%(asctime)s [worker {os.getpid()}] %(message)s")
+    names = [n.strip() for n in os.getenv("OCR_PRELOAD_MODELS", "easyocr,trocr").split(",") if n.strip()]
+    if names:
+        logger.info(f"Model warm-up: {MODELS.warm(names)}")
+
+    async def serve() -> None:
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop.set)
+        await work(get_job_queue(), concurrency, poll_interval, stop, until_idle)
+
+    try:
+        asyncio.run(serve())
+    finally:
+        OCR_POOL.shutdown()
+
+
+def run(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Run queued MediTranslate jobs.")
+    parser.add_argument("--processes", type=int, default=int(os.getenv("WORKER_PROCESSES", "1")))
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("WORKER_CONCURRENCY", "2")))
+    parser.add_argument("--poll-interval", type=float, default=float(os.getenv("JOB_POLL_INTERVAL_S", "1")))
+    parser.add_argument("--until-idle", action="store_true", help="exit once no job is ready")
+    args = parser.parse_args(argv)
+
+    options = (args.concurrency, args.poll_interval, args.until_idle)
+    if args.processes <= 1:
+        _serve(*options)
+        return
+
+    workers = [multiprocessing.Process(target=_serve, args=options) for _ in range(args.processes)]
+    for process in workers:
+        process.start()
+    # Forward SIGTERM so every worker drains its in-flight jobs
+    signal.signal(signal.SIGTERM, lambda *_: [p.terminate() for p in workers])
+    try:
+        for process in workers:
+            process.join()
+    except KeyboardInterrupt:
+        # The terminal already sent SIGINT to every worker; wait for them to drain
+        for process in workers:
+            process.join()
+
+
+if __name__ == "__main__":
+    run()
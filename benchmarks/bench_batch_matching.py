@@ -0,0 +1,61 @@
+"""
+Benchmark: per-query `DrugIndex.extract_one` vs batched `DrugIndex.extract_many`.
+
+The query set is what `match_drug_candidates` builds for the noisy sample scan:
+every 1-4 word n-gram plus the token-level fallback. Run from the repository root:
+
+    python benchmarks/bench_batch_matching.py
+"""
+import re
+import time
+
+from common import SAMPLE_OCR_TEXT, SAMPLE_TOKENS, synthetic_lexicon
+
+from app.services.drug_index import DrugIndex, RAPIDFUZZ_AVAILABLE, sort_key
+from app.utils.vision_ocr import COMMON_DRUGS
+
+MIN_SCORE = 70
+SIZES = [len(COMMON_DRUGS), 1000, 5000, 20000, 50000]
+
+
+def scan_queries():
+    def clean(s):
+        return re.sub(r"[^A-Za-z0-9\s]", " ", s).lower()
+
+    words = clean(SAMPLE_OCR_TEXT).split()
+    queries = []
+    for n in range(1, 5):
+        for i in range(len(words) - n + 1):
+            gram = " ".join(words[i:i + n])
+            if len(gram) >= 3:
+                queries.append(gram)
+    queries.extend(clean(t["text"]) for t in SAMPLE_TOKENS if clean(t["text"]).strip())
+    return queries
+
+
+def main():
+    if not RAPIDFUZZ_AVAILABLE:
+        print("rapidfuzz not installed: extract_many falls back to per-query lookups")
+    queries = scan_queries()
+    unique = len({sort_key(q) for q in queries})
+    print(f"{len(queries)} queries per scan ({unique} distinct after normalization), cutoff {MIN_SCORE}\n")
+    print(f"{'lexicon':>8} | {'per-query ms':>12} | {'batch ms':>8} | {'speedup':>7} | agree")
+    for size in SIZES:
+        index = DrugIndex(synthetic_lexicon(COMMON_DRUGS, size))
+
+        t0 = time.perf_counter()
+        single = [index.extract_one(q, score_cutoff=MIN_SCORE) for q in queries]
+        single_ms = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        batch = index.extract_many(queries, score_cutoff=MIN_SCORE)
+        batch_ms = (time.perf_counter() - t0) * 1000
+
+        # The batch path is exhaustive, so disagreements are shortlist misses
+        # of extract_one on large lexicons.
+        agree = sum(batch[q] == s for q, s in zip(queries, single)) / len(queries)
+        print(f"{size:>8} | {single_ms:>12.1f} | {batch_ms:>8.1f} | {single_ms / batch_ms:>6.1f}x | {agree:.1%}")
+
+
+if __name__ == "__main__":
+    main()
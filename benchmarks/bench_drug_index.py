@@ -0,0 +1,65 @@
+"""
+Benchmark: linear `process.extractOne` vs `DrugIndex.extract_one` as the lexicon grows.
+
+Queries are every 1-4 word n-gram of the noisy sample OCR text, exactly as
+`match_drug_candidates` generates them. Run from the repository root:
+
+    python benchmarks/bench_drug_index.py
+"""
+import re
+import time
+
+from common import SAMPLE_OCR_TEXT, synthetic_lexicon
+
+from fuzzywuzzy import fuzz, process
+from app.services.drug_index import DrugIndex
+from app.utils.vision_ocr import COMMON_DRUGS
+
+MIN_SCORE = 70
+SIZES = [len(COMMON_DRUGS), 1000, 5000, 20000, 50000]
+
+
+def ngrams(text, max_n=4):
+    words = re.sub(r"[^A-Za-z0-9\s]", " ", text).lower().split()
+    out = []
+    for n in range(1, max_n + 1):
+        for i in range(len(words) - n + 1):
+            gram = " ".join(words[i:i + n])
+            if len(gram) >= 3:
+                out.append(gram)
+    return out
+
+
+def linear(query, names):
+    best = process.extractOne(query, names, scorer=fuzz.token_sort_ratio)
+    return best if best and best[1] >= MIN_SCORE else None
+
+
+def main():
+    queries = ngrams(SAMPLE_OCR_TEXT)
+    print(f"{len(queries)} n-gram queries per scan, cutoff {MIN_SCORE}\n")
+    print(f"{'lexicon':>8} | {'build s':>8} | {'linear ms/scan':>14} | {'index ms/scan':>13} | {'speedup':>7} | agree")
+    for size in SIZES:
+        names = synthetic_lexicon(COMMON_DRUGS, size)
+
+        t0 = time.perf_counter()
+        index = DrugIndex(names)
+        build = time.perf_counter() - t0
+
+        # The linear scan is too slow to run over every query at large sizes; sample it.
+        sample = queries if size <= 5000 else queries[::10]
+        t0 = time.perf_counter()
+        expected = [linear(q, names) for q in sample]
+        linear_ms = (time.perf_counter() - t0) * 1000 * len(queries) / len(sample)
+
+        t0 = time.perf_counter()
+        got = [index.extract_one(q, score_cutoff=MIN_SCORE) for q in queries]
+        index_ms = (time.perf_counter() - t0) * 1000
+
+        step = 1 if sample is queries else 10
+        agree = sum(e == g for e, g in zip(expected, got[::step])) / len(sample)
+        print(f"{size:>8} | {build:>8.2f} | {linear_ms:>14.1f} | {index_ms:>13.1f} | {linear_ms / index_ms:>6.1f}x | {agree:.1%}")
+
+
+if __name__ == "__main__":
+    main()
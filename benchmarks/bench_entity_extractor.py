@@ -0,0 +1,55 @@
+"""
+Benchmark: entity tagging with one Aho-Corasick automaton vs a compiled regex
+alternation of the same terms, as the drug lexicon grows.
+
+The regex engine tries the alternatives one after another at each
+position, so its scan time grows with the lexicon. The automaton's scan time
+depends only on the text length. Run from the repository root:
+
+    python benchmarks/bench_entity_extractor.py
+"""
+import re
+import time
+
+from common import synthetic_lexicon
+
+from app.services.entity_extractor import DRUG, EntityExtractor, default_vocabulary
+
+SIZES = [1000, 10000, 100000]
+REPEATS = 20
+TEXT = (
+    "Tab. Pan D 40mg twice daily before food. Cap. Amoxicillin 500 mg 1-0-1 for 5 days. "
+    "Syp. Ascoril 10 ml at bedtime for cough. Dolo 650 SOS for fever and body pain. "
+) * 10
+
+
+def main():
+    base = default_vocabulary()
+    print(f"{len(TEXT)} characters, {REPEATS} scans\n")
+    print(f"{'terms':>7} | {'automaton build s':>17} | {'scan ms':>7} | {'regex build s':>13} | {'scan ms':>7}")
+    for size in SIZES:
+        vocabulary = dict(base)
+        vocabulary.update((name, (DRUG, name)) for name in synthetic_lexicon(list(base), size)[len(base):])
+
+        t0 = time.perf_counter()
+        extractor = EntityExtractor(vocabulary)
+        build = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for _ in range(REPEATS):
+            extractor.extract(TEXT)
+        scan = (time.perf_counter() - t0) / REPEATS
+
+        terms = sorted(vocabulary, key=len, reverse=True)
+        t0 = time.perf_counter()
+        pattern = re.compile(r"(?<!\w)(?:" + "|".join(map(re.escape, terms)) + r")(?!\w)", re.I)
+        regex_build = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for _ in range(REPEATS):
+            pattern.findall(TEXT)
+        regex_scan = (time.perf_counter() - t0) / REPEATS
+
+        print(f"{len(vocabulary):>7} | {build:>17.2f} | {scan * 1000:>7.2f} | {regex_build:>13.2f} | {regex_scan * 1000:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: multi-index Hamming search (app/utils/near_duplicate.py) vs a
+vectorized linear scan, at growing numbers of stored fingerprints.
+
+Run from the repository root:
+
+    python benchmarks/bench_near_duplicate.py
+"""
+import random
+import time
+
+import numpy as np
+
+from common import SAMPLE_OCR_TEXT  # noqa: F401  (puts backend/ on sys.path)
+
+from app.utils.near_duplicate import MultiIndexHash
+
+SIZES = [10_000, 100_000, 1_000_000, 2_000_000]
+QUERIES = 200
+RADIUS = 4
+
+
+def popcount64(x):
+    # SWAR popcount on uint64 arrays
+    x = x - ((x >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    x = (x & np.uint64(0x3333333333333333)) + ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return (x * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+
+def main():
+    rnd = random.Random(0)
+    print(f"radius {RADIUS}, {QUERIES} queries (half planted near-duplicates)\n")
+    print(f"{'stored':>9} | {'build s':>7} | {'MIH us/query':>12} | {'scan us/query':>13} | {'speedup':>7} | agree")
+    for size in SIZES:
+        hashes = [rnd.getrandbits(64) for _ in range(size)]
+        index = MultiIndexHash()
+        t0 = time.perf_counter()
+        for h in hashes:
+            index.add(h)
+        build = time.perf_counter() - t0
+
+        queries = []
+        for i in range(QUERIES):
+            h = hashes[rnd.randrange(size)] if i % 2 == 0 else rnd.getrandbits(64)
+            for b in rnd.sample(range(64), rnd.randint(0, RADIUS)):
+                h ^= 1 << b
+            queries.append(h)
+
+        t0 = time.perf_counter()
+        mih = [index.search(q, RADIUS) for q in queries]
+        mih_us = (time.perf_counter() - t0) / QUERIES * 1e6
+
+        stored = np.array(hashes, dtype=np.uint64)
+        t0 = time.perf_counter()
+        scan = []
+        for q in queries:
+            dist = popcount64(stored ^ np.uint64(q))
+            hits = np.nonzero(dist <= RADIUS)[0]
+            scan.append(sorted((int(dist[i]), int(i)) for i in hits))
+        scan_us = (time.perf_counter() - t0) / QUERIES * 1e6
+
+        agree = sum(a == b for a, b in zip(mih, scan)) / QUERIES
+        print(f"{size:>9} | {build:>7.1f} | {mih_us:>12.1f} | {scan_us:>13.1f} | {scan_us / mih_us:>6.1f}x | {agree:.0%}")
+
+
+if __name__ == "__main__":
+    main()
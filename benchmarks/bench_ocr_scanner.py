@@ -0,0 +1,115 @@
+"""
+Benchmark: OCR post-processing with the compiled scanner vs the previous
+function set (a chain of str.replace/re.sub calls, then one regex pass per
+dosage, form and frequency pattern).
+
+The previous functions are copied inline below as the baseline. Before
+timing, both paths are checked for identical output on the timed inputs and
+on `--fuzz` random strings built from OCR confusions, doses, forms,
+frequencies and codes. Run from the repository root:
+
+    python benchmarks/bench_ocr_scanner.py [--fuzz 100000] [--seed 0]
+"""
+import argparse
+import random
+import re
+import time
+
+from common import SAMPLE_OCR_TEXT
+
+from app.utils.ocr_scanner import OCR_SCANNER
+from app.utils.regex_patterns import FREQUENCY_PATTERNS
+
+REPEATS = 200
+LINES = [
+    "Tab. Dolo 65O mg l tab BD x 5 days", "Cap. Amoxicillin 5OO mg 1-0-1 after food",
+    "Syp. Ascoril l0 ml at bedtime; hs", "Inj. Ceftriaxone 1 g — once daily", "Pan D 4Olmg od before food",
+    "Calpol 250 mg q 6 h prn for fever", "Cream twice daily, 2 drops tds", "Montair LC tablet nightly…",
+]
+# Fragments for fuzzing: the characters and tokens the normalization and extraction rules look at
+FUZZ_ALPHABET = list("lOo0159mgxA_ X×–—…,;:.\n-") + [
+    "lmg", "Omg", "Olmg", "l0", " mg", " tablet", " tablets", "bd", " od ", "tds", "q 6 h", "every 4 hours",
+    "as needed", "capsule", "T.", "cap.", "1-0-1", "sos", "hs", "2x", "ml", "syrup", "1.5", "a", "b", "  ",
+]
+
+
+def old_normalize(s):
+    if not s:
+        return s
+    s = s.replace('–', '-').replace('—', '-')
+    s = s.replace('lmg', 'mg').replace('l0', '10').replace('Omg', '0mg')
+    s = re.sub(r'(?<=\d)\s*[oO]\s*(?=\d)', '0', s)
+    s = re.sub(r'\bl\b', '1', s)
+    s = re.sub(r'[×xX]', 'x', s)
+    s = re.sub(r'[…\,;:]+', ' ', s)
+    s = re.sub(r'\s+', ' ', s)
+    return s.strip().lower()
+
+
+def old_extract(text):
+    dosages = re.findall(r'\b(\d+(?:\.\d+)?)\s*(?:mg|g|ml|mcg|iu|tablets?|capsules?|puffs?|drops?)\b', text, flags=re.I)
+    forms = ['tablet', 'capsule', 'syrup', 'injection', 'cream', 'ointment',
+             'lotion', 'gel', 'suspension', 'solution', 'powder']
+    dosage_forms = [m.lower() for m in re.findall(r'\b(' + '|'.join(forms) + r')\b', text, flags=re.I)]
+    frequencies = {}
+    for name, patterns in FREQUENCY_PATTERNS.items():
+        matched = []
+        for p in patterns:
+            matched.extend(re.findall(p, text, flags=re.I))
+        if matched:
+            frequencies[name] = sorted(set(matched))
+    return dosages, dosage_forms, frequencies
+
+
+def old_pipeline(raw):
+    text = old_normalize(raw)
+    return (text,) + old_extract(text)
+
+
+def new_pipeline(raw):
+    scan = OCR_SCANNER.scan(raw)
+    return scan.text, scan.dosages(), scan.dosage_forms(), {k: sorted(v) for k, v in scan.frequencies().items()}
+
+
+def fuzz(count, seed):
+    """Compare both paths on `count` random strings; returns the mismatching inputs."""
+    rnd = random.Random(seed)
+    mismatches = []
+    for _ in range(count):
+        text = "".join(rnd.choice(FUZZ_ALPHABET) for _ in range(rnd.randint(1, 60)))
+        if old_pipeline(text) != new_pipeline(text):
+            mismatches.append(text)
+    return mismatches
+
+
+def timed(fn, texts):
+    t0 = time.perf_counter()
+    for _ in range(REPEATS):
+        for text in texts:
+            fn(text)
+    return (time.perf_counter() - t0) / REPEATS * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fuzz", type=int, default=100000, help="random strings to compare before timing")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    mismatches = fuzz(args.fuzz, args.seed)
+    assert not mismatches, f"{len(mismatches)} mismatches, e.g. {mismatches[:3]!r}"
+    print(f"{args.fuzz} fuzzed strings: identical output")
+
+    rnd = random.Random(0)
+    prescription = "\n".join(rnd.choice(LINES) for _ in range(40))
+    cases = {"sample OCR text": [SAMPLE_OCR_TEXT], "40-line prescription": [prescription], "single lines": LINES}
+    print(f"\n{REPEATS} runs each\n")
+    print(f"{'input':>20} | {'chars':>6} | {'previous ms':>11} | {'scanner ms':>10} | {'speed-up':>8}")
+    for label, texts in cases.items():
+        assert [old_pipeline(t) for t in texts] == [new_pipeline(t) for t in texts], label
+        old, new = timed(old_pipeline, texts), timed(new_pipeline, texts)
+        chars = sum(map(len, texts))
+        print(f"{label:>20} | {chars:>6} | {old:>11.3f} | {new:>10.3f} | {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark: OCR preprocessing latency, upload bytes and extraction agreement
+at each normalization size (see app/utils/image_normalize.py).
+
+By default a synthetic 12 MP phone-style photo of a prescription is used; pass
+`--image path.jpg` to measure a real scan. Agreement is measured against the
+full-resolution result with local tesseract (skipped if it is not installed);
+`--gemini` also runs Gemini extraction at each size (needs GOOGLE_API_KEY and
+spends quota). Run from the repository root:
+
+    python benchmarks/bench_resolution.py [--image scan.jpg] [--gemini]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import cv2
+import numpy as np
+from fuzzywuzzy import fuzz
+
+from common import SAMPLE_OCR_TEXT  # noqa: F401  (puts backend/ on sys.path)
+
+from app.utils.image_normalize import decode_reduced, encode_jpeg, prepare_for_upload
+from app.utils.vision_ocr import binarize_image, decode_image, run_pytesseract_local
+
+SIZES = [0, 3000, 2400, 2000, 1600, 1200, 1000, 800]
+REPEATS = 5
+
+PRESCRIPTION_LINES = [
+    "Jayaram Hospital  -  OP Prescription",
+    "Name: Ravi Kumar    Age: 42 / M",
+    "Rx",
+    "1. Tab Dolo 650mg      1-0-1  x 5 days",
+    "2. Cap Pan 40          1-0-0  before food",
+    "3. Tab Augmentin 625   1-0-1  x 7 days",
+    "4. Syp Ascoril 10ml    TDS",
+    "5. Tab Cetirizine 10mg HS",
+    "Review after one week",
+]
+
+
+def synthetic_photo(width=4032, height=3024, seed=0):
+    """Off-white page with uneven lighting, sensor noise and ~50px text lines."""
+    rnd = np.random.default_rng(seed)
+    gradient = np.linspace(215, 245, width, dtype=np.float32)[None, :]
+    page = np.repeat(gradient, height, axis=0)
+    page += rnd.normal(0, 6, size=page.shape).astype(np.float32)
+    img = cv2.cvtColor(np.clip(page, 0, 255).astype(np.uint8), cv2.COLOR_GRAY2BGR)
+    y = 400
+    for line in PRESCRIPTION_LINES:
+        cv2.putText(img, line, (300, y), cv2.FONT_HERSHEY_SIMPLEX, 2.2, (40, 30, 30), 5, cv2.LINE_AA)
+        y += 260
+    return encode_jpeg(img, 92)
+
+
+def timed(fn, repeats=REPEATS):
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return result, statistics.median(times)
+
+
+def tesseract_text(img):
+    try:
+        return run_pytesseract_local(img)[0]
+    except Exception:
+        return None
+
+
+def gemini_drugs(image_bytes):
+    from app.services.gemini_extractor import GeminiExtractor
+    data = asyncio.run(GeminiExtractor().extract_prescription_data(image_bytes, "image/jpeg"))
+    return {str(d.get("drug", "")).lower() for d in data.get("drug_candidates") or []}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--image", help="benchmark this file instead of the synthetic photo")
+    parser.add_argument("--gemini", action="store_true", help="also compare Gemini extraction per size")
+    args = parser.parse_args()
+
+    if args.image:
+        with open(args.image, "rb") as f:
+            image_bytes = f.read()
+    else:
+        image_bytes = synthetic_photo()
+    full = decode_image(image_bytes)
+    print(f"source: {full.shape[1]}x{full.shape[0]}, {len(image_bytes) / 1024:.0f} KB\n")
+
+    _, baseline_ms = timed(lambda: binarize_image(decode_image(image_bytes)))
+    baseline_text = tesseract_text(binarize_image(full))
+    if baseline_text is None:
+        print("tesseract not available: OCR agreement column skipped")
+    baseline_drugs = gemini_drugs(image_bytes) if args.gemini else None
+
+    print(f"{'max side':>8} | {'decode+binarize ms':>18} | {'speedup':>7} | {'upload KB':>9} | {'tess agree':>10}"
+          + (" | gemini agree" if args.gemini else ""))
+    for side in SIZES:
+        binary, ms = timed(lambda: binarize_image(decode_reduced(image_bytes, side)))
+        upload, _ = prepare_for_upload(image_bytes, "image/jpeg", side)
+
+        agree = "n/a"
+        if baseline_text is not None:
+            text = tesseract_text(binary) or ""
+            agree = f"{fuzz.ratio(baseline_text, text)}%"
+
+        row = f"{side or 'full':>8} | {ms:>18.1f} | {baseline_ms / ms:>6.1f}x | {len(upload) / 1024:>9.0f} | {agree:>10}"
+        if args.gemini:
+            drugs = gemini_drugs(upload)
+            overlap = len(drugs & baseline_drugs) / max(1, len(drugs | baseline_drugs))
+            row += f" | {overlap:.0%}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
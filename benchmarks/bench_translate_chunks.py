@@ -0,0 +1,65 @@
+"""
+Benchmark: translation latency of one whole-text request vs chunks translated
+in parallel on TRANSLATE_POOL, as the text grows.
+
+By default the upstream call is simulated at SIMULATED_BASE_S plus
+SIMULATED_S per 1000 characters; `--google` calls Google Translate for real
+(needs network; whole texts over 5000 characters are rejected there).
+
+Run from the repository root:
+
+    python benchmarks/bench_translate_chunks.py [--google] [--chunk-chars 2000]
+"""
+import argparse
+import time
+
+from common import SAMPLE_OCR_TEXT  # noqa: F401  (puts backend/ on sys.path)
+
+from app.services import translator
+from app.utils.glossary import Glossary
+from app.utils.translation_memory import TranslationMemory
+
+SENTENCE = "Day {}: take one tablet of Dolo 650 after food, twice daily, and drink plenty of water. "
+SENTENCE_COUNTS = [10, 50, 200, 400]
+SIMULATED_BASE_S = 0.15
+SIMULATED_S = 0.1
+
+
+def simulated_translate(text, target_lang):
+    time.sleep(SIMULATED_BASE_S + SIMULATED_S * len(text) / 1000)
+    return text
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--google", action="store_true", help="call Google Translate instead of simulating it")
+    parser.add_argument("--chunk-chars", type=int, default=translator.MAX_CHUNK_CHARS)
+    args = parser.parse_args()
+    upstream = translator._translate if args.google else simulated_translate
+    translator._translate = upstream
+    # Measure chunking alone: no glossary terms, and a fresh memory each run
+    translator.GLOSSARY = Glossary({})
+
+    print(f"{translator.TRANSLATE_WORKERS} workers, chunks of up to {args.chunk_chars} characters\n")
+    print(f"{'sentences':>9} | {'chars':>6} | {'chunks':>6} | {'whole s':>8} | {'chunked s':>9}")
+    for count in SENTENCE_COUNTS:
+        # Distinct sentences, so the translation memory cannot help
+        text = "".join(SENTENCE.format(i + 1) for i in range(count))
+        chunks = translator.split_chunks(text, args.chunk_chars)
+
+        t0 = time.perf_counter()
+        try:
+            upstream(text, "hi")
+            whole = f"{time.perf_counter() - t0:>8.2f}"
+        except Exception as e:
+            whole = f"{type(e).__name__:>8.8}"
+
+        translator.TRANSLATION_MEMORY = TranslationMemory()
+        t0 = time.perf_counter()
+        list(translator.TRANSLATE_POOL.map(lambda chunk: translator._translate_chunk(chunk, "hi"), chunks))
+        chunked = time.perf_counter() - t0
+        print(f"{count:>9} | {len(text):>6} | {len(chunks):>6} | {whole} | {chunked:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
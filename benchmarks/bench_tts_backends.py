@@ -0,0 +1,75 @@
+"""
+Benchmark: offline pyttsx3 (process pool) vs remote gTTS (thread pool) for
+the sentence-sized clips /audio/stream renders.
+
+Reports per-clip latency (one at a time) and throughput with the backend's
+pool saturated. gTTS needs network access; pyttsx3 needs the package and a
+speech driver (espeak-ng on Linux). Unavailable backends are skipped.
+
+Run from the repository root:
+
+    python benchmarks/bench_tts_backends.py [--sentences 24] [--skip-gtts]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from common import SAMPLE_OCR_TEXT  # noqa: F401  (puts backend/ on sys.path)
+
+from app.services import tts_backends
+
+SENTENCE = "Day {}: take one tablet of Dolo 650 after food, twice daily."
+
+
+async def measure(backend, sentences):
+    # Warm the pool (process start-up, engine init, connection setup)
+    await backend.render("Warm up.", "English")
+
+    latencies = []
+    for text in sentences:
+        t0 = time.perf_counter()
+        await backend.render(text, "English")
+        latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    clips = await asyncio.gather(*(backend.render(text + " Again.", "English") for text in sentences))
+    wall = time.perf_counter() - t0
+    return latencies, wall, sum(len(c) for c in clips) / len(clips)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sentences", type=int, default=24)
+    parser.add_argument("--skip-gtts", action="store_true", help="do not call Google (offline machines)")
+    args = parser.parse_args()
+    sentences = [SENTENCE.format(i + 1) for i in range(args.sentences)]
+
+    backends = []
+    if not args.skip_gtts:
+        backends.append(tts_backends.GTTSBackend(workers=4))
+    if tts_backends.PYTTSX3_AVAILABLE:
+        backends.append(tts_backends.Pyttsx3Backend(workers=2))
+    else:
+        print("pyttsx3 not installed; skipping the offline backend")
+
+    print(f"{len(sentences)} sentences\n")
+    print(f"{'backend':>8} | {'p50 ms':>7} | {'p95 ms':>7} | {'clips/s (pool)':>14} | {'avg KB':>6}")
+    for backend in backends:
+        try:
+            latencies, wall, avg_bytes = asyncio.run(measure(backend, sentences))
+        except Exception as e:
+            print(f"{backend.name:>8} | unavailable: {e}")
+            continue
+        finally:
+            backend.shutdown()
+        latencies.sort()
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(
+            f"{backend.name:>8} | {statistics.median(latencies) * 1000:>7.0f} | {p95 * 1000:>7.0f} |"
+            f" {len(sentences) / wall:>14.1f} | {avg_bytes / 1024:>6.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
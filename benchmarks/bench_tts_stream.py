@@ -0,0 +1,67 @@
+"""
+Benchmark: time to first audio and total time, whole-text synthesis
+(/audio/generate) vs sentence-chunked streaming (/audio/stream), as the
+explanation grows.
+
+gTTS sends one request per ~100 characters, one after another, so by default
+synthesis is simulated at SIMULATED_S per 100 characters; `--gtts` calls
+Google for real (needs network).
+
+Run from the repository root:
+
+    python benchmarks/bench_tts_stream.py [--gtts]
+"""
+import argparse
+import asyncio
+import math
+import tempfile
+import time
+
+from common import SAMPLE_OCR_TEXT  # noqa: F401  (puts backend/ on sys.path)
+
+from app.routes import audio
+from app.services import audio_generator
+from app.services.audio_generator import split_sentences
+from app.utils.audio_cache import AudioCache
+
+SENTENCE = "Day {}: take one tablet of Dolo 650 after food, twice daily. "
+SENTENCE_COUNTS = [1, 4, 16, 64]
+SIMULATED_S = 0.25
+
+
+def simulated_synthesize(text, language="en"):
+    time.sleep(SIMULATED_S * math.ceil(len(text) / 100))
+    return b"\xff\xfb" * len(text)
+
+
+async def streamed(text):
+    started = time.perf_counter()
+    first = None
+    async for _ in audio._synthesize_in_order(split_sentences(text), "en"):
+        if first is None:
+            first = time.perf_counter() - started
+    return first, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--gtts", action="store_true", help="call Google TTS instead of simulating it")
+    args = parser.parse_args()
+    synthesize = audio_generator.synthesize if args.gtts else simulated_synthesize
+    audio.synthesize = synthesize
+
+    print(f"{'sentences':>9} | {'chars':>5} | {'whole: first/total s':>20} | {'stream: first/total s':>21}")
+    for count in SENTENCE_COUNTS:
+        # Distinct sentences, so the per-sentence cache cannot help
+        text = "".join(SENTENCE.format(i + 1) for i in range(count))
+        # Fresh cache each round so nothing is reused
+        audio.AUDIO_CACHE = AudioCache(tempfile.mkdtemp(prefix="tts-bench-"))
+        t0 = time.perf_counter()
+        synthesize(text, "en")
+        whole = time.perf_counter() - t0
+        first, total = asyncio.run(streamed(text))
+        print(f"{count:>9} | {len(text):>5} | {whole:>9.2f} / {whole:<8.2f} | {first:>9.2f} / {total:<9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Shared fixtures for the benchmark scripts in this directory."""
+import os
+import random
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Noisy EasyOCR output of a real prescription (same sample as run_quick_extract.py)
+SAMPLE_OCR_TEXT = "Nursing Honie\nDate\nVtc |u/os\nWijr\n2(\n|6\nSaturation :\nS9-1.\nWeight\n2k Pulse Rate\nl2 6\nBlood Pressure : |2=\nolqo\nY:\nFeue\n62\nlealrs\nCev\nBucY\nmc ,\ne\nk\nCop=\nQan\n(.f~UeaA\nfyp: Ascccil-0\nM\n~tr)\nbmm(d\n~keuluSof\nimnagar\n505 001\n4033288,0878-3565096\nn985egmail.com\nwwW.\nKame:\nusqvi =\nAge/Gender :\nStl\nSal\nIkorda\nAddress :\nTemperature :\nPam_\n~ade*\n99.3\nsda/\nolbmd\npahs\nAcoax-ct\nDx-\nnm\nCesceu-\nwwwjjayaramhospital_\ncom\ninstagram C\ncom/jayaram\nthospital"
+
+SAMPLE_TOKENS = [{"text": t, "confidence": 0.5} for t in SAMPLE_OCR_TEXT.split()]
+
+_SYLLABLES = [
+    "ac", "al", "am", "an", "ar", "az", "be", "ci", "co", "da", "de", "do", "fe", "flo",
+    "ga", "gel", "ka", "la", "le", "lo", "ma", "me", "mox", "na", "ni", "no", "pan", "pa",
+    "pro", "ra", "ri", "ro", "sa", "se", "ta", "te", "ti", "to", "tra", "va", "vi", "xo", "zo",
+]
+_SUFFIXES = ["", "", "", " d", " dsr", " 40", " 650", "-ct", "-lc", " plus", " forte", " xl"]
+
+
+def synthetic_lexicon(base, size, seed=0):
+    """`base` followed by deterministic brand-like names until `size` entries."""
+    rnd = random.Random(seed)
+    names = list(base)
+    seen = set(names)
+    while len(names) < size:
+        name = "".join(rnd.choice(_SYLLABLES) for _ in range(rnd.randint(2, 4)))
+        name += rnd.choice(_SUFFIXES)
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+    return names[:size]
@@ -38,14 +38,18 @@ export default function AnalysisCard({
                 headers: { "Content-Type": "application/json" },
                 body: JSON.stringify({
                     text: `${name}. ${description}`,
-                    language: targetLanguage
+                    language: targetLanguage,
+                    inline: false
                 }),
             });
 
             if (!response.ok) throw new Error("Audio generation failed");
 
             const data = await response.json();
-            const audioUrl = `data:audio/mp3;base64,${data.audio_base64}`;
+            // No URL when the server could not cache the clip; it is sent inline instead
+            const audioUrl = data.audio_url
+                ? `http://localhost:8000${data.audio_url}`
+                : `data:${data.format === "wav" ? "audio/wav" : "audio/mpeg"};base64,${data.audio_base64}`;
 
             await playAudio(audioUrl, () => setIsPlaying(false));
         } catch (error) {
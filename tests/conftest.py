@@ -0,0 +1,17 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+# The module-level caches are built from these at import time; keep the
+# suite's SQLite files and audio clips out of backend/cache/.
+CACHE_DIR = tempfile.mkdtemp(prefix="meditranslate-tests-")
+os.environ["OCR_RESULT_CACHE_PATH"] = os.path.join(CACHE_DIR, "ocr_results.sqlite3")
+os.environ["TRANSLATION_MEMORY_PATH"] = os.path.join(CACHE_DIR, "translation_memory.sqlite3")
+os.environ["TTS_CACHE_DIR"] = os.path.join(CACHE_DIR, "tts")
+
+@pytest.fixture(scope="session", autouse=True)
+def _remove_cache_dir():
+    yield
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
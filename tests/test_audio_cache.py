@@ -0,0 +1,150 @@
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from fastapi.testclient import TestClient
+from app.main import app
+from app.routes import audio
+from app.services.tts_backends import SpeechSynthesizer, TTSBackend
+from app.services.gemini_extractor import get_gemini_extractor
+from app.utils.audio_cache import AudioCache, audio_key
+
+MP3 = bytes(range(256)) * 40  # 10 KB stand-in clip
+
+class FakeTTS(TTSBackend):
+    name = "fake"
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.pool = ThreadPoolExecutor(4)
+
+    def synthesize(self, text, language):
+        return self.fn(text, language)
+
+    def _executor(self):
+        return self.pool
+
+def test_lru_eviction_keeps_recent_clips(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=25_000)
+    for i, key in enumerate(("a" * 64, "b" * 64)):
+        cache.put(key, MP3)
+        os.utime(cache.path(key), (1000 + i, 1000 + i))
+    assert cache.get("a" * 64) is not None  # "a" is now the most recent
+    cache.put("c" * 64, MP3)
+    assert cache.get("b" * 64) is None
+    assert cache.get("a" * 64) is not None and cache.get("c" * 64) is not None
+    assert cache.stats()["evictions"] == 1 and cache.stats()["bytes"] == 2 * len(MP3)
+
+def test_keys_cover_text_language_and_voice():
+    keys = {audio_key("Take one tablet", "Hindi", "gtts"), audio_key("Take one tablet", "Telugu", "gtts"),
+            audio_key("Take one tablet", "Hindi", "espeak"), audio_key("Take two tablets", "Hindi", "gtts")}
+    assert len(keys) == 4
+    assert audio_key("Take one tablet", "Hindi", "gtts") == audio_key("Take one tablet", " hindi", "gtts")
+
+def test_generate_caches_and_serves_with_etag_and_range(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(audio, "AUDIO_CACHE", AudioCache(str(tmp_path)))
+    monkeypatch.setattr(audio, "TTS", SpeechSynthesizer(FakeTTS(lambda text, language: calls.append(text) or MP3)))
+    client = TestClient(app)
+
+    first = client.post("/audio/generate", json={"text": "Dolo 650. For fever.", "language": "English", "inline": False})
+    again = client.post("/audio/generate", json={"text": "Dolo 650. For fever.", "language": "English"})
+    assert first.json()["cached"] is False and "audio_base64" not in first.json()
+    assert again.json()["cached"] is True and again.json()["audio_base64"]
+    assert len(calls) == 1
+
+    url = first.json()["audio_url"]
+    full = client.get(url)
+    assert full.status_code == 200 and full.content == MP3
+    assert full.headers["content-type"] == "audio/mpeg"
+    assert "immutable" in full.headers["cache-control"]
+    etag = full.headers["etag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    part = client.get(url, headers={"Range": "bytes=100-199"})
+    assert part.status_code == 206 and part.content == MP3[100:200]
+    assert part.headers["content-range"] == f"bytes 100-199/{len(MP3)}"
+    tail = client.get(url, headers={"Range": "bytes=-10"})
+    assert tail.content == MP3[-10:]
+    assert client.get(url, headers={"Range": f"bytes={len(MP3)}-"}).status_code == 416
+    # A stale If-Range gets the whole clip
+    assert client.get(url, headers={"Range": "bytes=0-9", "If-Range": '"other"'}).status_code == 200
+    assert client.get("/audio/files/" + "0" * 64 + ".mp3").status_code == 404
+    assert client.get("/audio/files/../../etc.mp3").status_code == 404
+
+def test_unwritable_cache_dir_degrades(tmp_path):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    cache = AudioCache(str(blocker / "tts"))
+    assert cache.root is not None and cache.root != blocker / "tts"  # per-process temp dir
+    assert cache.put("a" * 64, MP3) is not None
+    shutil.rmtree(cache.root)
+    cache.root = blocker
+    assert cache.put("b" * 64, MP3) is None and cache.get("b" * 64) is None
+
+class FlakyTranslator:
+    api_key = "test"
+
+    def __init__(self):
+        self.fail = True
+
+    async def translate_text(self, text, language):
+        if self.fail:
+            raise RuntimeError("rate limited")
+        return f"[{language}] {text}"
+
+def test_untranslated_fallback_is_not_served_later(tmp_path, monkeypatch):
+    spoken = []
+    monkeypatch.setattr(audio, "AUDIO_CACHE", AudioCache(str(tmp_path)))
+    monkeypatch.setattr(audio, "TTS", SpeechSynthesizer(FakeTTS(lambda text, language: spoken.append(text) or MP3)))
+    translator = FlakyTranslator()
+    app.dependency_overrides[get_gemini_extractor] = lambda: translator
+    try:
+        client = TestClient(app)
+        request = {"text": "Take one tablet", "language": "Hindi"}
+        first = client.post("/audio/generate", json=request).json()
+        translator.fail = False
+        second = client.post("/audio/generate", json=request).json()
+        third = client.post("/audio/generate", json=request).json()
+    finally:
+        app.dependency_overrides.clear()
+    assert spoken == ["Take one tablet", "[Hindi] Take one tablet"]
+    assert first["audio_url"] != second["audio_url"] == third["audio_url"]
+    assert second["cached"] is False and third["cached"] is True
+
+def test_clip_evicted_after_lookup_is_rendered_again(tmp_path, monkeypatch):
+    cache = AudioCache(str(tmp_path))
+    monkeypatch.setattr(audio, "AUDIO_CACHE", cache)
+    monkeypatch.setattr(audio, "TTS", SpeechSynthesizer(FakeTTS(lambda text, language: MP3)))
+    client = TestClient(app)
+    request = {"text": "Dolo 650", "language": "English"}
+    url = client.post("/audio/generate", json=request).json()["audio_url"]
+    # Another worker evicts the clip between the lookup and the read
+    monkeypatch.setattr(cache, "get", lambda key, extension="mp3": cache.path(key, extension).unlink() or cache.path(key, extension))
+    response = client.post("/audio/generate", json=request)
+    assert response.status_code == 200 and response.json()["cached"] is False
+    assert response.json()["audio_url"] == url and response.json()["audio_base64"]
+
+def test_streamed_fallback_is_not_served_to_generate(tmp_path, monkeypatch):
+    spoken = []
+    monkeypatch.setattr(audio, "AUDIO_CACHE", AudioCache(str(tmp_path)))
+    monkeypatch.setattr(audio, "TTS", SpeechSynthesizer(FakeTTS(lambda text, language: spoken.append(text) or MP3)))
+    translator = FlakyTranslator()
+    app.dependency_overrides[get_gemini_extractor] = lambda: translator
+    try:
+        client = TestClient(app)
+        request = {"text": "Take one tablet.", "language": "Telugu"}
+        assert client.post("/audio/stream", json=request).content == MP3
+        translator.fail = False
+        generated = client.post("/audio/generate", json=request).json()
+    finally:
+        app.dependency_overrides.clear()
+    assert generated["cached"] is False
+    assert spoken == ["Take one tablet.", "[Telugu] Take one tablet."]
+
+def test_unstored_clip_is_sent_inline(tmp_path, monkeypatch):
+    cache = AudioCache(str(tmp_path))
+    monkeypatch.setattr(cache, "put", lambda key, audio, extension="mp3": None)  # disk full
+    monkeypatch.setattr(audio, "AUDIO_CACHE", cache)
+    monkeypatch.setattr(audio, "TTS", SpeechSynthesizer(FakeTTS(lambda text, language: MP3)))
+    body = TestClient(app).post("/audio/generate", json={"text": "Dolo 650", "language": "English", "inline": False}).json()
+    assert body["audio_url"] is None and body["audio_base64"]
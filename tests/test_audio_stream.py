@@ -0,0 +1,72 @@
+import asyncio
+import threading
+import time
+from fastapi.testclient import TestClient
+from app.main import app
+from app.routes import audio
+from app.services.audio_generator import split_sentences
+from app.services.tts_backends import SpeechSynthesizer
+from app.utils.audio_cache import AudioCache
+from test_audio_cache import FakeTTS
+
+EXPLANATION = (
+    "Dolo 650 is used for fever and mild pain. Take one tablet after food, twice daily for three days. "
+    "Do not take more than four tablets in 24 hours. If the fever lasts longer than three days, consult your doctor. "
+)
+
+def test_split_sentences_keeps_the_first_chunk_short():
+    chunks = split_sentences(EXPLANATION * 5)
+    assert len(chunks[0]) <= 80 and all(len(c) <= 200 for c in chunks)
+    assert " ".join(chunks) == (EXPLANATION * 5).strip()
+    assert split_sentences("बुखार के लिए। भोजन के बाद लें।", max_chars=20, first_max_chars=15) == ["बुखार के लिए।", "भोजन के बाद लें।"]
+    assert split_sentences("  \n ") == []
+
+class SlowTTS:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, text, language):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.03)
+        with self.lock:
+            self.active -= 1
+        return f"<{text}>".encode()
+
+def _patch(monkeypatch, tmp_path):
+    tts = SlowTTS()
+    monkeypatch.setattr(audio, "AUDIO_CACHE", AudioCache(str(tmp_path)))
+    monkeypatch.setattr(audio, "TTS", SpeechSynthesizer(FakeTTS(tts)))
+    return tts
+
+def test_first_audio_does_not_wait_for_the_whole_text(monkeypatch, tmp_path):
+    tts = _patch(monkeypatch, tmp_path)
+
+    async def first_and_all(n):
+        started = time.perf_counter()
+        stream = audio._synthesize_in_order([f"Sentence {i}." for i in range(n)], "en", audio.TTS.primary)
+        first = await stream.__anext__()
+        first_at = time.perf_counter() - started
+        rest = [clip async for clip in stream]
+        return first_at, [first] + rest
+
+    short_ttfa, _ = asyncio.run(first_and_all(2))
+    long_ttfa, clips = asyncio.run(first_and_all(40))
+    assert clips == [f"<Sentence {i}.>".encode() for i in range(40)]
+    assert long_ttfa < short_ttfa + 0.05
+    assert tts.peak <= audio.TTS_PREFETCH + 1
+
+def test_stream_endpoint_sends_sentences_in_order(monkeypatch, tmp_path):
+    _patch(monkeypatch, tmp_path)
+    client = TestClient(app)
+    response = client.post("/audio/stream", json={"text": EXPLANATION, "language": "en"})
+    chunks = split_sentences(EXPLANATION)
+    assert response.status_code == 200 and response.headers["content-type"] == "audio/mpeg"
+    assert response.content == b"".join(f"<{c}>".encode() for c in chunks)
+    assert response.headers["X-Audio-Chunks"] == str(len(chunks))
+    # Sentences are cached individually and reused by the GET form
+    assert client.get("/audio/stream", params={"text": EXPLANATION}).content == response.content
+    assert client.post("/audio/stream", json={"text": ""}).status_code == 400
@@ -0,0 +1,30 @@
+from app.utils.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+def test_breaker_opens_after_consecutive_failures_and_probes():
+    clock = FakeClock()
+    breaker = CircuitBreaker("ocr_space", failure_threshold=2, cooldown=10, clock=clock)
+    breaker.record_failure(Exception("OCR.space request failed: 500"))
+    assert breaker.allow()
+    breaker.record_failure(Exception("OCR.space request failed: 500"))
+    assert breaker.state == OPEN and not breaker.allow()
+
+    clock.now = 11
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow()  # only one probe at a time
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allow()
+
+def test_breaker_trips_immediately_on_missing_credentials():
+    clock = FakeClock()
+    breaker = CircuitBreaker("google_vision", failure_threshold=3, cooldown=10, fatal_cooldown=300, clock=clock)
+    breaker.record_failure(Exception("Your default credentials were not found."))
+    assert breaker.state == OPEN
+    assert breaker.snapshot()["last_error_class"] == "auth"
+    clock.now = 100
+    assert not breaker.allow()
@@ -0,0 +1,35 @@
+from fuzzywuzzy import fuzz, process
+from app.services.drug_index import DrugIndex
+from app.utils.vision_ocr import COMMON_DRUGS
+
+def test_index_matches_linear_extract_one():
+    index = DrugIndex(COMMON_DRUGS)
+    queries = ["paracetmol", "amoxycilin 500", "olqo", "pan d", "ascccil", "blood pressure", "azithromicin"]
+    for q in queries:
+        best = process.extractOne(q, COMMON_DRUGS, scorer=fuzz.token_sort_ratio)
+        expected = best if best[1] >= 70 else None
+        assert index.extract_one(q, score_cutoff=70) == expected
+
+def test_index_shortlists_candidates():
+    index = DrugIndex(COMMON_DRUGS, max_candidates=8)
+    assert len(index.candidates("paracetamol", 70)) <= 8
+    assert index.extract_one("paracetamol")[0] == "paracetamol"
+
+def test_extract_many_matches_extract_one():
+    index = DrugIndex(COMMON_DRUGS)
+    queries = ["paracetmol", "pulse rate", "olqo", "pan d", "d pan", "ascccil 0", "xx"]
+    batch = index.extract_many(queries, score_cutoff=70)
+    for q in queries:
+        assert batch[q] == index.extract_one(q, score_cutoff=70)
+
+def test_match_cache_hits_and_invalidation():
+    from app.utils.lru_cache import LRUCache
+    cache = LRUCache(maxsize=100)
+    index = DrugIndex(COMMON_DRUGS, cache=cache)
+    first = index.extract_many(["paracetmol", "pulse rate"], score_cutoff=70)
+    assert cache.misses == 2 and cache.hits == 0
+    assert index.extract_many(["paracetmol", "pulse rate"], score_cutoff=70) == first
+    assert cache.hits == 2
+
+    DrugIndex(COMMON_DRUGS + ["pulserate"], cache=cache)
+    assert len(cache) == 0
@@ -0,0 +1,30 @@
+import time
+from app.utils.engine_race import race_engines
+
+def _engine(text, conf, delay):
+    def run():
+        time.sleep(delay)
+        return text, conf
+    return run
+
+def _confidence(name, result):
+    return result[1] if result[0] else None
+
+def test_race_returns_first_acceptable_result():
+    start = time.monotonic()
+    winner = race_engines(
+        {"slow": _engine("slow text", 0.99, 2.0), "fast": _engine("fast text", 0.9, 0.05)},
+        deadline=5, confidence=_confidence, accept_confidence=0.8,
+    )
+    assert winner[0] == "fast"
+    assert time.monotonic() - start < 1.0
+
+def test_race_picks_most_confident_at_deadline():
+    start = time.monotonic()
+    winner = race_engines(
+        {"low": _engine("low", 0.5, 0.01), "mid": _engine("mid", 0.6, 0.02),
+         "empty": _engine("", 0.9, 0.01), "hung": _engine("hung", 0.99, 3.0)},
+        deadline=0.3, confidence=_confidence, accept_confidence=0.8,
+    )
+    assert winner[0] == "mid"
+    assert time.monotonic() - start < 1.0
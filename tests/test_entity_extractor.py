@@ -0,0 +1,35 @@
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.entity_extractor import DRUG, EntityExtractor, default_vocabulary, drug_lexicon
+
+client = TestClient(app)
+
+def test_lexicons_include_json_drugs_and_csv_variants():
+    drugs = drug_lexicon()
+    assert drugs["Amoxicillin"] == "Amoxicillin"
+    assert drugs["Pan D"] == "Pan-D" and drugs["Acemiz CT"] == "Acemiz-CT"
+    assert default_vocabulary()["1-0-1"] == ("Frequency", "Morning and Night")
+
+def test_extract_returns_typed_spans_with_offsets():
+    text = "Tab. Pan D 40mg twice daily for fever and high blood pressure; feverish"
+    response = client.post("/nlp/extract", json={"text": text})
+    entities = response.json()["entities"]
+    assert [(e["text"], e["type"]) for e in entities] == [
+        ("Tab.", "Form"), ("Pan D", "Drug"), ("mg", "Dosage"), ("twice daily", "Frequency"),
+        ("fever", "Symptom"), ("high blood pressure", "Symptom")]
+    assert all(text[e["start"]:e["end"]] == e["text"] for e in entities)
+    assert entities[1]["canonical"] == "Pan-D"
+
+def test_batch_mode_keeps_input_order():
+    texts = ["Paracetamol 500 mg", "", "cough syrup at bedtime"]
+    response = client.post("/nlp/extract-batch", json={"texts": texts})
+    assert response.json()["count"] == 3
+    assert [[e["text"] for e in r["entities"]] for r in response.json()["results"]] == [
+        ["Paracetamol", "mg"], [], ["cough", "syrup", "at bedtime"]]
+    assert client.post("/nlp/extract-batch", json={"texts": "cough"}).status_code == 400
+
+def test_large_lexicons_stay_single_pass():
+    vocabulary = {f"drug{i:06d}": (DRUG, f"Drug {i}") for i in range(100_000)}
+    extractor = EntityExtractor(vocabulary)
+    found = extractor.extract("drug000007 and drug099999, not drug0000071")
+    assert [e["canonical"] for e in found] == ["Drug 7", "Drug 99999"]
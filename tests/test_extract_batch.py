@@ -0,0 +1,86 @@
+import asyncio
+import io
+import json
+from PIL import Image
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services import gemini_extractor
+from app.services.gemini_extractor import GeminiExtractor, get_gemini_extractor
+from app.utils.image_normalize import split_pages
+from app.utils.rate_limiter import RateLimiter
+
+class EchoModel:
+    """Answers with the image size as the patient name; slower for the first upload."""
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    async def generate_content_async(self, contents):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        data = contents[1]["data"]
+        await asyncio.sleep(0.1 if b"first" in data else 0.02)
+        self.active -= 1
+        if b"broken" in data:
+            raise Exception("model exploded")
+        return type("Response", (), {"text": json.dumps({"patient_name": str(len(data)), "drug_candidates": []})})()
+
+def _two_page_tiff():
+    pages = [Image.new("RGB", (40, 30), "white"), Image.new("RGB", (50, 30), "white")]
+    buf = io.BytesIO()
+    pages[0].save(buf, format="TIFF", save_all=True, append_images=pages[1:])
+    return buf.getvalue()
+
+def _post(monkeypatch, files, **form):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setenv("OCR_ENGINE", "gemini")
+    monkeypatch.setenv("OCR_BATCH_CONCURRENCY", "2")
+    monkeypatch.setattr(gemini_extractor, "GEMINI_LIMITER", RateLimiter())
+    extractor = GeminiExtractor()
+    extractor.model = EchoModel()
+    app.dependency_overrides[get_gemini_extractor] = lambda: extractor
+    try:
+        response = TestClient(app).post(
+            "/ocr/extract-batch",
+            files=[("files", f) for f in files],
+            data=form,
+            headers={"Cache-Control": "no-cache"},
+        )
+    finally:
+        app.dependency_overrides.clear()
+    return response, extractor.model
+
+FILES = [
+    ("a.jpg", b"first batch upload", "image/jpeg"),
+    ("empty.jpg", b"", "image/jpeg"),
+    ("b.jpg", b"broken batch upload", "image/jpeg"),
+    ("c.jpg", b"another batch upload", "image/jpeg"),
+]
+
+def test_multi_page_tiff_is_split():
+    pages = split_pages(_two_page_tiff(), "image/tiff")
+    assert [Image.open(io.BytesIO(p)).size for p, _ in pages] == [(40, 30), (50, 30)]
+    assert split_pages(b"not an image", "image/jpeg") == [(b"not an image", "image/jpeg")]
+
+def test_batch_returns_items_in_input_order_with_errors(monkeypatch):
+    response, model = _post(monkeypatch, FILES)
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["count"], body["succeeded"], body["failed"]) == (4, 2, 2)
+    assert [item["filename"] for item in body["items"]] == ["a.jpg", "empty.jpg", "b.jpg", "c.jpg"]
+    assert [item["status"] for item in body["items"]] == [200, 400, 500, 200]
+    assert body["items"][0]["result"]["patient_name"] == str(len(b"first batch upload"))
+    assert "model exploded" in body["items"][2]["error"]
+    assert model.peak == 2
+
+def test_batch_stream_sends_items_as_they_complete(monkeypatch):
+    files = FILES[:1] + FILES[3:] + [("scan.tiff", _two_page_tiff(), "image/tiff")]
+    response, _ = _post(monkeypatch, files, stream="true")
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [b.split("\n") for b in response.text.strip().split("\n\n")]
+    items = [json.loads(e[1][len("data: "):]) for e in events if e[0] == "event: item"]
+    assert events[-1][0] == "event: done"
+    assert sorted(i["index"] for i in items) == [0, 1, 2, 3]
+    # The slow first upload finishes after the others
+    assert items[-1]["filename"] == "a.jpg"
+    assert [i["page"] for i in sorted(items, key=lambda i: i["index"])] == [None, None, 1, 2]
@@ -0,0 +1,74 @@
+import json
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services import gemini_extractor
+from app.services.gemini_extractor import GeminiExtractor, get_gemini_extractor
+from app.utils.json_stream import JSONStreamParser
+from app.utils.rate_limiter import RateLimiter
+
+RESPONSE = '```json\n' + json.dumps({
+    "patient_name": "Ravi \"R\" Kumar",
+    "drug_candidates": [
+        {"drug": "Dolo 650", "dosage": "650mg", "frequency": "1-0-1", "meta": {"tags": ["fever", "pain"]}},
+        {"drug": "Pan 40", "dosage": "40mg", "frequency": "OD", "explanation": "Before food {empty stomach}"},
+    ],
+}, indent=2) + '\n```'
+
+def _events(chunk_size):
+    parser = JSONStreamParser()
+    events = []
+    for i in range(0, len(RESPONSE), chunk_size):
+        events.extend(parser.feed(RESPONSE[i:i + chunk_size]))
+    return parser, events
+
+def test_parser_emits_fields_and_items_as_they_close():
+    expected = json.loads(RESPONSE.strip("`json\n"))
+    for chunk_size in (1, 3, 7, len(RESPONSE)):
+        parser, events = _events(chunk_size)
+        assert parser.done
+        assert events[0] == ("field", "patient_name", expected["patient_name"])
+        assert [e[2] for e in events if e[0] == "item"] == expected["drug_candidates"]
+        assert events[-1] == ("field", "drug_candidates", expected["drug_candidates"])
+
+def test_first_item_is_emitted_before_the_array_closes():
+    parser = JSONStreamParser()
+    cut = RESPONSE.index("Pan 40")
+    events = parser.feed(RESPONSE[:cut])
+    assert [e[0] for e in events] == ["field", "item"]
+    assert not parser.done
+
+class StreamingModel:
+    async def generate_content_async(self, contents, stream=False):
+        assert stream
+
+        async def chunks():
+            for i in range(0, len(RESPONSE), 16):
+                yield type("Chunk", (), {"text": RESPONSE[i:i + 16]})()
+
+        return chunks()
+
+def test_extract_stream_sends_server_sent_events(monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setenv("OCR_ENGINE", "gemini")
+    monkeypatch.setattr(gemini_extractor, "GEMINI_LIMITER", RateLimiter())
+    extractor = GeminiExtractor()
+    extractor.model = StreamingModel()
+    app.dependency_overrides[get_gemini_extractor] = lambda: extractor
+    try:
+        response = TestClient(app).post(
+            "/ocr/extract-stream",
+            files={"file": ("rx.jpg", b"streaming test image", "image/jpeg")},
+            headers={"Cache-Control": "no-cache"},
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["X-Cache"] == "BYPASS"
+    blocks = [b.split("\n") for b in response.text.strip().split("\n\n")]
+    names = [b[0][len("event: "):] for b in blocks]
+    assert names == ["patient_name", "drug_candidate", "drug_candidate", "result"]
+    result = json.loads(blocks[-1][1][len("data: "):])
+    assert result["ocr_engine"] == gemini_extractor.GEMINI_MODEL
+    assert [d["drug"] for d in result["drug_candidates"]] == ["Dolo 650", "Pan 40"]
@@ -0,0 +1,44 @@
+import asyncio
+import json
+from app.services import gemini_extractor
+from app.services.gemini_extractor import GeminiExtractor, get_gemini_extractor
+from app.utils.rate_limiter import RateLimiter
+
+class FakeModel:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.peak = 0
+        self.active = 0
+
+    async def generate_content_async(self, contents):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        return type("Response", (), {"text": json.dumps({"patient_name": "Ravi", "drug_candidates": []})})()
+
+def _extractor(monkeypatch, max_in_flight):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setenv("GEMINI_MAX_CONCURRENCY", str(max_in_flight))
+    monkeypatch.setattr(gemini_extractor, "GEMINI_LIMITER", RateLimiter())
+    extractor = GeminiExtractor()
+    extractor.model = FakeModel()
+    return extractor
+
+def test_calls_are_async_and_bounded(monkeypatch):
+    extractor = _extractor(monkeypatch, 3)
+
+    async def scenario():
+        started = asyncio.get_running_loop().time()
+        results = await asyncio.gather(*(extractor.extract_from_text(f"Tab Dolo {i}") for i in range(9)))
+        return results, asyncio.get_running_loop().time() - started
+
+    results, elapsed = asyncio.run(scenario())
+    assert all(r["patient_name"] == "Ravi" for r in results)
+    assert extractor.model.peak == 3
+    # 9 calls, 3 at a time, 50ms each: ~150ms, not 450ms serialized
+    assert elapsed < 0.35
+    assert extractor.stats()["calls"] == 9 and extractor.stats()["in_flight"] == 0
+
+def test_extractor_is_a_singleton():
+    assert get_gemini_extractor() is get_gemini_extractor()
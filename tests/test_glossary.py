@@ -0,0 +1,53 @@
+import asyncio
+import pytest
+from app.services import translator
+from app.utils.aho_corasick import AhoCorasick
+from app.utils.glossary import Glossary, Segment
+from app.utils.translation_memory import TranslationMemory
+
+TERMS = {"te": {"fever": "జ్వరం", "cough": "దగ్గు", "blood pressure": "రక్తపోటు", "high blood pressure": "అధిక రక్తపోటు"}}
+
+def test_automaton_finds_overlapping_patterns_in_one_pass():
+    matcher = AhoCorasick(["he", "she", "his", "hers"])
+    assert [(m.start, m.pattern) for m in matcher.iter_matches("ushers")] == [(1, "she"), (2, "he"), (2, "hers")]
+    assert [m.pattern for m in matcher.find("ushers", whole_words=False)] == ["she"]
+
+def test_leftmost_longest_whole_words_and_case():
+    matcher = AhoCorasick({k: v for k, v in TERMS["te"].items()})
+    text = "High Blood Pressure, feverish; FEVER"
+    found = matcher.find(text)
+    assert [(text[m.start:m.end], m.value) for m in found] == [("High Blood Pressure", "అధిక రక్తపోటు"), ("FEVER", "జ్వరం")]
+
+def test_plan_splits_terms_from_residual_text():
+    glossary = Glossary(TERMS)
+    assert glossary.plan("Fever, cough.", "Telugu") == [
+        Segment("జ్వరం", True), Segment(", ", False), Segment("దగ్గు", True), Segment(".", False)]
+    assert glossary.plan("fever", "hi") == [Segment("fever", False)]  # no Hindi terms loaded
+
+def test_covered_text_never_goes_upstream(monkeypatch):
+    calls = []
+    monkeypatch.setattr(translator, "GLOSSARY", Glossary(TERMS))
+    monkeypatch.setattr(translator, "TRANSLATION_MEMORY", TranslationMemory())
+    monkeypatch.setattr(translator, "_translate", lambda text, lang: calls.append(text) or f"<{text}>")
+
+    assert translator.translate_text("Fever, cough", "te") == "జ్వరం, దగ్గు"
+    assert translator.translate_text("Fever and cough", "te") == "<Fever and cough>"
+    assert translator.translate_text("fever, cough (2 days)", "te") == "<fever, cough (2 days)>"
+    assert calls == ["Fever and cough", "fever, cough (2 days)"]  # whole sentences, one request each
+    assert translator.GLOSSARY.stats()["fully_covered"] == 1
+
+def test_partly_covered_text_goes_upstream_whole_and_errors_propagate():
+    calls = []
+
+    async def upstream(text):
+        calls.append(text)
+        if "night" in text:
+            raise RuntimeError("rate limited")
+        return text.upper()
+
+    glossary = Glossary(TERMS)
+    assert asyncio.run(glossary.translate_async(" Fever with chills\n", "te", upstream)) == " FEVER WITH CHILLS\n"
+    assert asyncio.run(glossary.translate_async("Fever, cough", "te", upstream)) == "జ్వరం, దగ్గు"
+    with pytest.raises(RuntimeError):
+        asyncio.run(glossary.translate_async("Fever with chills, cough at night", "te", upstream))
+    assert calls == ["Fever with chills", "Fever with chills, cough at night"]
@@ -0,0 +1,31 @@
+import cv2
+import numpy as np
+from app.utils.image_normalize import NormalizedImage, decode_reduced, max_side_for, prepare_for_upload
+
+def _jpeg(width, height):
+    img = np.full((height, width, 3), 230, np.uint8)
+    cv2.putText(img, "Tab Dolo 650", (50, height // 2), cv2.FONT_HERSHEY_SIMPLEX, 3, (20, 20, 20), 6)
+    return cv2.imencode('.jpg', img)[1].tobytes()
+
+def test_decode_reduced_fits_target_and_never_upscales():
+    data = _jpeg(4000, 3000)
+    img = decode_reduced(data, 1600)
+    assert img.shape[:2] == (1200, 1600)
+    assert decode_reduced(_jpeg(800, 600), 1600).shape[:2] == (600, 800)
+    assert decode_reduced(data, 0).shape[:2] == (3000, 4000)
+
+def test_prepare_for_upload_shrinks_large_images_and_keeps_unknown_formats():
+    data = _jpeg(4000, 3000)
+    upload, mime = prepare_for_upload(data, "image/png", 1600)
+    assert mime == "image/jpeg" and len(upload) < len(data)
+    assert prepare_for_upload(b"not an image", "image/heic", 1600) == (b"not an image", "image/heic")
+
+def test_per_engine_targets(monkeypatch):
+    monkeypatch.setenv("IMAGE_MAX_SIDE_TROCR", "500")
+    monkeypatch.setenv("IMAGE_MAX_SIDE_PYTESSERACT", "5000")
+    data = _jpeg(4000, 3000)
+    normalized = NormalizedImage.for_engines(data, ["trocr", "easyocr"])
+    assert max(normalized.image.shape[:2]) == max_side_for("easyocr")
+    assert max(normalized.array("trocr").shape[:2]) == 500
+    # Source already within the tesseract target: original upload is passed through
+    assert normalized.encoded("pytesseract") is data
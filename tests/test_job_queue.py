@@ -0,0 +1,99 @@
+import asyncio
+import json
+from fastapi.testclient import TestClient
+from app import worker
+from app.main import app
+from app.services import gemini_extractor
+from app.services.gemini_extractor import GeminiExtractor, get_gemini_extractor
+from app.utils.job_queue import DEAD, QUEUED, RUNNING, SUCCEEDED, JobQueue, get_job_queue
+from app.utils.rate_limiter import RateLimiter
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def _queue(tmp_path, **kwargs):
+    clock = Clock()
+    return JobQueue(str(tmp_path / "jobs.sqlite3"), clock=clock, **kwargs), clock
+
+def test_submit_claim_complete(tmp_path):
+    queue, _ = _queue(tmp_path)
+    job_id = queue.submit("ocr.extract", {"language": "Hindi"}, b"image")
+    job = queue.claim()
+    assert (job.id, job.payload, job.data, job.attempts) == (job_id, {"language": "Hindi"}, b"image", 1)
+    assert queue.claim() is None  # leased, invisible to other workers
+    assert queue.complete(job, {"patient_name": "Ravi"})
+    state = queue.get(job_id)
+    assert state["status"] == SUCCEEDED and state["result"] == {"patient_name": "Ravi"}
+
+def test_expired_lease_is_reclaimed_and_stale_worker_cannot_finish(tmp_path):
+    queue, clock = _queue(tmp_path, visibility_timeout=30)
+    queue.submit("ocr.extract", {})
+    first = queue.claim()
+    clock.now += 31
+    second = queue.claim()
+    assert second.id == first.id and second.attempts == 2
+    assert not queue.complete(first, {"stale": True})
+    assert queue.complete(second, {"fresh": True})
+    assert queue.get(first.id)["result"] == {"fresh": True}
+
+def test_retries_with_backoff_then_dead_letter(tmp_path):
+    queue, clock = _queue(tmp_path, max_attempts=3, retry_base=5)
+    job_id = queue.submit("ocr.extract", {})
+    assert queue.fail(queue.claim(), "429 quota") == QUEUED
+    assert queue.claim() is None  # backing off
+    clock.now += 5
+    assert queue.fail(queue.claim(), "429 quota") == QUEUED
+    clock.now += 10
+    assert queue.fail(queue.claim(), "429 quota") == DEAD
+    clock.now += 1000
+    assert queue.claim() is None
+    assert queue.get(job_id)["status"] == DEAD and queue.get(job_id)["error"] == "429 quota"
+    assert queue.redrive(job_id) and queue.claim().attempts == 1
+
+def test_worker_that_dies_on_last_attempt_is_dead_lettered(tmp_path):
+    queue, clock = _queue(tmp_path, max_attempts=1, visibility_timeout=30)
+    job_id = queue.submit("ocr.extract", {})
+    queue.claim()
+    clock.now += 31
+    assert queue.claim() is None
+    assert queue.get(job_id)["status"] == DEAD
+    assert queue.stats()[DEAD] == 1 and queue.stats()[RUNNING] == 0
+
+class SlowModel:
+    async def generate_content_async(self, contents):
+        await asyncio.sleep(0.01)
+        if b"bad" in contents[1]["data"]:
+            raise Exception("invalid image")
+        return type("Response", (), {"text": json.dumps({"patient_name": "Ravi", "drug_candidates": []})})()
+
+def test_submit_poll_and_worker_round_trip(tmp_path, monkeypatch):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), max_attempts=2, retry_base=0)
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setenv("OCR_ENGINE", "gemini")
+    monkeypatch.setattr(gemini_extractor, "GEMINI_LIMITER", RateLimiter())
+    extractor = GeminiExtractor()
+    extractor.model = SlowModel()
+    monkeypatch.setattr(worker, "get_gemini_extractor", lambda: extractor)
+    app.dependency_overrides[get_job_queue] = lambda: queue
+    try:
+        client = TestClient(app)
+        headers = {"Cache-Control": "no-cache"}
+        ok = client.post("/jobs", files={"file": ("rx.jpg", b"job test image", "image/jpeg")}, headers=headers)
+        bad = client.post("/jobs", files={"file": ("rx.jpg", b"bad job image", "image/jpeg")}, headers=headers)
+        assert ok.status_code == 202 and ok.headers["Location"] == f"/jobs/{ok.json()['id']}"
+        assert client.get(f"/jobs/{ok.json()['id']}").json()["status"] == QUEUED
+
+        asyncio.run(worker.work(queue, concurrency=2, poll_interval=0.01, until_idle=True))
+
+        done = client.get(f"/jobs/{ok.json()['id']}").json()
+        failed = client.get(f"/jobs/{bad.json()['id']}").json()
+        assert done["status"] == SUCCEEDED and done["result"]["patient_name"] == "Ravi"
+        assert failed["status"] == DEAD and failed["attempts"] == 2 and "invalid image" in failed["error"]
+        assert client.get("/jobs/unknown").status_code == 404
+        assert client.get("/jobs/stats").json()[SUCCEEDED] == 1
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,25 @@
+import threading
+import time
+from app.services.model_registry import ModelRegistry
+
+def test_model_loads_once_under_concurrent_first_use():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.1)
+        return object()
+
+    registry = ModelRegistry()
+    registry.register("fake", loader)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("fake"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert len({id(r) for r in results}) == 1
+    status = registry.status()["models"]["fake"]
+    assert status["loaded"] and status["load_time_s"] >= 0.1
@@ -0,0 +1,60 @@
+import random
+import cv2
+import numpy as np
+from app.utils.near_duplicate import MultiIndexHash, NearDuplicateIndex, fingerprint
+from app.utils.result_cache import ResultCache
+
+def _flip(h, bits, rnd):
+    for b in rnd.sample(range(64), bits):
+        h ^= 1 << b
+    return h
+
+def test_multi_index_search_matches_brute_force():
+    rnd = random.Random(0)
+    index = MultiIndexHash()
+    hashes = [rnd.getrandbits(64) for _ in range(5000)]
+    # Plant near neighbours of the first few hashes
+    hashes += [_flip(h, rnd.randint(1, 9), rnd) for h in hashes[:200]]
+    for h in hashes:
+        index.add(h)
+    for query in hashes[:50] + [rnd.getrandbits(64) for _ in range(20)]:
+        for radius in (3, 6, 9):
+            expected = sorted(((h ^ query).bit_count(), i) for i, h in enumerate(hashes) if (h ^ query).bit_count() <= radius)
+            assert index.search(query, radius) == expected
+
+def _photo(lines, brightness=0, shift=0):
+    img = np.full((1500, 1100, 3), 235, np.uint8)
+    for i, line in enumerate(lines):
+        cv2.putText(img, line, (80 + shift, 200 + 150 * i + shift), cv2.FONT_HERSHEY_SIMPLEX, 1.8, (30, 30, 30), 4)
+    img = cv2.add(img, np.full_like(img, brightness))
+    return cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes()
+
+def test_retake_matches_and_other_prescription_does_not():
+    rx = ["Name: Ravi Kumar", "Tab Dolo 650 1-0-1", "Cap Pan 40 1-0-0", "Syp Ascoril 10ml TDS"]
+    other = ["Name: Sita Devi", "Tab Augmentin 625", "Tab Cetirizine HS"]
+    index = NearDuplicateIndex(max_distance=4)
+    index.add(fingerprint(_photo(rx)), "a:gemini:1:english")
+
+    retake = fingerprint(_photo(rx, brightness=12, shift=4))
+    assert [k for k, _ in index.lookup(retake, ":gemini:1:english")] == ["a:gemini:1:english"]
+    # Same photo, different language: different cached output
+    assert index.lookup(retake, ":gemini:1:telugu") == []
+    assert index.lookup(fingerprint(_photo(other)), ":gemini:1:english") == []
+    assert not NearDuplicateIndex().enabled  # opt-in
+
+def test_index_is_bounded_and_drops_keys_the_cache_lost():
+    rnd = random.Random(0)
+    fps = [(rnd.getrandbits(64), rnd.getrandbits(64)) for _ in range(1000)]
+    index = NearDuplicateIndex(max_distance=4, max_entries=100)
+    for i, fp in enumerate(fps):
+        index.add(fp, f"k{i}:e")
+    assert len(index) == 100
+    assert index.lookup(fps[999], ":e") == [("k999:e", 0)]
+    assert index.lookup(fps[0], ":e") == []  # oldest dropped
+    assert len(index._keys) <= 100 + max(100, 64)  # dropped entries are compacted away
+
+    cache = ResultCache(memory_size=8)
+    cache.put("k998:e", {"drug_candidates": []})
+    assert index.find_cached(cache, fps[998], ":e") == ({"drug_candidates": []}, 0)
+    assert index.find_cached(cache, fps[997], ":e") == (None, None)
+    assert len(index) == 99 and index.lookup(fps[997], ":e") == []  # evicted from the cache, so dropped
@@ -0,0 +1,47 @@
+import asyncio
+import time
+import pytest
+from app.utils.ocr_pool import OCRWorkerPool, PoolSaturated
+
+def _blocking(seconds):
+    time.sleep(seconds)
+    return seconds
+
+def test_pool_keeps_event_loop_responsive_and_tracks_waits():
+    pool = OCRWorkerPool(kind="thread", workers=2)
+
+    async def scenario():
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        beat = asyncio.create_task(heartbeat())
+        results = await asyncio.gather(*(pool.run(_blocking, 0.1) for _ in range(4)))
+        beat.cancel()
+        return results, ticks
+
+    results, ticks = asyncio.run(scenario())
+    assert results == [0.1] * 4
+    assert ticks > 5  # the loop kept running while jobs blocked
+    stats = pool.stats()
+    assert stats["completed"] == 4 and stats["pending"] == 0
+    assert stats["max_wait_ms"] >= 50  # two jobs queued behind the first two
+    pool.shutdown()
+
+def test_pool_rejects_when_full():
+    pool = OCRWorkerPool(kind="thread", workers=1, max_pending=1)
+
+    async def scenario():
+        first = asyncio.create_task(pool.run(_blocking, 0.2))
+        await asyncio.sleep(0.01)
+        with pytest.raises(PoolSaturated):
+            await pool.run(_blocking, 0.01)
+        await first
+
+    asyncio.run(scenario())
+    assert pool.stats()["rejected"] == 1
+    pool.shutdown()
@@ -0,0 +1,27 @@
+from app.services.shortform_expander import expand_shortforms
+from app.utils.ocr_scanner import OCR_SCANNER
+from app.utils.vision_ocr import extract_dosages, extract_frequencies, normalize_ocr_text
+
+def test_normalization_fixes_ocr_confusions_in_one_sweep():
+    assert normalize_ocr_text("Dolo 5Olmg — l tab; 1 O 5 ×2…  BD ") == "dolo 50mg - 1 tab 105 x2 bd"
+    assert normalize_ocr_text("l0 lmg Omg") == "10 mg 0mg"
+    assert normalize_ocr_text("") == ""
+
+def test_scan_returns_typed_spans_with_offsets():
+    scan = OCR_SCANNER.scan("Cap. Amox 500 mg 1-0-1 tablet BD, T. Dolo SOS")
+    assert [(s.kind, s.text, s.value) for s in scan.spans] == [
+        ("abbreviation", "cap.", "Capsule"), ("dose", "500", "500"), ("unit", "mg", "mg"),
+        ("code", "1-0-1", "Morning and Night"), ("dose", "1", "1"), ("unit", "tablet", "tablet"),
+        ("form", "tablet", "tablet"), ("frequency", "bd", "twice daily"),
+        ("abbreviation", "t.", "Tablet"), ("code", "sos", "When needed")]
+    assert all(scan.text[s.start:s.end] == s.text for s in scan.spans)
+    assert scan.dosages() == ["500", "1"] and scan.dosage_forms() == ["tablet"]
+
+def test_wrappers_keep_their_return_shapes():
+    text = normalize_ocr_text("Syp 10 ml bd, 2x daily, twice daily; tab 1.5 mg prn")
+    assert extract_dosages(text) == ["10", "1.5"]
+    assert extract_frequencies(text) == {"twice daily": ["bd", "2x", "twice daily"], "as needed": ["prn"]}
+
+def test_shortforms_expand_whole_tokens_only():
+    assert expand_shortforms("T. Dolo SOS, Tab Pan") == "Tablet Dolo When Needed, Tablet Pan"
+    assert expand_shortforms("Tablet for PAT. Tabs") == "Tablet for PAT. Tabs"
@@ -0,0 +1,87 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services import gemini_extractor
+from app.services.gemini_extractor import GeminiExtractor, get_gemini_extractor
+from app.utils.rate_limiter import RateLimiter, RateLimitExceeded
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_rpm_budget_queues_then_sheds():
+    clock = Clock()
+    limiter = RateLimiter(rpm=60, max_wait=2.5, clock=clock)
+    # A full minute of budget is available as a burst
+    assert [limiter._reserve(0) for _ in range(60)] == [0.0] * 60
+    # Then one slot per second, queued in arrival order
+    assert limiter._reserve(0) == pytest.approx(1.0)
+    assert limiter._reserve(0) == pytest.approx(2.0)
+    with pytest.raises(RateLimitExceeded) as exc:
+        limiter._reserve(0)
+    assert exc.value.retry_after == pytest.approx(3.0)
+    clock.now = 10
+    assert limiter.stats()["rejected"] == 1
+
+def test_token_budget_is_settled_with_real_usage():
+    clock = Clock()
+    limiter = RateLimiter(tpm=6000, max_wait=100, clock=clock)
+    assert limiter._reserve(6000) == 0.0
+    assert limiter._reserve(1000) == pytest.approx(10.0)
+    limiter.settle(6000, 3000)  # first call used half its estimate
+    assert limiter.tokens.level == pytest.approx(2000)
+
+def test_full_queue_is_shed():
+    limiter = RateLimiter(rpm=60, max_wait=100, max_queue=2, clock=Clock())
+    for _ in range(60):
+        limiter._reserve(0)
+    limiter._reserve(0)
+    limiter._reserve(0)
+    with pytest.raises(RateLimitExceeded, match="queue is full"):
+        limiter._reserve(0)
+
+class QuotaModel:
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    async def generate_content_async(self, contents):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise Exception("429 Quota exceeded for metric generate_content_requests")
+        return type("Response", (), {"text": '{"patient_name": "Ravi", "drug_candidates": []}'})()
+
+def _extractor(monkeypatch, failures):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setenv("GEMINI_RETRY_BASE_S", "0.01")
+    monkeypatch.setattr(gemini_extractor, "GEMINI_LIMITER", RateLimiter())
+    extractor = GeminiExtractor()
+    extractor.model = QuotaModel(failures)
+    return extractor
+
+def test_429_is_retried_with_backoff(monkeypatch):
+    extractor = _extractor(monkeypatch, failures=2)
+    result = asyncio.run(extractor.extract_from_text("Tab Dolo 650"))
+    assert result["patient_name"] == "Ravi"
+    assert extractor.model.calls == 3 and extractor.stats()["quota_errors"] == 2
+
+def test_exhausted_quota_returns_503_not_mock_data(monkeypatch):
+    extractor = _extractor(monkeypatch, failures=100)
+    monkeypatch.setenv("OCR_ENGINE", "gemini")
+    app.dependency_overrides[get_gemini_extractor] = lambda: extractor
+    try:
+        response = TestClient(app).post(
+            "/ocr/extract",
+            files={"file": ("rx.jpg", b"quota test image", "image/jpeg")},
+            headers={"Cache-Control": "no-cache"},
+        )
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+    assert "Amoxicillin" not in response.text
+    assert extractor.model.calls == extractor.max_retries + 1
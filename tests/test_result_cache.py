@@ -0,0 +1,48 @@
+import json
+from app.utils.result_cache import ResultCache, extraction_key
+
+def test_key_covers_content_engine_prompt_and_language():
+    key = extraction_key(b"img", "gemini", "1", "English")
+    assert key == extraction_key(b"img", "gemini", "1", " english ")
+    assert key != extraction_key(b"img2", "gemini", "1", "English")
+    assert key != extraction_key(b"img", "hybrid", "1", "English")
+    assert key != extraction_key(b"img", "gemini", "2", "English")
+    assert key != extraction_key(b"img", "gemini", "1", "Telugu")
+
+def test_disk_tier_survives_restart_and_hits_are_copies(tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+    cache = ResultCache(memory_size=8, path=path)
+    cache.put("k", {"drug_candidates": [{"drug": "Dolo 650"}]})
+    hit, tier = cache.get("k")
+    assert tier == "memory"
+    hit["drug_candidates"].clear()
+
+    restarted = ResultCache(memory_size=8, path=path)
+    hit, tier = restarted.get("k")
+    assert tier == "disk" and hit["drug_candidates"] == [{"drug": "Dolo 650"}]
+    assert restarted.get("k")[1] == "memory"  # promoted
+    assert restarted.get("missing") == (None, None)
+
+def test_ttl_and_size_eviction(tmp_path):
+    cache = ResultCache(memory_size=0, path=str(tmp_path / "r.sqlite3"), ttl=0)
+    cache.put("old", {"a": 1})
+    assert cache.get("old") == (None, None)
+
+    value = {"text": "x" * 1000}
+    size = len(json.dumps(value))
+    cache = ResultCache(memory_size=0, path=str(tmp_path / "s.sqlite3"), max_bytes=size * 3)
+    for key in ["a", "b", "c"]:
+        cache.put(key, value)
+    cache.get("a")  # recently used, survives
+    cache.put("d", value)
+    assert cache.get("a")[1] == "disk"
+    assert cache.get("b") == (None, None)
+    assert cache.stats()["disk"]["evictions"] >= 1
+
+def test_unwritable_path_keeps_the_memory_tier(tmp_path):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    cache = ResultCache(memory_size=8, path=str(blocker / "cache" / "results.sqlite3"))
+    cache.put("k", {"a": 1})
+    assert cache.get("k") == ({"a": 1}, "memory")
+    assert cache.stats()["disk"] is None
@@ -0,0 +1,78 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.utils.single_flight import SingleFlight, content_key
+
+def test_concurrent_coroutines_share_one_call():
+    flights = SingleFlight("test")
+    calls = 0
+
+    async def upstream():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"drug_candidates": [{"drug": "Dolo 650"}]}
+
+    async def scenario():
+        key = content_key(b"same image", "English")
+        return await asyncio.gather(*(flights.run(key, upstream) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert calls == 1
+    assert all(r == results[0] for r in results)
+    results[1]["drug_candidates"].clear()  # followers get copies
+    assert results[0]["drug_candidates"]
+    assert flights.stats()["coalesced"] == 4 and flights.stats()["in_flight"] == 0
+
+def test_errors_propagate_and_keys_are_released():
+    flights = SingleFlight("test")
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("429 quota")
+
+    async def scenario():
+        results = await asyncio.gather(*(flights.run("k", failing) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        return await flights.run("k", lambda: asyncio.sleep(0, result="ok"))
+
+    assert asyncio.run(scenario()) == "ok"
+
+def test_blocking_calls_from_threads_are_coalesced():
+    flights = SingleFlight("test")
+    calls = 0
+    started = threading.Event()
+
+    def upstream():
+        nonlocal calls
+        calls += 1
+        started.set()
+        time.sleep(0.1)
+        return "జ్వరం"
+
+    with ThreadPoolExecutor(4) as pool:
+        first = pool.submit(flights.call, "fever:te", upstream)
+        started.wait()
+        rest = [pool.submit(flights.call, "fever:te", upstream) for _ in range(3)]
+        assert [f.result() for f in [first] + rest] == ["జ్వరం"] * 4
+    assert calls == 1 and flights.stats()["coalesced"] == 3
+
+def test_leader_mutating_its_result_does_not_reach_followers():
+    flights = SingleFlight("test")
+
+    async def upstream():
+        await asyncio.sleep(0.01)
+        return {"drug_candidates": [{"drug": "Dolo 650"}]}
+
+    async def leader():
+        result = await flights.run("k", upstream)
+        result["drug_candidates"].clear()  # runs before the followers resume
+        return result
+
+    async def scenario():
+        return await asyncio.gather(leader(), *(flights.run("k", upstream) for _ in range(3)))
+
+    first, *rest = asyncio.run(scenario())
+    assert first == {"drug_candidates": []}
+    assert all(r == {"drug_candidates": [{"drug": "Dolo 650"}]} for r in rest)
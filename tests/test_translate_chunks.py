@@ -0,0 +1,45 @@
+import threading
+import time
+from app.services import translator
+from app.services.translator import split_chunks
+from app.utils.glossary import Glossary
+from app.utils.translation_memory import TranslationMemory
+
+TEXT = "".join(f"Day {i}: take one tablet after food.\n" for i in range(1, 41))
+
+def test_chunks_respect_the_limit_and_reassemble_exactly():
+    chunks = split_chunks(TEXT, max_chars=200)
+    assert "".join(chunks) == TEXT
+    assert all(len(c) <= 200 for c in chunks) and len(chunks) > 5
+    assert all(c.endswith("\n") for c in chunks)  # split between sentences, not inside them
+    long_sentence = "word " * 100
+    assert "".join(split_chunks(long_sentence, max_chars=64)) == long_sentence
+    assert max(len(c) for c in split_chunks(long_sentence, max_chars=64)) <= 64
+
+def test_chunks_translate_in_parallel_and_in_order(monkeypatch):
+    active, peak, lock = 0, 0, threading.Lock()
+
+    def upstream(text, lang):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+        return text.upper()
+
+    monkeypatch.setattr(translator, "split_chunks", lambda text: split_chunks(text, 200))
+    monkeypatch.setattr(translator, "GLOSSARY", Glossary({}))
+    monkeypatch.setattr(translator, "TRANSLATION_MEMORY", TranslationMemory())
+    monkeypatch.setattr(translator, "_translate", upstream)
+
+    started = time.perf_counter()
+    assert translator.translate_text(TEXT, "hi") == TEXT.upper()
+    assert 1 < peak <= translator.TRANSLATE_WORKERS
+    assert time.perf_counter() - started < 0.05 * len(split_chunks(TEXT, 200)) * 0.75
+
+    calls = []
+    monkeypatch.setattr(translator, "_translate", lambda text, lang: calls.append(text) or text.upper())
+    assert translator.translate_text(TEXT + "One more day.", "hi") == (TEXT + "One more day.").upper()
+    assert len(calls) == 1  # unchanged chunks come from the translation memory
@@ -0,0 +1,74 @@
+import asyncio
+from types import SimpleNamespace
+from app.services import gemini_extractor, translator
+from app.utils.translation_memory import TranslationMemory
+from test_gemini_client import _extractor
+
+SEED = "english_term,hindi,telugu,tamil,explanation,category\nfever,बुखार,జ్వరం,காய்ச்சல்,High body temperature,symptom\n"
+
+def test_disk_tier_survives_restart_and_keys_are_normalized(tmp_path):
+    path = str(tmp_path / "tm.sqlite3")
+    memory = TranslationMemory(path=path)
+    memory.put("Take  one tablet\n", "एक गोली लें", "Hindi", engine="gemini")
+
+    fresh = TranslationMemory(path=path)
+    assert fresh.get("take one tablet", "hi", engine="gemini") == "एक गोली लें"
+    assert fresh.stats()["disk_hits"] == 1
+    assert fresh.get("take one tablet", "hi", engine="gemini") == "एक गोली लें"
+    assert fresh.stats()["disk_hits"] == 1  # second lookup served from memory
+    assert fresh.get("take one tablet", "hi", engine="google") is None
+    assert fresh.get("take one tablet", "te", engine="gemini") is None
+
+def test_glossary_seed_answers_every_engine(tmp_path):
+    seed = tmp_path / "medical_terms.csv"
+    seed.write_text(SEED, encoding="utf-8")
+    memory = TranslationMemory(path=str(tmp_path / "tm.sqlite3"))
+    assert memory.seed_csv(str(seed)) == 3
+    assert memory.seed_csv(str(seed)) == 0
+    assert memory.get("Fever", "te") == "జ్వరం"
+    assert memory.get("fever", "Tamil", engine="gemini:x") == "காய்ச்சல்"
+    assert memory.seed_csv(str(tmp_path / "missing.csv")) == 0
+
+def test_repeat_translations_skip_the_network(monkeypatch):
+    calls = []
+    monkeypatch.setattr(translator, "TRANSLATION_MEMORY", TranslationMemory())
+    monkeypatch.setattr(translator, "_translate", lambda text, lang: calls.append(text) or f"<{lang}>{text}")
+    assert translator.translate_text("Twice daily", "te") == "<te>Twice daily"
+    assert translator.translate_text("twice  daily", "te") == "<te>Twice daily"
+    assert len(calls) == 1
+
+def test_failures_are_not_remembered(monkeypatch):
+    def outage(text, lang):
+        raise ConnectionError("translate.google.com unreachable")
+
+    monkeypatch.setattr(translator, "TRANSLATION_MEMORY", TranslationMemory())
+    monkeypatch.setattr(translator, "_translate", outage)
+    assert translator.translate_text("After food", "hi") == "After food"
+    assert translator.TRANSLATION_MEMORY.get("After food", "hi") is None
+
+def test_gemini_translations_are_remembered(monkeypatch):
+    calls = []
+
+    class FakeModel:
+        async def generate_content_async(self, prompt):
+            calls.append(prompt)
+            return SimpleNamespace(text=" भोजन के बाद \n")
+
+    monkeypatch.setattr(gemini_extractor, "TRANSLATION_MEMORY", TranslationMemory())
+    extractor = _extractor(monkeypatch, 2)
+    extractor.model = FakeModel()
+
+    async def translate_twice():
+        return [await extractor.translate_text("After food", "Hindi") for _ in range(2)]
+
+    assert asyncio.run(translate_twice()) == ["भोजन के बाद"] * 2
+    assert len(calls) == 1
+    assert gemini_extractor.TRANSLATION_MEMORY.get("after food", "hi", engine=gemini_extractor.TRANSLATION_ENGINE)
+
+def test_unwritable_path_keeps_the_memory_tier(tmp_path):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    memory = TranslationMemory(path=str(blocker / "cache" / "tm.sqlite3"))
+    memory.put("fever", "बुखार", "hi")
+    assert memory.get("fever", "hi") == "बुखार"
+    assert memory.stats()["disk_entries"] is None
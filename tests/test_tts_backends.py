@@ -0,0 +1,87 @@
+import asyncio
+import io
+import wave
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.routes import audio
+from app.services import tts_backends
+from app.services.tts_backends import SpeechSynthesizer, split_wav
+from app.utils.audio_cache import AudioCache
+from app.utils.circuit_breaker import CircuitBreaker
+from test_audio_cache import FakeTTS
+
+def _wav(text):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(text.encode() * 2)
+    return buf.getvalue()
+
+class LocalTTS(FakeTTS):
+    name = "local"
+    media_type = "audio/wav"
+    extension = "wav"
+    concatenable = False
+
+class Outage:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, text, language):
+        self.calls += 1
+        raise ConnectionError("Failed to connect to translate.google.com")
+
+def test_falls_back_and_skips_a_dead_upstream():
+    outage = Outage()
+    tts = SpeechSynthesizer(FakeTTS(outage), LocalTTS(lambda t, l: _wav(t)), CircuitBreaker("tts", failure_threshold=2))
+
+    async def speak(n):
+        return [await tts.render(f"Sentence {i}", "en") for i in range(n)]
+
+    results = asyncio.run(speak(5))
+    assert all(backend.name == "local" for _, backend in results)
+    assert outage.calls == 2  # breaker open after two failures; the rest go straight to local
+    assert [b.name for b in tts.preferred()] == ["local", "fake"]
+    assert tts.stats()["fallbacks"] == 5 and tts.stats()["breaker"]["state"] == "open"
+
+def test_without_fallback_errors_surface():
+    tts = SpeechSynthesizer(FakeTTS(Outage()), None, CircuitBreaker("tts", failure_threshold=1))
+    with pytest.raises(ConnectionError):
+        asyncio.run(tts.render("Hello", "en"))
+    with pytest.raises(Exception, match="circuit open"):
+        asyncio.run(tts.render("Hello", "en"))
+
+def test_wav_clips_stream_as_one_wav(tmp_path, monkeypatch):
+    monkeypatch.setattr(audio, "AUDIO_CACHE", AudioCache(str(tmp_path)))
+    monkeypatch.setattr(audio, "TTS", SpeechSynthesizer(FakeTTS(Outage()), LocalTTS(lambda t, l: _wav(t))))
+    client = TestClient(app)
+    text = "Take one tablet. Twice daily. After food."
+
+    response = client.post("/audio/stream", json={"text": text, "engine": "local"})
+    assert response.headers["content-type"] == "audio/wav" and response.headers["X-TTS-Engine"] == "local"
+    body = response.content
+    assert body[:4] == b"RIFF" and body.count(b"RIFF") == 1
+    chunks = audio.split_sentences(text)
+    assert body.endswith(b"".join(split_wav(_wav(c))[1] for c in chunks))
+
+    clip = client.post("/audio/generate", json={"text": text, "inline": False, "engine": "local"}).json()
+    assert clip["format"] == "wav" and clip["audio_url"].endswith(".wav")
+    assert client.get(clip["audio_url"]).headers["content-type"] == "audio/wav"
+    assert client.post("/audio/generate", json={"text": text, "engine": "polly"}).status_code == 400
+
+def test_pyttsx3_renders_offline_in_worker_processes():
+    if not tts_backends.PYTTSX3_AVAILABLE:
+        pytest.skip("pyttsx3 not installed")
+    backend = tts_backends.Pyttsx3Backend(workers=2)
+    try:
+        async def speak():
+            return await asyncio.gather(*(backend.render(f"Take {n} tablets", "English") for n in range(4)))
+        clips = asyncio.run(speak())
+    except RuntimeError as e:
+        pytest.skip(f"No speech driver: {e}")
+    finally:
+        backend.shutdown()
+    assert all(clip[:4] == b"RIFF" and len(split_wav(clip)[1]) > 0 for clip in clips)